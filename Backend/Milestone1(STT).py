@@ -1,12 +1,28 @@
 import os
 import sys
 import time
+import argparse
 import azure.cognitiveservices.speech as speechsdk
+from recognition import AzureRecognizerBackend
+from batch_transcription import transcribe_batch, batch_summary
+from tracing import configure_tracer, get_tracer
+
+parser = argparse.ArgumentParser(description="Transcribe the .wav files in assets/")
+parser.add_argument("--batch", action="store_true", help="Run concurrent sessions and write one JSONL record per file")
+parser.add_argument("--workers", type=int, default=4, help="Concurrent recognition sessions in batch mode")
+parser.add_argument("--input-dir", default=None, help="Folder of .wav files (default: assets/)")
+parser.add_argument("--output", default=None, help="JSONL output path (default: Data/transcripts.jsonl)")
+parser.add_argument("--mic", type=float, default=None, metavar="SECONDS",
+                    help="Recognize this many seconds from the microphone, pushed from memory (no recording file)")
+parser.add_argument("--trace", action="store_true", help="Export per-stage spans and metrics to Data/traces/ (or TRACING=1)")
+args = parser.parse_args()
+if args.trace:
+    configure_tracer()
 
 # Base project directory (use current script's location)
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(script_dir))  # Go up two levels to project root
-input_folder = os.path.join(script_dir, "assets")
+input_folder = args.input_dir or os.path.join(script_dir, "assets")
 
 # Create assets directory if it doesn't exist
 os.makedirs(input_folder, exist_ok=True)
@@ -26,50 +42,50 @@ print("Region:", service_region)
 speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
 
 # Auto language detection (Hindi + English)
-auto_detect_source_language_config = speechsdk.languageconfig.AutoDetectSourceLanguageConfig(
-    languages=["hi-IN", "en-IN"]
-)
+recognizer_backend = AzureRecognizerBackend(speech_config, languages=["hi-IN", "en-IN"])
+
+if args.mic:
+    from audio_sources import MicrophoneSource
+    from recognition import recognize_stream
+
+    # The recognizer reads the microphone's ring buffer while you are still speaking
+    print(f"\n🔴 Listening for {args.mic:.0f} seconds...")
+    result = recognize_stream(recognizer_backend, MicrophoneSource(max_seconds=args.mic),
+                              on_segment=lambda segment: print(segment.text))
+    if result.error:
+        print(f"Recognition stopped early: {result.error}")
+    elif not result.segments:
+        print("No speech recognized.")
+    sys.exit(0)
 
 # Check for WAV files in the assets directory
-wav_files = [f for f in os.listdir(input_folder) if f.endswith(".wav")]
+wav_files = sorted(f for f in os.listdir(input_folder) if f.endswith(".wav"))
 if not wav_files:
     print(f"\nNo .wav files found in {input_folder}")
     print("Please add .wav files to this directory and run the script again.")
     sys.exit(0)
 
-for file in wav_files:
-        input_file = os.path.join(input_folder, file)
-        audio_input = speechsdk.AudioConfig(filename=input_file)
-        recognizer = speechsdk.SpeechRecognizer(
-            speech_config=speech_config,
-            audio_config=audio_input,
-            auto_detect_source_language_config=auto_detect_source_language_config
-        )
-
-        all_text = []
-        done_flag = {"done": False}
-
-        def recognized_handler(evt):
-            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                text = evt.result.text.strip()
-                if text:
-                    all_text.append(text)
-
-        def stop_cb(evt):
-            done_flag["done"] = True
-
-        recognizer.recognized.connect(recognized_handler)
-        recognizer.session_stopped.connect(stop_cb)
-        recognizer.canceled.connect(stop_cb)
-
-        recognizer.start_continuous_recognition()
-
-        timeout = 60
-        start_time = time.time()
-        while not done_flag["done"] and time.time() - start_time < timeout:
-            time.sleep(0.5)
-
-        recognizer.stop_continuous_recognition()
-
-        if all_text:
-            print(" ".join(all_text))
\ No newline at end of file
+wav_paths = [os.path.join(input_folder, f) for f in wav_files]
+
+if args.batch:
+    output_path = args.output or os.path.join(script_dir, "Data", "transcripts.jsonl")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    start_time = time.perf_counter()
+    records = transcribe_batch(
+        recognizer_backend, wav_paths, output_path=output_path, max_workers=args.workers,
+        on_record=lambda r: print(f"{r['file']}: {r['language'] or '?'} RTF {r['rtf']} {r['error']}")
+    )
+    summary = batch_summary(records, time.perf_counter() - start_time)
+    print(f"\nWrote {summary['files']} records to {output_path}")
+    print(f"{summary['audio_seconds']}s of audio in {summary['wall_time']}s (RTF {summary['rtf']}, {summary['failed']} failed)")
+else:
+    def print_text(record):
+        if record["text"]:
+            print(record["text"])
+
+    # One session at a time; each ends on session_stopped/canceled
+    transcribe_batch(recognizer_backend, wav_paths, max_workers=1, on_record=print_text)
+
+if get_tracer().enabled:
+    print(f"📈 Spans: {get_tracer().jsonl_path}, metrics: {get_tracer().metrics_path}")
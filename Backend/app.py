@@ -1,39 +1,68 @@
-import streamlit as st
-import azure.cognitiveservices.speech as speechsdk
-from deep_translator import GoogleTranslator
-from moviepy.editor import VideoFileClip, AudioFileClip
-import time
 import os
-import base64
+import streamlit as st
 from dotenv import load_dotenv
+from languages import language_options, language_names, voice_mapping, DEFAULT_VOICE, join_sentences
+from tracing import get_tracer, stage_summary
+from workspace import ArtifactStore, new_session_id, session_dir
 
-# ------------------- LOAD ENV -------------------
-load_dotenv()
-speech_key = os.getenv("Speech_key")
-service_region = os.getenv("Speech_region")
-
-speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
-
-# ------------------- LANGUAGES -------------------
-language_options = {
-    "English": "en", "Hindi": "hi", "French": "fr", "German": "de",
-    "Spanish": "es", "Italian": "it", "Japanese": "ja", "Korean": "ko",
-    "Russian": "ru", "Portuguese (Portugal)": "pt-PT", "Portuguese (Brazil)": "pt-BR",
-    "Chinese (Simplified)": "zh-CN", "Chinese (Traditional)": "zh-TW",
-    "Arabic": "ar", "Turkish": "tr", "Thai": "th", "Dutch": "nl",
-    "Swedish": "sv", "Polish": "pl", "Tamil": "ta"
-}
+# Heavy modules (Azure SDK, moviepy, deep_translator, numpy) are imported inside
+# the mode that needs them, so the first render doesn't pay for all of them.
 
-voice_mapping = {
-    "en": "en-US-AriaNeural", "hi": "hi-IN-SwaraNeural", "fr": "fr-FR-DeniseNeural",
-    "de": "de-DE-KatjaNeural", "es": "es-ES-ElviraNeural", "it": "it-IT-ElsaNeural",
-    "ja": "ja-JP-NanamiNeural", "ko": "ko-KR-SunHiNeural", "ru": "ru-RU-DariyaNeural",
-    "pt-PT": "pt-PT-FernandaNeural", "pt-BR": "pt-BR-FranciscaNeural",
-    "zh-CN": "zh-CN-XiaoxiaoNeural", "zh-TW": "zh-TW-HsiaoChenNeural",
-    "ar": "ar-EG-SalmaNeural", "tr": "tr-TR-EmelNeural", "th": "th-TH-PremwadeeNeural",
-    "nl": "nl-NL-ColetteNeural", "sv": "sv-SE-HilleviNeural", "pl": "pl-PL-ZofiaNeural",
-    "ta": "ta-IN-PallaviNeural"
-}
+# ------------------- LOAD ENV -------------------
+@st.cache_resource
+def load_speech_settings():
+    load_dotenv()
+    return os.getenv("Speech_key"), os.getenv("Speech_region")
+
+
+speech_key, service_region = load_speech_settings()
+
+
+@st.cache_resource
+def get_speech_config():
+    # Shared and read-only: recognizers only read it, synthesizers get their own from the pool
+    import azure.cognitiveservices.speech as speechsdk
+    return speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
+
+
+def get_recognizer_backend():
+    from recognition import AzureRecognizerBackend
+    return AzureRecognizerBackend(get_speech_config(), languages=["en-IN", "hi-IN"])
+
+# ------------------- MEDIA DELIVERY -------------------
+@st.cache_resource
+def get_media_server():
+    # One range-capable file server per process; rendered media is streamed from disk.
+    # Opt-in: it needs a URL (or port) the viewer's browser can actually reach.
+    if not (os.getenv("MEDIA_SERVER_URL") or os.getenv("MEDIA_SERVER_PORT")):
+        return None
+    from media_server import MediaServer
+    server = MediaServer(
+        host=os.getenv("MEDIA_SERVER_HOST", "127.0.0.1"),
+        port=int(os.getenv("MEDIA_SERVER_PORT", "0")),
+        public_url=os.getenv("MEDIA_SERVER_URL"),
+    )
+    return server.start()
+
+
+def show_media(path, kind):
+    media_server = get_media_server()
+    if media_server is None:
+        # Fall back to Streamlit's own media endpoint (no base64 inlining)
+        if kind == "video":
+            st.video(path)
+        else:
+            st.audio(path)
+        return
+    url = media_server.publish(path)
+    if kind == "video":
+        st.markdown(f"""
+            <video width="700" controls autoplay preload="metadata" style="border-radius: 12px;">
+                <source src="{url}" type="video/mp4">
+            </video>
+        """, unsafe_allow_html=True)
+    else:
+        st.markdown(f'<audio controls preload="metadata" src="{url}" style="width: 100%;"></audio>', unsafe_allow_html=True)
 
 # ------------------- PAGE CONFIG -------------------
 st.set_page_config(page_title="🎬 AI OTT Translator", page_icon="🎧", layout="centered")
@@ -84,6 +113,119 @@ h1 {
 st.markdown("<h1>🎬 AI OTT Speech & Video Translator</h1>", unsafe_allow_html=True)
 st.markdown("<p style='text-align:center; color:#ddd;'>Upload video, audio, or speak — auto-detects English or Hindi and translates beautifully!</p>", unsafe_allow_html=True)
 
+# ------------------- SPEECH CLIENTS -------------------
+@st.cache_resource
+def get_synthesizer_pool():
+    # Shared by all sessions; each voice gets its own immutable SpeechConfig
+    from speech_clients import SynthesizerPool
+    return SynthesizerPool(speech_key, service_region, max_per_key=4)
+
+
+def get_synthesize():
+    from speech_clients import pooled_synthesizer
+    return pooled_synthesizer(get_synthesizer_pool())
+
+
+def prewarm_voices(targets, output_format=None):
+    # Open a synthesizer connection for each chosen voice while the user is still uploading
+    for voice in targets.values():
+        get_synthesizer_pool().prewarm(voice, output_format=output_format)
+
+
+@st.cache_resource
+def get_streaming_speaker():
+    # Sentence-by-sentence synthesis into in-memory pull streams, sharing the pool and the synthesis cache
+    from speech_clients import pooled_stream
+    from streaming_tts import StreamingSpeaker
+    from tts_cache import get_synthesis_cache
+    return StreamingSpeaker(pooled_stream(get_synthesizer_pool()), lookahead=2, cache=get_synthesis_cache())
+
+
+class SentenceAudioPlayer:
+    """Player for StreamingSpeaker that adds each sentence to the page as soon as it is synthesized."""
+
+    def __init__(self, container):
+        self.container = container
+        self.sentences = 0
+        self._pcm = bytearray()
+
+    def write(self, pcm):
+        self._pcm += pcm
+
+    def end_sentence(self):
+        from streaming_tts import pcm_to_wav_bytes
+
+        if self._pcm:
+            # Only the first clip autoplays, otherwise the browser would play them all at once
+            self.container.audio(pcm_to_wav_bytes(self._pcm), format="audio/wav", autoplay=self.sentences == 0)
+            self.sentences += 1
+        self._pcm = bytearray()
+
+    def close(self):
+        pass
+
+
+def show_pipeline_stats(trace=None):
+    pool_stats = get_synthesizer_pool().stats()
+    st.caption(f"🔌 Synthesizer pool: hit rate {pool_stats['hit_rate']:.0%}, "
+               f"avg wait {pool_stats['avg_wait_ms']} ms, max wait {pool_stats['max_wait_ms']} ms "
+               f"over {pool_stats['acquisitions']} requests")
+    # Per-stage breakdown of this job, only when TRACING=1
+    if trace:
+        st.caption(f"⏱️ {stage_summary(trace)}")
+
+# ------------------- JOB WORKSPACE -------------------
+@st.cache_resource
+def get_artifact_store():
+    return ArtifactStore()
+
+
+artifact_store = get_artifact_store()
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = new_session_id()
+# Per-session scratch space, so concurrent users never share output paths
+job_dir = session_dir(st.session_state["session_id"])
+
+
+@st.cache_resource(max_entries=8)
+def decoded_pcm(content_hash, _path):
+    # 16 kHz mono PCM of an upload, decoded once per content hash and kept in memory (never written out)
+    from audio_normalize import decode_to_pcm
+    return decode_to_pcm(_path)
+
+
+def store_upload(uploaded_file):
+    # Hash + copy once per upload; reruns reuse the stored path
+    uploads = st.session_state.setdefault("uploads", {})
+    if uploaded_file.file_id not in uploads:
+        file_ext = uploaded_file.name.split(".")[-1]
+        uploads[uploaded_file.file_id] = artifact_store.store_upload(uploaded_file, file_ext, job_dir)
+    return uploads[uploaded_file.file_id]
+
+MIC_IDLE_SECONDS = 5.0
+
+
+def format_timestamp(seconds):
+    return f"{int(seconds // 60):02d}:{seconds % 60:04.1f}"
+
+
+def language_tabs(lang_codes):
+    # One tab per target language when dubbing into several
+    if len(lang_codes) == 1:
+        return [st.container()]
+    return st.tabs([language_names.get(code, code) for code in lang_codes])
+
+
+def show_dubbed_text(dubs):
+    for tab, (code, dub) in zip(language_tabs(list(dubs)), dubs.items()):
+        with tab:
+            if dub.translated:
+                st.markdown(f"### 🌐 Translated Text ({language_names.get(code, code)}):\n<div class='box'>{dub.translated}</div>", unsafe_allow_html=True)
+            if dub.error:
+                st.warning(f"⚠️ Could not dub into {language_names.get(code, code)}: {dub.error}")
+            else:
+                show_media(dub.audio_path, "audio")
+
 # ------------------- INPUT MODE -------------------
 input_mode = st.radio("🎙️ Select Input Mode", ["🎥 Upload Video", "🎵 Upload Audio", "🎙️ Speak from Microphone"])
 
@@ -91,117 +233,105 @@ lang_full_names = list(language_options.keys())
 default_index = lang_full_names.index("Hindi") if "Hindi" in lang_full_names else 0
 selected_lang_name = st.selectbox("🌍 Choose Target Language", lang_full_names, index=default_index)
 target_lang = language_options[selected_lang_name]
+extra_lang_names = st.multiselect("➕ Also dub into", [name for name in lang_full_names if name != selected_lang_name])
+# Target code → voice; the first entry is the default audio track
+targets = {code: voice_mapping.get(code, DEFAULT_VOICE)
+           for code in [target_lang] + [language_options[name] for name in extra_lang_names]}
 
 # ------------------- VIDEO TRANSLATION -------------------
 if input_mode == "🎥 Upload Video":
     uploaded_file = st.file_uploader("🎥 Upload your video file", type=["mp4", "mkv", "mov"])
     if uploaded_file:
-        file_ext = uploaded_file.name.split(".")[-1]
-        input_video_path = f"uploaded_input.{file_ext}"
-        with open(input_video_path, "wb") as f:
-            f.write(uploaded_file.read())
+        content_hash, input_video_path = store_upload(uploaded_file)
         st.video(input_video_path)
+        prewarm_voices(targets)
 
         if st.button("🚀 Translate & Dub Video"):
-            with st.spinner("🎧 Translating and dubbing your video... Please wait ⏳"):
-                video_clip = VideoFileClip(input_video_path)
-                audio_path = "extracted_audio.wav"
-                video_clip.audio.write_audiofile(audio_path, verbose=False, logger=None)
-
-                auto_detect_config = speechsdk.languageconfig.AutoDetectSourceLanguageConfig(languages=["en-IN", "hi-IN"])
-                audio_input = speechsdk.AudioConfig(filename=audio_path)
-                recognizer = speechsdk.SpeechRecognizer(
-                    speech_config=speech_config,
-                    audio_config=audio_input,
-                    auto_detect_source_language_config=auto_detect_config
-                )
-
-                full_text = []
-                def recognized_handler(evt):
-                    if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                        full_text.append(evt.result.text)
-
-                recognizer.recognized.connect(recognized_handler)
-                recognizer.start_continuous_recognition()
-                time.sleep(video_clip.duration + 3)
-                recognizer.stop_continuous_recognition()
-
-                original_text = " ".join(full_text)
-                if not original_text:
+            with st.spinner("🎧 Translating and dubbing your video... Please wait ⏳"), \
+                    get_tracer().span("job", kind="video", target=target_lang) as trace:
+                from video_job import dub_video_languages
+
+                # Extraction and recognition run once; every language is translated and voiced in parallel
+                recognizer_backend = get_recognizer_backend()
+                job = dub_video_languages(artifact_store, content_hash, input_video_path, targets,
+                                          recognizer_backend, get_synthesize())
+                if job.recognition_error:
+                    st.warning(f"⚠️ Recognition stopped early: {job.recognition_error}")
+
+                if not job.original_text:
                     st.error("⚠️ Could not recognize any speech. Try a clearer video.")
                 else:
+                    if job.reused:
+                        st.caption(f"♻️ Reused from an earlier upload of this file: {', '.join(job.reused)}")
                     st.success("✅ Speech recognized successfully!")
-                    st.markdown(f"### 🗣️ Recognized Original Speech:\n<div class='box'>{original_text}</div>", unsafe_allow_html=True)
-                    translated_text = GoogleTranslator(source='auto', target=target_lang).translate(original_text)
-                    st.markdown(f"### 🌐 Translated Text ({selected_lang_name}):\n<div class='box'>{translated_text}</div>", unsafe_allow_html=True)
-
-                    dubbed_audio_path = "dubbed_output.wav"
-                    voice = voice_mapping.get(target_lang, "en-US-AriaNeural")
-                    speech_config.speech_synthesis_voice_name = voice
-                    audio_output = speechsdk.audio.AudioOutputConfig(filename=dubbed_audio_path)
-                    synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_output)
-                    synthesizer.speak_text_async(translated_text).get()
-
-                    dubbed_audio = AudioFileClip(dubbed_audio_path)
-                    final_video = video_clip.set_audio(dubbed_audio)
-                    output_video_path = "dubbed_video.mp4"
-                    final_video.write_videofile(output_video_path, codec="libx264", audio_codec="aac")
+                    st.markdown(f"### 🗣️ Recognized Original Speech:\n<div class='box'>{job.original_text}</div>", unsafe_allow_html=True)
+                    for tab, dub in zip(language_tabs(list(job.languages)), job.languages.values()):
+                        with tab:
+                            st.markdown(f"### 🌐 Translated Text ({language_names.get(dub.target_lang, dub.target_lang)}):\n<div class='box'>{dub.translated_text}</div>", unsafe_allow_html=True)
+                            if dub.failed_segments:
+                                st.warning(f"⚠️ {dub.failed_segments} segment(s) could not be dubbed: {dub.first_error}")
+                            if len(targets) > 1 and dub.audio_path:
+                                show_media(dub.audio_path, "audio")
+
+                    if job.mux is not None:
+                        if job.mux.method == "copy":
+                            st.caption(f"⚡ Video stream copied without re-encoding ({job.mux.elapsed:.1f}s)")
+                        else:
+                            st.caption(f"🐢 Video re-encoded in {job.mux.elapsed:.1f}s (stream copy not possible: {job.mux.error[:200]})")
 
                     st.success("🎉 Translation & dubbing complete! Playing dubbed video below ⬇️")
-                    with open(output_video_path, "rb") as video_file:
-                        video_bytes = video_file.read()
-                        video_b64 = base64.b64encode(video_bytes).decode()
-                    st.markdown(f"""
-                        <video width="700" controls autoplay style="border-radius: 12px;">
-                            <source src="data:video/mp4;base64,{video_b64}" type="video/mp4">
-                        </video>
-                    """, unsafe_allow_html=True)
+                    if len(targets) > 1:
+                        st.caption(f"🎚️ One audio track per language ({', '.join(language_names.get(c, c) for c in targets)}); "
+                                   f"the browser plays {selected_lang_name}, other players let you switch tracks.")
+                    show_media(job.output_path, "video")
+                    show_pipeline_stats(trace)
                     st.balloons()
 
 # ------------------- AUDIO TRANSLATION -------------------
 elif input_mode == "🎵 Upload Audio":
     uploaded_audio = st.file_uploader("🎵 Upload your audio file", type=["wav", "mp3", "m4a"])
     if uploaded_audio:
-        file_ext = uploaded_audio.name.split(".")[-1]
-        raw_audio_path = f"temp_audio.{file_ext}"
-        with open(raw_audio_path, "wb") as f:
-            f.write(uploaded_audio.read())
-
-        # Convert any format (mp3/m4a) → wav automatically
-        audio_clip = AudioFileClip(raw_audio_path)
-        input_audio_path = "converted_audio.wav"
-        audio_clip.write_audiofile(input_audio_path, verbose=False, logger=None)
-        audio_clip.close()
-
-        st.audio(input_audio_path)
+        content_hash, raw_audio_path = store_upload(uploaded_audio)
+        st.audio(raw_audio_path)
+        prewarm_voices(targets)
 
         if st.button("🚀 Translate & Dub Audio"):
-            with st.spinner("🎧 Translating your audio... Please wait ⏳"):
-                auto_detect_config = speechsdk.languageconfig.AutoDetectSourceLanguageConfig(languages=["en-IN", "hi-IN"])
-                audio_input = speechsdk.AudioConfig(filename=input_audio_path)
-                recognizer = speechsdk.SpeechRecognizer(
-                    speech_config=speech_config,
-                    audio_config=audio_input,
-                    auto_detect_source_language_config=auto_detect_config
+            with st.spinner("🎧 Translating your audio... Please wait ⏳"), \
+                    get_tracer().span("job", kind="audio", target=target_lang) as trace:
+                from long_form import recognize_long_form
+                from video_job import dub_video_languages
+
+                # Any format (mp3/m4a) is decoded to 16 kHz mono PCM in memory, once per content hash;
+                # the PCM is split at silences and the chunks are pushed to concurrent recognizers.
+                # Transcript, translations and dubbed tracks are kept under the content hash, so a
+                # repeat upload or click starts at the first stage not computed yet.
+                recognizer_backend = get_recognizer_backend()
+                job = dub_video_languages(
+                    artifact_store, content_hash, raw_audio_path, targets, recognizer_backend, get_synthesize(),
+                    mux=False,
+                    recognize=lambda on_segment: recognize_long_form(
+                        recognizer_backend, decoded_pcm(content_hash, raw_audio_path), max_workers=4,
+                        on_segment=on_segment),
                 )
-
-                result = recognizer.recognize_once_async().get()
-                if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                    original_text = result.text
+                if job.recognition_error:
+                    st.warning(f"⚠️ Recognition stopped early: {job.recognition_error}")
+                if job.original_text:
+                    if job.reused:
+                        st.caption(f"♻️ Reused from an earlier upload of this file: {', '.join(job.reused)}")
                     st.success("✅ Speech recognized successfully!")
-                    st.markdown(f"### 🗣️ Recognized Original Speech:\n<div class='box'>{original_text}</div>", unsafe_allow_html=True)
-
-                    translated_text = GoogleTranslator(source='auto', target=target_lang).translate(original_text)
-                    st.markdown(f"### 🌐 Translated Text ({selected_lang_name}):\n<div class='box'>{translated_text}</div>", unsafe_allow_html=True)
-
-                    dubbed_audio_path = "audio_dubbed_output.wav"
-                    voice = voice_mapping.get(target_lang, "en-US-AriaNeural")
-                    speech_config.speech_synthesis_voice_name = voice
-                    audio_output = speechsdk.audio.AudioOutputConfig(filename=dubbed_audio_path)
-                    synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_output)
-                    synthesizer.speak_text_async(translated_text).get()
-
-                    st.audio(dubbed_audio_path)
+                    st.markdown(f"### 🗣️ Recognized Original Speech:\n<div class='box'>{job.original_text}</div>", unsafe_allow_html=True)
+                    with st.expander("🕒 Timestamps"):
+                        for segment in job.segments:
+                            st.markdown(f"`{format_timestamp(segment.offset)}` {segment.text}")
+
+                    for tab, dub in zip(language_tabs(list(job.languages)), job.languages.values()):
+                        with tab:
+                            st.markdown(f"### 🌐 Translated Text ({language_names.get(dub.target_lang, dub.target_lang)}):\n<div class='box'>{dub.translated_text}</div>", unsafe_allow_html=True)
+                            if dub.failed_segments:
+                                st.warning(f"⚠️ {dub.failed_segments} segment(s) could not be dubbed: {dub.first_error}")
+                            if dub.audio_path:
+                                show_media(dub.audio_path, "audio")
+                    show_pipeline_stats(trace)
                     st.success("🎉 Audio translation & dubbing complete!")
                     st.balloons()
                 else:
@@ -209,34 +339,82 @@ elif input_mode == "🎵 Upload Audio":
 
 # ------------------- MICROPHONE TRANSLATION -------------------
 elif input_mode == "🎙️ Speak from Microphone":
-    st.markdown("🎤 Click below and speak in **English or Hindi**.")
+    st.markdown(f"🎤 Click below and speak in **English or Hindi**. Recording stops after {MIC_IDLE_SECONDS:.0f} seconds of silence.")
     if st.button("🎧 Start Recording"):
-        with st.spinner("🎙️ Listening... Please speak now!"):
-            audio_config = speechsdk.AudioConfig(use_default_microphone=True)
-            auto_detect_config = speechsdk.languageconfig.AutoDetectSourceLanguageConfig(languages=["en-IN", "hi-IN"])
-            recognizer = speechsdk.SpeechRecognizer(
-                speech_config=speech_config,
-                audio_config=audio_config,
-                auto_detect_source_language_config=auto_detect_config
-            )
-
-            result = recognizer.recognize_once_async().get()
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                original_text = result.text
+        with st.spinner("🎙️ Listening... Please speak now!"), \
+                get_tracer().span("job", kind="microphone", target=target_lang) as trace:
+            from concurrent.futures import ThreadPoolExecutor
+            from recognition import recognize_file
+            from dubbing import dub_text_languages
+            from speculative_translation import SpeculativeTranslator
+            from speech_clients import STREAM_OUTPUT_FORMAT
+            from streaming_tts import TeePlayer, WavWriter
+
+            # Connections open in the background while the user is speaking
+            prewarm_voices({target_lang: targets[target_lang]}, output_format=STREAM_OUTPUT_FORMAT)
+            prewarm_voices({code: voice for code, voice in targets.items() if code != target_lang})
+
+            # Keeps listening across pauses; stops after a few seconds without any speech.
+            # Each utterance is translated from its partial results while it is still being
+            # spoken, and finished (reused or patched) as soon as its final result arrives.
+            recognizer_backend = get_recognizer_backend()
+            speculator = SpeculativeTranslator(target_lang)
+            translations = []
+            translated_parts, translation_errors = [], []
+            try:
+                with ThreadPoolExecutor(max_workers=1) as resolver:
+                    recognition = recognize_file(
+                        recognizer_backend, None, idle_timeout=MIC_IDLE_SECONDS, on_partial=speculator.on_partial,
+                        on_segment=lambda segment: translations.append(
+                            resolver.submit(speculator.end_utterance(segment.text).translate))
+                    )
+                    # One failed utterance shouldn't hide the others
+                    for future in translations:
+                        try:
+                            translated_parts.append(future.result())
+                        except Exception as e:
+                            translation_errors.append(str(e))
+            finally:
+                speculator.close()
+            if recognition.segments:
+                original_text = recognition.text
                 st.success("✅ Speech recognized successfully!")
                 st.markdown(f"### 🗣️ You said:\n<div class='box'>{original_text}</div>", unsafe_allow_html=True)
 
-                translated_text = GoogleTranslator(source='auto', target=target_lang).translate(original_text)
+                if translation_errors:
+                    st.warning(f"⚠️ {len(translation_errors)} utterance(s) could not be translated: {translation_errors[0]}")
+                translated_text = join_sentences(translated_parts, target_lang)
+                spec_stats = speculator.stats()
+                if spec_stats["hits"] + spec_stats["patches"]:
+                    st.caption(f"🔮 {spec_stats['hits'] + spec_stats['patches']} of {spec_stats['finals']} "
+                               f"utterance(s) translated ahead from partial results "
+                               f"({spec_stats['saved_ms']:.0f} ms of translation saved)")
                 st.markdown(f"### 🌐 Translated Text ({selected_lang_name}):\n<div class='box'>{translated_text}</div>", unsafe_allow_html=True)
 
-                dubbed_audio_path = "mic_output.wav"
-                voice = voice_mapping.get(target_lang, "en-US-AriaNeural")
-                speech_config.speech_synthesis_voice_name = voice
-                audio_output = speechsdk.audio.AudioOutputConfig(filename=dubbed_audio_path)
-                synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_output)
-                synthesizer.speak_text_async(translated_text).get()
-
-                st.audio(dubbed_audio_path)
+                # Sentence by sentence: the first sentence plays while the rest are still being synthesized.
+                # The browser only autoplays the first clip, so the whole track follows as one player.
+                st.caption("🔈 Only the first sentence plays automatically; press play on the later ones, "
+                           "or play the full translation below once it is ready.")
+                output_path = os.path.join(job_dir, f"mic_output_{target_lang}.wav")
+                writer = WavWriter(output_path)
+                try:
+                    spoken = get_streaming_speaker().speak(translated_text, targets[target_lang],
+                                                           TeePlayer([SentenceAudioPlayer(st.container()), writer]))
+                finally:
+                    writer.close()
+                if spoken.error:
+                    st.warning(f"⚠️ Speech synthesis failed: {spoken.error}")
+                else:
+                    st.caption(f"⚡ First audio after {spoken.first_audio * 1000:.0f} ms "
+                               f"({spoken.sentences} sentence(s), all audio after {spoken.total * 1000:.0f} ms)")
+                    if spoken.sentences > 1:
+                        show_media(output_path, "audio")
+
+                extra_targets = {code: voice for code, voice in targets.items() if code != target_lang}
+                if extra_targets:
+                    show_dubbed_text(dub_text_languages(original_text, extra_targets, get_synthesize(), job_dir,
+                                                        prefix="mic_output"))
+                show_pipeline_stats(trace)
                 st.success("🎉 Dubbing complete! 🎧")
                 st.balloons()
             else:
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import tempfile
+
+from muxing import ffmpeg_exe
+from tracing import get_tracer
+
+# What the recognizer actually consumes: 16 kHz, mono, 16-bit PCM
+TARGET_SAMPLE_RATE = 16000
+TARGET_CHANNELS = 1
+
+
+def _ffmpeg_decode(input_arg, output_args, stdin_bytes=None):
+    cmd = [ffmpeg_exe(), "-y", "-loglevel", "error"]
+    if stdin_bytes is None:
+        cmd.append("-nostdin")
+    cmd += [
+        "-i", input_arg, "-vn",
+        "-ac", str(TARGET_CHANNELS), "-ar", str(TARGET_SAMPLE_RATE), "-c:a", "pcm_s16le",
+    ] + output_args
+    proc = subprocess.run(cmd, input=stdin_bytes, capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode("utf-8", "replace").strip() or f"ffmpeg exited with {proc.returncode}")
+    return proc.stdout
+
+
+def _needs_seekable_input(data):
+    # MP4/M4A/MOV ("ftyp" box) may keep their index at the end of the file,
+    # which ffmpeg cannot reach through a pipe
+    return bytes(data[4:8]) == b"ftyp"
+
+
+def _run(source, output_args):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        if not _needs_seekable_input(source):
+            return _ffmpeg_decode("pipe:0", output_args, stdin_bytes=bytes(source))
+        with tempfile.NamedTemporaryFile(delete=False) as tmp:
+            tmp.write(source)
+        try:
+            return _ffmpeg_decode(tmp.name, output_args)
+        finally:
+            os.remove(tmp.name)
+    return _ffmpeg_decode(source, output_args)
+
+
+# ----------------------------- #
+# 🔹 Normalization
+# ----------------------------- #
+def normalize_to_wav(source, out_path):
+    """Decode a file path or in-memory bytes straight to a 16 kHz mono 16-bit WAV."""
+    with get_tracer().span("extract", output="wav") as span:
+        _run(source, ["-f", "wav", out_path])
+        if span:
+            span.set("bytes", os.path.getsize(out_path))
+    return out_path
+
+
+def decode_to_pcm(source):
+    """Decode a file path or in-memory bytes to raw 16 kHz mono s16le PCM bytes."""
+    with get_tracer().span("extract", output="pcm") as span:
+        pcm = _run(source, ["-f", "s16le", "pipe:1"])
+        span.set("bytes", len(pcm))
+    return pcm
+
@@ -0,0 +1,228 @@
+import os
+import re
+import subprocess
+import tempfile
+import threading
+
+from audio_normalize import TARGET_CHANNELS, TARGET_SAMPLE_RATE, _needs_seekable_input
+from muxing import ffmpeg_exe
+from tracing import get_tracer
+
+# PCM sources for recognition.recognize_stream. Each one is read with
+# readinto(buffer) into the caller's fixed-size buffer, returns 0 at the end
+# of the audio, and is closed by whoever finishes with it. All of them
+# produce 16 kHz mono 16-bit PCM; ``duration`` is the length of the whole
+# recording in seconds when it is known up front, else None.
+
+RING_SECONDS = 10.0     # microphone audio held while the recognizer is behind
+PROBE_TIMEOUT = 5.0     # how long DecoderSource.duration waits for the container header
+
+_DURATION_RE = re.compile(rb"Duration: (\d+):(\d\d):(\d\d(?:\.\d+)?)")
+
+
+class MemorySource:
+    """PCM already in memory (bytes, bytearray or an int16 numpy array), read without copying it first."""
+
+    def __init__(self, pcm, sample_rate=TARGET_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._view = memoryview(pcm).cast("B")
+        self._pos = 0
+        self.duration = len(self._view) / 2 / sample_rate
+
+    def readinto(self, buffer):
+        n = min(len(buffer), len(self._view) - self._pos)
+        memoryview(buffer).cast("B")[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        self._view.release()
+
+
+# ----------------------------- #
+# 🔹 Decoder pipe
+# ----------------------------- #
+class DecoderSource:
+    """
+    ffmpeg decoding a media file (or in-memory bytes) to PCM on its stdout.
+    The decoder runs in its own process, so the recognizer gets the first
+    block while the rest of the file is still being decoded, and nothing is
+    written to disk. The pipe itself is the only buffer: ffmpeg waits while
+    the reader is behind. ``duration`` comes from the container header.
+    """
+
+    def __init__(self, source, sample_rate=TARGET_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.bytes = 0
+        self._tmp_path = None
+        self._span = get_tracer().span("extract", output="pipe")
+        data = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            if _needs_seekable_input(source):
+                # MP4/MOV keep their index at the end, out of reach of a pipe
+                with tempfile.NamedTemporaryFile(delete=False) as tmp:
+                    tmp.write(source)
+                self._tmp_path = source = tmp.name
+            else:
+                data, source = bytes(source), "pipe:0"
+        # Info level for the header's duration; the level tags pick the errors back out
+        cmd = [ffmpeg_exe(), "-hide_banner", "-nostats", "-loglevel", "level+info"] + (
+            ["-nostdin"] if data is None else []) + [
+            "-i", source, "-vn", "-ac", str(TARGET_CHANNELS), "-ar", str(sample_rate),
+            "-c:a", "pcm_s16le", "-f", "s16le", "pipe:1",
+        ]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE if data is not None else None,
+                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._errors = []
+        self._duration = None
+        self._probed = threading.Event()
+        self._stderr_thread = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stderr_thread.start()
+        if data is not None:
+            threading.Thread(target=self._feed, args=(data,), daemon=True).start()
+
+    def _feed(self, data):
+        try:
+            self._proc.stdin.write(data)
+        except (BrokenPipeError, ValueError):
+            pass    # the decoder stopped early; its error is reported from stderr
+        finally:
+            try:
+                self._proc.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+
+    def _read_stderr(self):
+        for line in self._proc.stderr:
+            if b"[error]" in line or b"[fatal]" in line:
+                self._errors.append(re.sub(rb"\[(error|fatal)\] ", b"", line).strip().decode("utf-8", "replace"))
+            elif not self._probed.is_set():
+                match = _DURATION_RE.search(line)
+                if match:
+                    hours, minutes, seconds = match.groups()
+                    self._duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+                if match or b"Stream mapping" in line or b"Duration: N/A" in line:
+                    self._probed.set()
+        self._probed.set()
+
+    @property
+    def duration(self):
+        self._probed.wait(PROBE_TIMEOUT)
+        return self._duration
+
+    def readinto(self, buffer):
+        n = self._proc.stdout.readinto(buffer)
+        self.bytes += n
+        if not n:
+            # End of the decoded audio: a failed decode is an error, not just a short file
+            if self._proc.wait() != 0:
+                self._stderr_thread.join()
+                raise RuntimeError("\n".join(self._errors) or f"ffmpeg exited with {self._proc.returncode}")
+        return n
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+        self._proc.stdout.close()
+        if self._tmp_path:
+            os.remove(self._tmp_path)
+            self._tmp_path = None
+        if self._span is not None:
+            self._span.set("bytes", self.bytes)
+            self._span.end()
+            self._span = None
+
+
+# ----------------------------- #
+# 🔹 Microphone ring buffer
+# ----------------------------- #
+class RingBuffer:
+    """
+    Fixed-capacity byte FIFO between an audio callback and a reader. The
+    writer never blocks: when the reader falls more than ``capacity`` bytes
+    behind, the oldest audio is dropped and counted in ``dropped``.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.dropped = 0
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def write(self, data):
+        data = memoryview(data).cast("B")
+        cap = self.capacity
+        with self._cond:
+            if len(data) > cap:
+                self.dropped += len(data) - cap
+                data = data[-cap:]
+            overflow = self._size + len(data) - cap
+            if overflow > 0:
+                self._start = (self._start + overflow) % cap
+                self._size -= overflow
+                self.dropped += overflow
+            end = (self._start + self._size) % cap
+            first = min(len(data), cap - end)
+            self._view[end:end + first] = data[:first]
+            self._view[:len(data) - first] = data[first:]
+            self._size += len(data)
+            self._cond.notify()
+
+    def readinto(self, buffer):
+        """Wait until ``buffer`` can be filled (or the ring is closed) and copy the oldest audio into it."""
+        cap = self.capacity
+        out = memoryview(buffer).cast("B")[:cap]
+        with self._cond:
+            while self._size < len(out) and not self._closed:
+                self._cond.wait()
+            n = min(len(out), self._size)
+            first = min(n, cap - self._start)
+            out[:first] = self._view[self._start:self._start + first]
+            out[first:n] = self._view[:n - first]
+            self._start = (self._start + n) % cap
+            self._size -= n
+            return n
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class MicrophoneSource:
+    """
+    The default microphone through sounddevice. The audio callback only
+    copies into a RingBuffer of ``ring_seconds``; the recognizer reads from
+    it at its own pace. Ends after ``max_seconds`` of audio, or on close().
+    """
+
+    def __init__(self, sample_rate=TARGET_SAMPLE_RATE, max_seconds=None, ring_seconds=RING_SECONDS,
+                 block_seconds=0.1):
+        import sounddevice as sd
+
+        self.sample_rate = sample_rate
+        self.duration = None    # live audio
+        self.ring = RingBuffer(2 * int(ring_seconds * sample_rate))
+        self._remaining = 2 * int(max_seconds * sample_rate) if max_seconds else None
+        self._stream = sd.RawInputStream(samplerate=sample_rate, channels=1, dtype="int16",
+                                         blocksize=int(block_seconds * sample_rate),
+                                         callback=lambda indata, frames, time_info, status: self.ring.write(indata))
+        self._stream.start()
+
+    def readinto(self, buffer):
+        if self._remaining is not None:
+            buffer = memoryview(buffer).cast("B")[:self._remaining]
+        n = self.ring.readinto(buffer) if len(buffer) else 0
+        if self._remaining is not None:
+            self._remaining -= n
+        return n
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+        self.ring.close()
@@ -0,0 +1,239 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from languages import DEFAULT_VOICE, voice_mapping
+from tracing import configure_tracer, get_tracer
+from workspace import WORKSPACE_ROOT, ArtifactStore, hash_file
+
+# Dubs every media file under a folder without the UI:
+# extract → recognize → translate → synthesize → mux, resumable through a manifest.
+
+VIDEO_EXTENSIONS = {".mp4", ".mkv", ".mov"}
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a"}
+MANIFEST_NAME = "manifest.json"
+
+
+def find_media(input_dir):
+    """Media files under ``input_dir`` as sorted paths relative to it."""
+    found = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS | AUDIO_EXTENSIONS:
+                found.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return sorted(found)
+
+
+def link_or_copy(src, dst):
+    # Outputs share the artifact store's copy when both are on the same disk
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+# ----------------------------- #
+# 🔹 Manifest checkpoint
+# ----------------------------- #
+class Manifest:
+    """
+    One JSON record per input file, rewritten atomically after every file,
+    so an interrupted run knows which files are finished. Unfinished files
+    are redone; the artifact store still spares them the stages they completed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.files = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            self.files = {}
+
+    def is_done(self, rel_path, targets):
+        record = self.files.get(rel_path)
+        return bool(record and record["status"] == "done" and record["targets"] == list(targets)
+                    and all(os.path.exists(p) for p in record["outputs"]))
+
+    def update(self, rel_path, record):
+        with self._lock:
+            self.files[rel_path] = record
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"files": self.files}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+# ----------------------------- #
+# 🔹 One file
+# ----------------------------- #
+def dub_file(rel_path, args, targets, store, backends, cpu_pool):
+    """Dub one media file; returns its manifest record."""
+    from video_job import dub_video_languages
+
+    recognizer_backend, synthesize, translate = backends
+    input_path = os.path.join(args.input_dir, rel_path)
+    stem, ext = os.path.splitext(rel_path)
+    is_video = ext.lower() in VIDEO_EXTENSIONS
+    record = {"status": "failed", "targets": list(targets), "outputs": [], "media_seconds": 0.0,
+              "wall_s": 0.0, "reused": [], "error": ""}
+    start = time.perf_counter()
+    with get_tracer().span("job", kind="batch", file=rel_path) as span:
+        try:
+            content_hash = hash_file(input_path)
+            job = dub_video_languages(store, content_hash, input_path, targets, recognizer_backend, synthesize,
+                                      translate=translate, max_workers=args.workers, cpu_pool=cpu_pool,
+                                      mux=is_video)
+            record["reused"] = job.reused
+            record["media_seconds"] = round(job.audio_duration, 3)
+            failed = {lang: dub.first_error for lang, dub in job.languages.items() if dub.failed_segments}
+            if not job.original_text:
+                record["error"] = job.recognition_error or "No speech recognized"
+            else:
+                if is_video:
+                    out_path = os.path.join(args.output_dir, f"{stem}.{'_'.join(targets)}.mp4")
+                    link_or_copy(job.output_path, out_path)
+                    record["outputs"].append(out_path)
+                else:
+                    for lang, dub in job.languages.items():
+                        out_path = os.path.join(args.output_dir, f"{stem}.{lang}.wav")
+                        link_or_copy(dub.audio_path, out_path)
+                        record["outputs"].append(out_path)
+                # Incomplete outputs are kept, but the file is redone on the next run
+                record["error"] = job.recognition_error or "; ".join(f"{k}: {v}" for k, v in failed.items())
+                record["status"] = "incomplete" if record["error"] else "done"
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        span.set_error(record["error"])
+        span.set("media_seconds", record["media_seconds"])
+    record["wall_s"] = round(time.perf_counter() - start, 3)
+    record["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    return record
+
+
+# ----------------------------- #
+# 🔹 Backends
+# ----------------------------- #
+def azure_backends():
+    from dotenv import load_dotenv
+    import azure.cognitiveservices.speech as speechsdk
+    from recognition import AzureRecognizerBackend
+    from speech_clients import SynthesizerPool, pooled_synthesizer
+    from translation_cache import cached_translate
+
+    load_dotenv()
+    speech_key = os.getenv("Speech_key") or os.getenv("SPEECH_KEY") or os.getenv("AZURE_SPEECH_KEY")
+    service_region = os.getenv("Speech_region") or os.getenv("SPEECH_REGION") or os.getenv("AZURE_SPEECH_REGION")
+    if not speech_key or not service_region:
+        print("ERROR: Azure Speech key/region not found. Set 'Speech_key' and 'Speech_region' (or use --fake).")
+        sys.exit(1)
+    speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
+    pool = SynthesizerPool(speech_key, service_region, max_per_key=4)
+    return AzureRecognizerBackend(speech_config, languages=["en-IN", "hi-IN"]), pooled_synthesizer(pool), cached_translate
+
+
+def fake_backends():
+    # Offline stand-ins, to try a catalog run without touching the services or the shared caches
+    from fake_backends import FakeRecognizer, FakeSynthesizer, FakeTranslator
+    from translation_cache import TranslationCache, cached_translate
+
+    translator = FakeTranslator()
+    translation_cache = TranslationCache(path=None)
+
+    def translate(text, target):
+        return cached_translate(text, target, cache=translation_cache, translator=translator)
+
+    return FakeRecognizer(realtime_factor=0.05), FakeSynthesizer(), translate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dub every video/audio file in a folder into one or more languages")
+    parser.add_argument("input_dir", help="Folder of media files (searched recursively)")
+    parser.add_argument("targets", nargs="+", choices=sorted(voice_mapping), metavar="LANG",
+                        help="Target language codes, e.g. hi fr; the first is the default audio track")
+    parser.add_argument("--output-dir", default=None, help="Where dubbed files go (default: <input_dir>/dubbed)")
+    parser.add_argument("--jobs", type=int, default=2, help="Files in flight at once (network stages run on threads)")
+    parser.add_argument("--workers", type=int, default=4, help="Segments translated/synthesized at once per language")
+    parser.add_argument("--cpu-workers", type=int, default=os.cpu_count() or 2,
+                        help="Processes for mixing and muxing")
+    parser.add_argument("--workspace", default=None,
+                        help="Artifact store root, shared with app.py (default: Data/workspace)")
+    parser.add_argument("--fake", action="store_true", help="Use the offline fake backends instead of Azure/Google")
+    parser.add_argument("--trace", action="store_true", help="Export per-stage spans and metrics to Data/traces/ (or TRACING=1)")
+    args = parser.parse_args()
+    if args.trace:
+        configure_tracer()
+
+    args.output_dir = args.output_dir or os.path.join(args.input_dir, "dubbed")
+    os.makedirs(args.output_dir, exist_ok=True)
+    targets = {code: voice_mapping.get(code, DEFAULT_VOICE) for code in dict.fromkeys(args.targets)}
+    # Fake runs keep their artifacts apart so they are never reused by a real run
+    workspace = args.workspace or (os.path.join(args.output_dir, ".fake-workspace") if args.fake else WORKSPACE_ROOT)
+    store = ArtifactStore(root=workspace)
+    manifest = Manifest(os.path.join(args.output_dir, MANIFEST_NAME))
+
+    media = [p for p in find_media(args.input_dir)
+             if not os.path.abspath(os.path.join(args.input_dir, p)).startswith(os.path.abspath(args.output_dir))]
+    pending = [p for p in media if not manifest.is_done(p, targets)]
+    print(f"🎬 {len(media)} media file(s), {len(media) - len(pending)} already done, {len(pending)} to dub "
+          f"into {', '.join(targets)}")
+    if not pending:
+        return
+
+    backends = fake_backends() if args.fake else azure_backends()
+    start = time.perf_counter()
+    records = []
+    # spawn, not fork: the parent already runs SDK and pool threads. Workers ignore
+    # Ctrl-C so the files in flight can still be finished and checkpointed.
+    cpu_pool = ProcessPoolExecutor(max_workers=max(1, args.cpu_workers), mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=signal.signal, initargs=(signal.SIGINT, signal.SIG_IGN))
+    file_pool = ThreadPoolExecutor(max_workers=max(1, args.jobs))
+
+    def checkpoint(rel_path):
+        # Recorded from the worker, so files in flight at an interrupt still reach the manifest
+        record = dub_file(rel_path, args, targets, store, backends, cpu_pool)
+        manifest.update(rel_path, record)
+        records.append(record)
+        return record
+
+    try:
+        futures = {file_pool.submit(checkpoint, p): p for p in pending}
+        for future in as_completed(futures):
+            rel_path, record = futures[future], future.result()
+            speed = record["media_seconds"] / record["wall_s"] if record["wall_s"] else 0.0
+            icon = {"done": "✅", "incomplete": "⚠️"}.get(record["status"], "❌")
+            reused = f" (reused {', '.join(record['reused'])})" if record["reused"] else ""
+            print(f"{icon} {rel_path}: {record['media_seconds']:.1f}s of media in {record['wall_s']:.1f}s "
+                  f"({speed:.1f}x real time){reused}" + (f" — {record['error']}" if record["error"] else ""))
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted; finishing the files in flight. The next run resumes from the manifest.")
+    finally:
+        file_pool.shutdown(wait=True, cancel_futures=True)
+        cpu_pool.shutdown(wait=True)
+
+    wall = time.perf_counter() - start
+    media_seconds = sum(r["media_seconds"] for r in records if r["status"] == "done")
+    done = sum(r["status"] == "done" for r in records)
+    print(f"\n📊 {done} done, {sum(r['status'] == 'incomplete' for r in records)} incomplete, "
+          f"{sum(r['status'] == 'failed' for r in records)} failed in {wall:.1f}s")
+    if wall and records:
+        print(f"⚡ {media_seconds / 60:.1f} min of media dubbed ({media_seconds / wall:.1f}x real time, "
+              f"{3600 * done / wall:.0f} files/hour)")
+    print(f"📒 Manifest: {manifest.path}")
+    if get_tracer().enabled:
+        print(f"📈 Spans: {get_tracer().jsonl_path}, metrics: {get_tracer().metrics_path}")
+
+
+if __name__ == "__main__":
+    main()
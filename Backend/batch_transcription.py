@@ -0,0 +1,73 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from recognition import recognize_file
+from tracing import get_tracer
+
+
+# ----------------------------- #
+# 🔹 Batch transcription
+# ----------------------------- #
+def transcription_record(path, result):
+    return {
+        "file": os.path.basename(path),
+        "text": result.text,
+        "language": result.language,
+        "audio_duration": round(result.audio_duration, 3),
+        "wall_time": round(result.wall_time, 3),
+        "rtf": round(result.rtf, 4),
+        "error": result.error or ("timed out" if result.timed_out else ""),
+    }
+
+
+def transcribe_batch(backend, audio_paths, output_path=None, max_workers=4, idle_timeout=15.0, on_record=None):
+    """
+    Recognize ``audio_paths`` with at most ``max_workers`` concurrent sessions.
+
+    Records are emitted (and appended to ``output_path`` as JSONL) strictly in
+    input order: a finished file waits until every file before it is done.
+    Returns the list of records in input order.
+    """
+    records = [None] * len(audio_paths)
+    next_index = 0
+    outfile = open(output_path, "w", encoding="utf-8") if output_path else None
+
+    def run(path):
+        # Each file is one traced job
+        try:
+            with get_tracer().span("job", kind="transcription", file=os.path.basename(path)):
+                return transcription_record(path, recognize_file(backend, path, idle_timeout=idle_timeout))
+        except Exception as e:
+            return {"file": os.path.basename(path), "text": "", "language": "",
+                    "audio_duration": 0.0, "wall_time": 0.0, "rtf": 0.0, "error": str(e)}
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = {pool.submit(run, path): i for i, path in enumerate(audio_paths)}
+            for future in as_completed(futures):
+                records[futures[future]] = future.result()
+                # Flush the contiguous run of finished files
+                while next_index < len(records) and records[next_index] is not None:
+                    record = records[next_index]
+                    if outfile:
+                        outfile.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        outfile.flush()
+                    if on_record is not None:
+                        on_record(record)
+                    next_index += 1
+    finally:
+        if outfile:
+            outfile.close()
+    return records
+
+
+def batch_summary(records, wall_time):
+    audio_total = sum(r["audio_duration"] for r in records)
+    return {
+        "files": len(records),
+        "failed": sum(1 for r in records if r["error"]),
+        "audio_seconds": round(audio_total, 3),
+        "wall_time": round(wall_time, 3),
+        "rtf": round(wall_time / audio_total, 4) if audio_total else 0.0,
+    }
@@ -0,0 +1,126 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tracing import get_tracer
+from translation_cache import get_translation_cache, google_translate
+
+# GoogleTranslator rejects payloads over 5000 characters; keep some headroom
+MAX_BATCH_CHARS = 4500
+LINE_SEPARATOR = "\n"
+
+
+def pack_batches(lines, max_chars=MAX_BATCH_CHARS):
+    """Group consecutive line indices so each joined request stays under ``max_chars``."""
+    batches = []
+    current, size = [], 0
+    for i, line in enumerate(lines):
+        added = len(line) + (len(LINE_SEPARATOR) if current else 0)
+        if current and size + added > max_chars:
+            batches.append(current)
+            current, size = [], 0
+            added = len(line)
+        current.append(i)
+        size += added
+    if current:
+        batches.append(current)
+    return batches
+
+
+# ----------------------------- #
+# 🔹 Batch translation engine
+# ----------------------------- #
+class BatchTranslator:
+    """
+    Translates a list of lines with several packed requests in flight.
+    Results are delivered in the original order; a line whose batch fails is
+    retried on its own with backoff before being reported as failed.
+    """
+
+    def __init__(self, target, translator=google_translate, cache=None, max_workers=4,
+                 max_chars=MAX_BATCH_CHARS, retries=3, backoff=0.5):
+        self.target = target
+        self.translator = translator
+        self.cache = cache if cache is not None else get_translation_cache()
+        self.max_workers = max_workers
+        self.max_chars = max_chars
+        self.retries = retries
+        self.backoff = backoff
+        self.failed = {}  # line index -> error message
+
+    def _translate_line(self, line):
+        for attempt in range(self.retries):
+            try:
+                return self.translator(line, self.target)
+            except Exception:
+                if attempt == self.retries - 1:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+
+    def _translate_batch(self, lines):
+        results = [self.cache.get(line, self.target) for line in lines]
+        pending = [i for i, r in enumerate(results) if r is None]
+        if not pending:
+            return results, {}
+
+        errors = {}
+        if len(pending) > 1:
+            try:
+                joined = LINE_SEPARATOR.join(lines[i] for i in pending)
+                parts = (self.translator(joined, self.target) or "").split(LINE_SEPARATOR)
+                # Only trust the packed response if it kept the line structure
+                if len(parts) == len(pending):
+                    for i, part in zip(pending, parts):
+                        results[i] = part.strip()
+                        self.cache.put(lines[i], self.target, results[i])
+                    return results, errors
+            except Exception:
+                pass
+
+        for i in pending:
+            try:
+                results[i] = self._translate_line(lines[i])
+                self.cache.put(lines[i], self.target, results[i])
+            except Exception as e:
+                errors[i] = str(e)
+        return results, errors
+
+    def _traced_batch(self, lines, parent_span):
+        with get_tracer().span("translate", parent=parent_span, lines=len(lines),
+                               chars=sum(len(line) for line in lines)) as span:
+            results, errors = self._translate_batch(lines)
+            if errors:
+                span.set_error(next(iter(errors.values())))
+        return results, errors
+
+    def translate(self, lines, on_line=None):
+        """
+        Translate ``lines`` and return the translations in order. ``on_line``
+        is called as ``on_line(index, translated, error)`` strictly in order,
+        as soon as every earlier line is done.
+        """
+        batches = pack_batches(lines, self.max_chars)
+        results = [None] * len(lines)
+        done = [False] * len(batches)
+        next_batch = 0
+        parent_span = get_tracer().current()
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            futures = {
+                pool.submit(self._traced_batch, [lines[i] for i in batch], parent_span): b
+                for b, batch in enumerate(batches)
+            }
+            for future in as_completed(futures):
+                b = futures[future]
+                translated, errors = future.result()
+                for j, i in enumerate(batches[b]):
+                    results[i] = translated[j]
+                    if j in errors:
+                        self.failed[i] = errors[j]
+                done[b] = True
+
+                while next_batch < len(batches) and done[next_batch]:
+                    if on_line is not None:
+                        for i in batches[next_batch]:
+                            on_line(i, results[i], self.failed.get(i))
+                    next_batch += 1
+        return results
@@ -0,0 +1,340 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from batch_transcription import transcribe_batch
+from batch_translation import BatchTranslator
+from dubbing import SegmentDubber, mix_segments
+from fake_backends import FakeRecognizer, FakeSynthesizer, FakeTranslator
+from language_segments import LanguageRun
+from languages import voice_mapping
+from long_form import recognize_long_form
+from long_synthesis import synthesize_long_text
+from realtime_pipeline import Stage, StagedPipeline, percentile
+from recognition import recognize_file, wav_duration
+from speculative_translation import SpeculativeTranslator
+from streaming_tts import StreamingSpeaker, WavWriter
+from translation_cache import TranslationCache, cached_translate
+from tts_cache import SynthesisCache
+
+# Drives each pipeline end to end on assets/*.wav with the local stand-in
+# backends, so timings reflect this code rather than the network.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+assets_dir = os.path.join(script_dir, "assets")
+sample_text_path = os.path.join(script_dir, "Data", "text.txt")
+default_output = os.path.join(script_dir, "Data", "benchmarks", "pipelines.json")
+
+PIPELINES = {
+    "stt": "Milestone1(STT).py batch transcription",
+    "translate": "milestone2(translation).py packed batch translation",
+    "tts": "milestone3.py chunked concurrent synthesis into one WAV",
+    "realtime": "milestone4.py recognize → translate → streamed sentence synthesis",
+    "speculative": "milestone4.py with translation started from partial hypotheses",
+    "dub": "app.py audio dubbing (long-form recognition, dubbing, mixing)",
+}
+
+
+# ----------------------------- #
+# 🔹 Stage timing
+# ----------------------------- #
+class StageTimer:
+    """Per-stage latency samples and error counts, safe to record from worker threads."""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.counters = {}      # extra pipeline statistics, e.g. speculation hit rate
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, error=False):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+            self.errors[stage] = self.errors.get(stage, 0) + bool(error)
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self.record(stage, time.perf_counter() - start, failed)
+        return timed
+
+    def report(self):
+        with self._lock:
+            return {
+                stage: {
+                    "count": len(values),
+                    "errors": self.errors.get(stage, 0),
+                    "p50_ms": round(1000 * percentile(values, 50), 2),
+                    "p95_ms": round(1000 * percentile(values, 95), 2),
+                    "p99_ms": round(1000 * percentile(values, 99), 2),
+                    "mean_ms": round(1000 * sum(values) / len(values), 2),
+                }
+                for stage, values in self.samples.items()
+            }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def sample_transcripts(wav_paths, segment_seconds):
+    """Give the fake recognizer real sentences to return, cycling through Data/text.txt."""
+    with open(sample_text_path, "r", encoding="utf-8") as f:
+        sentences = [line.strip() for line in f if line.strip()]
+    transcripts, index = {}, 0
+    for path in wav_paths:
+        count = max(1, int(wav_duration(path) // segment_seconds))
+        transcripts[os.path.basename(path)] = [sentences[(index + i) % len(sentences)] for i in range(count)]
+        index += count
+    return transcripts
+
+
+# ----------------------------- #
+# 🔹 Pipelines
+# ----------------------------- #
+def run_pipeline(name, args, wav_paths, timer, work_dir):
+    """Run one pipeline; returns how many items it processed."""
+    recognizer = FakeRecognizer(realtime_factor=args.recognizer_rtf, segment_seconds=args.segment_seconds,
+                                transcripts=sample_transcripts(wav_paths, args.segment_seconds),
+                                failure_rate=args.failure_rate, seed=args.seed,
+                                endpoint_silence=args.endpoint_silence if name in ("realtime", "speculative") else 0.0)
+    translator = FakeTranslator(latency=args.translate_latency, per_char=args.translate_per_char,
+                                failure_rate=args.failure_rate, seed=args.seed)
+    synthesizer = FakeSynthesizer(latency=args.synth_latency, realtime_factor=args.synth_rtf,
+                                  failure_rate=args.failure_rate, seed=args.seed)
+    translation_cache = TranslationCache(path=None)
+    synthesis_cache = SynthesisCache(cache_dir=os.path.join(work_dir, "tts"))
+    voice = voice_mapping[args.target]
+    timed_translator = timer.wrap("translate", translator)
+    timed_synthesize = timer.wrap("synthesize", synthesizer)
+    timed_synthesize.output_format = synthesizer.output_format
+
+    def translate(text, target):
+        return cached_translate(text, target, cache=translation_cache, translator=timed_translator)
+
+    if name == "stt":
+        records = transcribe_batch(recognizer, wav_paths, max_workers=args.workers, idle_timeout=args.idle_timeout)
+        for record in records:
+            timer.record("recognize", record["wall_time"], bool(record["error"]))
+        return len(records)
+
+    transcripts = recognizer.transcripts
+    if name == "translate":
+        lines = [line for path in wav_paths for line in transcripts[os.path.basename(path)]]
+        batch = BatchTranslator(args.target, translator=timed_translator, cache=translation_cache,
+                                max_workers=args.workers, backoff=0.05)
+        batch.translate(lines)
+        return len(lines)
+
+    if name == "tts":
+        texts = [" ".join(f"[{args.target}] {line}" for line in transcripts[os.path.basename(path)])
+                 for path in wav_paths]
+        for i, text in enumerate(texts):
+            try:
+                synthesize_long_text(timed_synthesize, [LanguageRun(args.target, text)],
+                                     os.path.join(work_dir, f"output_{i}.wav"), max_workers=args.workers,
+                                     cache=synthesis_cache)
+            except Exception:
+                pass
+        return len(texts)
+
+    if name in ("realtime", "speculative"):
+        speculator = None
+        if name == "speculative":
+            # Settling is measured in audio seconds, like the endpoint silence
+            speculator = SpeculativeTranslator(args.target, translator=timed_translator, translate=translate,
+                                               settle_seconds=args.settle_seconds * args.recognizer_rtf)
+
+        def translate_stage(utterance):
+            speculation = utterance.data.get("speculation")
+            if speculation is None:
+                utterance.data["translated"] = translate(utterance.text, args.target)
+            else:
+                utterance.data["translated"] = speculation.translate()
+                timer.record("translate_saved", speculation.saved)
+
+        def submit(segment):
+            data = {"speculation": speculator.end_utterance(segment.text)} if speculator else None
+            pipeline.submit(segment.text, data=data)
+
+        speaker = StreamingSpeaker(synthesizer.stream, lookahead=2, cache=synthesis_cache,
+                                   output_format=synthesizer.output_format)
+
+        def speak_stage(utterance):
+            writer = WavWriter(os.path.join(work_dir, f"translated_{utterance.seq + 1}.wav"))
+            try:
+                spoken = speaker.speak(utterance.data["translated"], voice, writer)
+            finally:
+                writer.close()
+            timer.record("speak", spoken.total, bool(spoken.error))
+            if spoken.first_audio_at:
+                timer.record("first_audio", spoken.first_audio_at - utterance.created_at)
+
+        pipeline = StagedPipeline([
+            Stage("translate_stage", translate_stage, workers=2),
+            Stage("speak_stage", speak_stage),
+        ], maxsize=8)
+        for path in wav_paths:
+            result = recognize_file(recognizer, path, idle_timeout=args.idle_timeout, on_segment=submit,
+                                    on_partial=speculator.on_partial if speculator else None)
+            timer.record("recognize", result.wall_time, bool(result.error))
+        pipeline.close()
+        if speculator:
+            speculator.close()
+            timer.counters["speculation"] = speculator.stats()
+        for utterance in pipeline.completed:
+            timer.record("end_to_end", utterance.latency, bool(utterance.error))
+        return len(pipeline.completed)
+
+    if name == "dub":
+        mix = timer.wrap("mix", mix_segments)
+        for i, path in enumerate(wav_paths):
+            start = time.perf_counter()
+            result = recognize_long_form(recognizer, path, max_workers=args.workers, idle_timeout=args.idle_timeout)
+            timer.record("recognize", time.perf_counter() - start, bool(result.error))
+            dubber = SegmentDubber(args.target, voice, timed_synthesize, translate=translate,
+                                   max_workers=args.workers, cache=synthesis_cache)
+            for segment in result.segments:
+                dubber.submit(segment)
+            dubbed = dubber.results()
+            mix(dubbed, result.audio_duration, os.path.join(work_dir, f"dubbed_{i}.wav"))
+            timer.record("file", time.perf_counter() - start, bool(result.error))
+        return len(wav_paths)
+
+    raise ValueError(f"Unknown pipeline: {name}")
+
+
+def measure_pipeline(name, args):
+    """Runs inside a fresh interpreter so peak RSS belongs to this pipeline alone."""
+    wav_paths = sorted(os.path.join(assets_dir, f) for f in os.listdir(assets_dir) if f.endswith(".wav"))
+    audio_seconds = sum(wav_duration(p) for p in wav_paths)
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as work_dir:
+        start = time.perf_counter()
+        items = run_pipeline(name, args, wav_paths, timer, work_dir)
+        wall = time.perf_counter() - start
+    return {
+        "description": PIPELINES[name],
+        "files": len(wav_paths),
+        "items": items,
+        "audio_seconds": round(audio_seconds, 3),
+        "wall_s": round(wall, 4),
+        "items_per_s": round(items / wall, 3) if wall else 0.0,
+        "audio_s_per_s": round(audio_seconds / wall, 3) if wall else 0.0,
+        "rtf": round(wall / audio_seconds, 4) if audio_seconds else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": timer.report(),
+        **timer.counters,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Names of metrics that got worse than ``baseline`` by more than ``tolerance``."""
+    regressions = []
+    for name, current in results["pipelines"].items():
+        before = baseline.get("pipelines", {}).get(name)
+        if not before:
+            continue
+        if before.get("rtf") and current["rtf"] > before["rtf"] * (1 + tolerance):
+            regressions.append((f"{name}.rtf", before["rtf"], current["rtf"]))
+        if before.get("peak_rss_mb") and current["peak_rss_mb"] and \
+                current["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+            regressions.append((f"{name}.peak_rss_mb", before["peak_rss_mb"], current["peak_rss_mb"]))
+        for stage, stats in current["stages"].items():
+            old = before.get("stages", {}).get(stage)
+            if old and old["p95_ms"] and stats["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+                regressions.append((f"{name}.{stage}.p95_ms", old["p95_ms"], stats["p95_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline latency/throughput benchmark of the speech pipelines")
+    parser.add_argument("--pipelines", nargs="+", choices=sorted(PIPELINES), default=list(PIPELINES),
+                        help="Pipelines to run (default: all)")
+    parser.add_argument("--target", default="hi", choices=sorted(voice_mapping), help="Target language code")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests per stage")
+    parser.add_argument("--recognizer-rtf", type=float, default=0.05, help="Fake recognizer time per audio second")
+    parser.add_argument("--segment-seconds", type=float, default=3.0, help="Audio per recognized segment")
+    parser.add_argument("--translate-latency", type=float, default=0.05, help="Seconds per translation request")
+    parser.add_argument("--translate-per-char", type=float, default=0.0001, help="Extra seconds per character")
+    parser.add_argument("--synth-latency", type=float, default=0.08, help="Seconds per synthesis request")
+    parser.add_argument("--synth-rtf", type=float, default=0.05, help="Extra synthesis time per output second")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of calls that fail (0-1)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for failure injection")
+    parser.add_argument("--endpoint-silence", type=float, default=2.0,
+                        help="Audio seconds of silence before the live recognizer finalizes an utterance")
+    parser.add_argument("--settle-seconds", type=float, default=0.5,
+                        help="Audio seconds without a new partial before speculating on the whole hypothesis")
+    parser.add_argument("--idle-timeout", type=float, default=5.0, help="Recognition idle timeout")
+    parser.add_argument("--output", default=default_output, help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_pipeline(args.child, args)))
+        return
+
+    results = {"config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "child")},
+               "pipelines": {}}
+    print(f"{'pipeline':<10}{'items':>7}{'wall s':>9}{'items/s':>9}{'RTF':>8}{'RSS MB':>8}   stage p50 / p95 / p99 ms")
+    for name in args.pipelines:
+        proc = subprocess.run([sys.executable, __file__, *sys.argv[1:], "--child", name],
+                              capture_output=True, text=True, cwd=script_dir)
+        if proc.returncode != 0:
+            print(proc.stderr)
+            sys.exit(proc.returncode)
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results["pipelines"][name] = result
+        stages = "; ".join(
+            f"{stage} {s['p50_ms']:.0f}/{s['p95_ms']:.0f}/{s['p99_ms']:.0f}" + (f" ({s['errors']} err)" if s["errors"] else "")
+            for stage, s in result["stages"].items()
+        )
+        rss = f"{result['peak_rss_mb']:.0f}" if result["peak_rss_mb"] is not None else "n/a"
+        print(f"{name:<10}{result['items']:>7}{result['wall_s']:>9.2f}{result['items_per_s']:>9.1f}"
+              f"{result['rtf']:>8.3f}{rss:>8}   {stages}")
+        if "speculation" in result:
+            spec = result["speculation"]
+            print(f"{'':<10}🔮 speculation hit rate {spec['hit_rate']:.0%} ({spec['hits']} reused, "
+                  f"{spec['patches']} patched, {spec['misses']} missed, {spec['wasted_guesses']} wasted guesses), "
+                  f"avg {spec['avg_saved_ms']} ms saved")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for key, before, after in regressions:
+            print(f"❌ {key} regressed: {before} → {after}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No pipeline regression against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from realtime_pipeline import percentile
+
+# Load generator for speech_service.py: concurrent WebSocket streams (audio
+# paced like a live speaker) and REST file jobs. Without --url it starts the
+# service in-process on the fake backends, so the whole path runs offline.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+assets_dir = os.path.join(script_dir, "assets")
+default_audio = os.path.join(assets_dir, "English_voice1.wav")
+default_output = os.path.join(script_dir, "Data", "benchmarks", "service.json")
+
+
+def start_fake_service(args):
+    """Run speech_service on the fake backends in a background thread; returns (base_url, server)."""
+    import uvicorn
+
+    from speech_service import ServiceLimits, SpeechService, fake_backends
+    from workspace import WORKSPACE_ROOT
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    limits = ServiceLimits(max_streams=args.max_streams, max_jobs=args.max_jobs)
+    service = SpeechService(fake_backends(), limits, os.path.join(WORKSPACE_ROOT, "fake-service"))
+    server = uvicorn.Server(uvicorn.Config(service.create_app(), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="speech-service", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+# ----------------------------- #
+# 🔹 WebSocket streams
+# ----------------------------- #
+async def run_stream(base_url, pcm, args, client_id):
+    """Send ``pcm`` in real-time-paced chunks and time the translated text and audio coming back."""
+    from websockets.asyncio.client import connect
+    from websockets.exceptions import ConnectionClosed
+
+    url = base_url.replace("http", "ws", 1) + f"/stream?target={args.target}"
+    chunk_bytes = int(16000 * args.chunk_ms / 1000) * 2
+    result = {"client": client_id, "utterances": 0, "translation_ms": [], "first_audio_ms": [],
+              "audio_bytes": 0, "rejected": False, "error": "", "wall_s": 0.0}
+    sent_at = []        # (audio seconds sent so far, perf_counter) after every chunk
+    utterance_end = {}  # seq -> audio second the utterance ends at
+    first_audio = {}    # seq -> when its first synthesized chunk arrived
+    start = time.perf_counter()
+
+    def sent_time(audio_second):
+        # When the audio up to ``audio_second`` had been sent (the earliest the server could know it)
+        for position, at in sent_at:
+            if position >= audio_second - 1e-6:
+                return at
+        return sent_at[-1][1] if sent_at else start
+
+    try:
+        async with connect(url, max_size=None) as ws:
+            ready = json.loads(await ws.recv())
+            if ready.get("type") != "ready":
+                result["error"] = f"unexpected first message {ready}"
+                return result
+
+            async def send():
+                for offset in range(0, len(pcm), chunk_bytes):
+                    await ws.send(pcm[offset:offset + chunk_bytes])
+                    sent_at.append(((offset + chunk_bytes) / 32000, time.perf_counter()))
+                    if args.speed > 0:
+                        await asyncio.sleep(args.chunk_ms / 1000 / args.speed)
+                await ws.send(json.dumps({"type": "end"}))
+
+            sender = asyncio.create_task(send())
+            speaking = None
+            async for message in ws:
+                if isinstance(message, bytes):
+                    result["audio_bytes"] += len(message)
+                    first_audio.setdefault(speaking, time.perf_counter())
+                    continue
+                event = json.loads(message)
+                now = time.perf_counter()
+                if event["type"] == "transcript":
+                    utterance_end[event["seq"]] = event["end"]
+                elif event["type"] == "translation":
+                    result["utterances"] += 1
+                    result["translation_ms"].append(1000 * (now - sent_time(utterance_end[event["seq"]])))
+                elif event["type"] == "audio_start":
+                    speaking = event["seq"]
+                elif event["type"] == "done":
+                    result["error"] = event.get("error", "")
+                    break
+            await sender
+    except ConnectionClosed as e:
+        code = e.rcvd.code if e.rcvd else None
+        result["rejected"] = code == 1013
+        result["error"] = f"closed {code}: {e.rcvd.reason if e.rcvd else ''}"
+    except OSError as e:
+        result["error"] = str(e)
+    # First audio: from the end of the utterance's audio to its first synthesized chunk
+    for seq, at in first_audio.items():
+        result["first_audio_ms"].append(1000 * (at - sent_time(utterance_end[seq])))
+    result["wall_s"] = time.perf_counter() - start
+    return result
+
+
+# ----------------------------- #
+# 🔹 REST file jobs
+# ----------------------------- #
+def run_job(base_url, path, args):
+    query = urllib.parse.urlencode({"targets": args.target, "filename": os.path.basename(path)})
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        request = urllib.request.Request(f"{base_url}/jobs?{query}", data=f.read(), method="POST",
+                                         headers={"Content-Type": "application/octet-stream"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            job = json.load(response)
+    except urllib.error.HTTPError as e:
+        return {"status": f"http {e.code}", "wall_s": time.perf_counter() - start, "rejected": e.code == 429}
+    while job["status"] in ("queued", "running"):
+        time.sleep(0.1)
+        with urllib.request.urlopen(f"{base_url}/jobs/{job['id']}") as response:
+            job = json.load(response)
+    return {"status": job["status"], "wall_s": time.perf_counter() - start, "queued_s": job["queued_s"],
+            "run_s": job["run_s"], "reused": job["reused"], "rejected": False}
+
+
+def summarize(values):
+    return {"p50": round(percentile(values, 50), 1), "p95": round(percentile(values, 95), 1), "count": len(values)}
+
+
+async def run_load(base_url, pcm, args):
+    job_path = args.job_file or args.audio
+    jobs = [asyncio.create_task(asyncio.to_thread(run_job, base_url, job_path, args)) for _ in range(args.jobs)]
+    streams = []
+    for client_id in range(args.streams):
+        streams.append(asyncio.create_task(run_stream(base_url, pcm, args, client_id)))
+        await asyncio.sleep(args.ramp_seconds / max(1, args.streams))
+    return await asyncio.gather(*streams), await asyncio.gather(*jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test speech_service.py with concurrent streams and file jobs")
+    parser.add_argument("--url", default=None, help="Service to test (default: start one on the fake backends)")
+    parser.add_argument("--streams", type=int, default=8, help="Concurrent WebSocket clients")
+    parser.add_argument("--jobs", type=int, default=2, help="File jobs submitted alongside the streams")
+    parser.add_argument("--audio", default=default_audio, help="Audio each stream sends (decoded to 16 kHz mono PCM)")
+    parser.add_argument("--job-file", default=None, help="Media uploaded by each file job (default: --audio)")
+    parser.add_argument("--target", default="hi")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="Audio per WebSocket message")
+    parser.add_argument("--speed", type=float, default=1.0, help="Send audio at this multiple of real time (0 = unpaced)")
+    parser.add_argument("--ramp-seconds", type=float, default=1.0, help="Spread client connections over this long")
+    parser.add_argument("--max-streams", type=int, default=8, help="In-process service only: stream limit")
+    parser.add_argument("--max-jobs", type=int, default=2, help="In-process service only: running job limit")
+    parser.add_argument("--output", default=default_output, help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    from audio_normalize import decode_to_pcm
+
+    pcm = decode_to_pcm(args.audio)
+    server = None
+    base_url = args.url
+    if base_url is None:
+        base_url, server = start_fake_service(args)
+    start = time.perf_counter()
+    try:
+        streams, jobs = asyncio.run(run_load(base_url.rstrip("/"), pcm, args))
+    finally:
+        if server is not None:
+            server.should_exit = True
+    wall = time.perf_counter() - start
+
+    served = [s for s in streams if not s["rejected"] and not s["error"]]
+    audio_seconds = len(pcm) / 32000 * len(served)
+    results = {
+        "streams": len(streams),
+        "served": len(served),
+        "rejected": sum(s["rejected"] for s in streams),
+        "failed": sum(bool(s["error"]) and not s["rejected"] for s in streams),
+        "utterances": sum(s["utterances"] for s in served),
+        "translation_ms": summarize([ms for s in served for ms in s["translation_ms"]]),
+        "first_audio_ms": summarize([ms for s in served for ms in s["first_audio_ms"]]),
+        "audio_in_seconds": round(audio_seconds, 1),
+        "audio_out_seconds": round(sum(s["audio_bytes"] for s in served) / 32000, 1),
+        "jobs": {status: sum(j["status"] == status for j in jobs) for status in {j["status"] for j in jobs}},
+        "job_wall_s": summarize([1000 * j["wall_s"] for j in jobs if not j["rejected"]]),
+        "wall_s": round(wall, 2),
+    }
+    print(f"🌐 {base_url}: {len(streams)} streams ({results['served']} served, {results['rejected']} rejected, "
+          f"{results['failed']} failed), {args.jobs} file jobs, {wall:.1f}s")
+    print(f"🗣️ {results['utterances']} utterances; translation p50 {results['translation_ms']['p50']:.0f} ms / "
+          f"p95 {results['translation_ms']['p95']:.0f} ms after the speaker stopped")
+    print(f"🔊 First dubbed audio p50 {results['first_audio_ms']['p50']:.0f} ms / "
+          f"p95 {results['first_audio_ms']['p95']:.0f} ms; {results['audio_out_seconds']:.1f}s of audio returned")
+    print(f"📦 Jobs {results['jobs']}, wall p50 {results['job_wall_s']['p50'] / 1000:.2f}s")
+    for s in streams:
+        if s["error"]:
+            print(f"   client {s['client']}: {s['error']}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"args": vars(args), "results": results}, f, indent=2)
+    print(f"📝 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
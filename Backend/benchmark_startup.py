@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Measures Streamlit cold start (fresh interpreter, first render of app.py) and
+# the overhead of each rerun triggered by a widget interaction.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+app_path = os.path.join(script_dir, "app.py")
+default_output = os.path.join(script_dir, "Data", "benchmarks", "startup.json")
+
+
+def measure_once(reruns):
+    """Runs inside a fresh interpreter so module imports are really cold."""
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    import_seconds = time.perf_counter() - start
+
+    at = AppTest.from_file(app_path, default_timeout=60)
+    start = time.perf_counter()
+    at.run()
+    first_render = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"app.py raised during first render: {at.exception}")
+    # What the first render pulled in, before any rerun can import more
+    heavy = ["azure.cognitiveservices.speech", "moviepy.editor", "deep_translator", "numpy"]
+    heavy_loaded = [m for m in heavy if m in sys.modules]
+
+    rerun_times = []
+    languages = at.selectbox[0].options
+    for i in range(reruns):
+        at.selectbox[0].select(languages[i % len(languages)])
+        start = time.perf_counter()
+        at.run()
+        rerun_times.append(time.perf_counter() - start)
+
+    return {
+        "streamlit_import_s": round(import_seconds, 4),
+        "first_render_s": round(first_render, 4),
+        "rerun_mean_s": round(sum(rerun_times) / len(rerun_times), 4) if rerun_times else 0.0,
+        "rerun_max_s": round(max(rerun_times), 4) if rerun_times else 0.0,
+        "heavy_modules_loaded": heavy_loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app.py time-to-first-render and per-rerun overhead")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts to measure (each in a new process)")
+    parser.add_argument("--reruns", type=int, default=10, help="Widget-triggered reruns per cold start")
+    parser.add_argument("--output", default=default_output, help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_once(args.reruns)))
+        return
+
+    samples = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, __file__, "--child", "--reruns", str(args.reruns)],
+                              capture_output=True, text=True, cwd=script_dir)
+        wall = time.perf_counter() - start
+        if proc.returncode != 0:
+            print(proc.stderr)
+            sys.exit(proc.returncode)
+        sample = json.loads(proc.stdout.strip().splitlines()[-1])
+        sample["process_wall_s"] = round(wall, 4)
+        samples.append(sample)
+
+    def median(key):
+        values = sorted(s[key] for s in samples)
+        return values[len(values) // 2]
+
+    results = {
+        "first_render_s": median("first_render_s"),
+        "rerun_mean_s": median("rerun_mean_s"),
+        "process_wall_s": median("process_wall_s"),
+        "heavy_modules_loaded": samples[-1]["heavy_modules_loaded"],
+        "samples": samples,
+    }
+    print(f"⏱️ First render: {results['first_render_s'] * 1000:.0f} ms, "
+          f"rerun: {results['rerun_mean_s'] * 1000:.1f} ms, "
+          f"cold process: {results['process_wall_s']:.2f} s")
+    print(f"📦 Heavy modules loaded at first render: {results['heavy_modules_loaded'] or 'none'}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = [
+            key for key in ("first_render_s", "rerun_mean_s")
+            if baseline.get(key) and results[key] > baseline[key] * (1 + args.tolerance)
+        ]
+        for key in regressions:
+            print(f"❌ {key} regressed: {baseline[key]:.4f}s → {results[key]:.4f}s")
+        if regressions:
+            sys.exit(1)
+        print("✅ No startup regression against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import time
+
+from dubbing import DUB_SAMPLE_RATE, read_pcm
+from vad import compress_silence, detect_speech
+
+# Reports how much audio the VAD keeps out of recognition for the bundled samples
+script_dir = os.path.dirname(os.path.abspath(__file__))
+assets_dir = os.path.join(script_dir, "assets")
+
+wav_files = sorted(f for f in os.listdir(assets_dir) if f.endswith(".wav"))
+if not wav_files:
+    print(f"No .wav files found in {assets_dir}")
+    raise SystemExit(0)
+
+print(f"{'file':<24}{'audio s':>9}{'speech s':>10}{'sent s':>8}{'removed s':>11}{'removed':>9}{'vad ms':>8}")
+totals = {"audio": 0.0, "sent": 0.0, "vad": 0.0}
+for name in wav_files:
+    samples = read_pcm(os.path.join(assets_dir, name), DUB_SAMPLE_RATE)
+    start = time.perf_counter()
+    speech_map = detect_speech(samples, DUB_SAMPLE_RATE)
+    compressed, _ = compress_silence(samples, speech_map)
+    elapsed = time.perf_counter() - start
+
+    audio_s = speech_map.total_seconds
+    sent_s = len(compressed) / DUB_SAMPLE_RATE
+    removed_s = audio_s - sent_s
+    totals["audio"] += audio_s
+    totals["sent"] += sent_s
+    totals["vad"] += elapsed
+    print(f"{name:<24}{audio_s:>9.2f}{speech_map.speech_seconds:>10.2f}{sent_s:>8.2f}{removed_s:>11.2f}"
+          f"{removed_s / audio_s if audio_s else 0:>9.0%}{elapsed * 1000:>8.1f}")
+
+removed = totals["audio"] - totals["sent"]
+print(f"\n✂️ Removed {removed:.2f}s of {totals['audio']:.2f}s "
+      f"({removed / totals['audio']:.0%}) in {totals['vad'] * 1000:.1f} ms of VAD time")
@@ -0,0 +1,156 @@
+import os
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from tracing import get_tracer
+from translation_cache import cached_translate
+from tts_cache import cached_synthesize
+
+# Mixing rate. Pooled synthesizers request Riff16Khz16BitMonoPcm explicitly
+# (speech_clients.DEFAULT_OUTPUT_FORMAT); the SDK default, Riff24Khz16BitMonoPcm,
+# is resampled by read_pcm.
+DUB_SAMPLE_RATE = 16000
+
+
+# ----------------------------- #
+# 🔹 PCM helpers
+# ----------------------------- #
+def read_pcm(path, sample_rate=DUB_SAMPLE_RATE):
+    """Read a 16-bit WAV as mono int16 samples at ``sample_rate``."""
+    with wave.open(path, "rb") as w:
+        channels, rate, width = w.getnchannels(), w.getframerate(), w.getsampwidth()
+        frames = w.readframes(w.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: expected 16-bit PCM, got {8 * width}-bit")
+    samples = np.frombuffer(frames, dtype="<i2")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate and len(samples):
+        positions = np.arange(0, len(samples), rate / sample_rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return np.asarray(samples).astype(np.int16)
+
+
+def write_pcm(path, samples, sample_rate=DUB_SAMPLE_RATE):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+
+
+# ----------------------------- #
+# 🔹 Segment dubbing
+# ----------------------------- #
+@dataclass
+class DubbedSegment:
+    segment: object          # recognition.Segment with offset/duration in seconds
+    translated: str = ""
+    audio_path: str = ""
+    error: str = ""
+
+
+class SegmentDubber:
+    """
+    Translates and synthesizes recognized segments on a thread pool.
+    ``submit`` can be used directly as the recognizer's ``on_segment`` callback,
+    so dubbing starts while recognition is still running.
+    """
+
+    def __init__(self, target_lang, voice, synthesize, translate=cached_translate, max_workers=4, cache=None):
+        self.target_lang = target_lang
+        self.voice = voice
+        self.synthesize = synthesize
+        self.translate = translate
+        self.cache = cache          # tts_cache.SynthesisCache, default: the shared one
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self._futures = []
+        self._lock = threading.Lock()
+        # Segments arrive on recognizer/pool threads; keep their spans under the caller's job
+        self._parent_span = get_tracer().current()
+
+    def _dub(self, segment):
+        dubbed = DubbedSegment(segment=segment)
+        with get_tracer().activate(self._parent_span):
+            try:
+                dubbed.translated = self.translate(segment.text, self.target_lang)
+                dubbed.audio_path = cached_synthesize(self.synthesize, dubbed.translated, self.voice,
+                                                       cache=self.cache)
+            except Exception as e:
+                dubbed.error = str(e)
+        return dubbed
+
+    def submit(self, segment):
+        future = self._pool.submit(self._dub, segment)
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def results(self):
+        """Wait for every submitted segment and return them ordered by offset."""
+        with self._lock:
+            futures = list(self._futures)
+        dubbed = [f.result() for f in futures]
+        self._pool.shutdown(wait=True)
+        return sorted(dubbed, key=lambda d: d.segment.offset)
+
+
+@dataclass
+class DubbedText:
+    target_lang: str
+    translated: str = ""
+    audio_path: str = ""
+    error: str = ""
+
+
+def dub_text_languages(text, targets, synthesize, out_dir, translate=cached_translate, prefix="dubbed"):
+    """
+    Translate ``text`` into every language of ``targets`` (code → voice) and
+    synthesize each translation, all languages concurrently. Audio is written
+    to ``out_dir/<prefix>_<code>.wav``. Returns ``{code: DubbedText}`` in
+    ``targets`` order.
+    """
+    parent_span = get_tracer().current()
+
+    def dub(lang):
+        dubbed = DubbedText(target_lang=lang)
+        with get_tracer().activate(parent_span):
+            try:
+                dubbed.translated = translate(text, lang)
+                dubbed.audio_path = cached_synthesize(synthesize, dubbed.translated, targets[lang],
+                                                      out_path=os.path.join(out_dir, f"{prefix}_{lang}.wav"))
+            except Exception as e:
+                dubbed.error = str(e)
+        return dubbed
+
+    with ThreadPoolExecutor(max_workers=max(1, len(targets))) as pool:
+        return dict(zip(targets, pool.map(dub, targets)))
+
+
+def mix_segments(dubbed, total_duration, out_path, sample_rate=DUB_SAMPLE_RATE):
+    """
+    Lay every synthesized segment into one track at its original offset.
+    Overlapping audio is summed and clipped; anything past ``total_duration``
+    is dropped. Returns the number of segments placed.
+    """
+    with get_tracer().span("mix", segments=len(dubbed)) as span:
+        track = np.zeros(int(round(total_duration * sample_rate)), dtype=np.int16)
+        placed = 0
+        for item in dubbed:
+            if item.error or not item.audio_path:
+                continue
+            start = int(round(item.segment.offset * sample_rate))
+            if start >= len(track):
+                continue
+            samples = read_pcm(item.audio_path, sample_rate)[:len(track) - start]
+            end = start + len(samples)
+            mixed = track[start:end].astype(np.int32) + samples
+            track[start:end] = np.clip(mixed, -32768, 32767).astype(np.int16)
+            placed += 1
+        write_pcm(out_path, track, sample_rate)
+        span.set("bytes", track.nbytes)
+    return placed
@@ -0,0 +1,298 @@
+import hashlib
+import os
+import queue
+import threading
+import time
+import unicodedata
+import wave
+
+import numpy as np
+
+from recognition import Segment, wav_duration
+from tts_cache import SynthesisError
+
+# Local stand-ins for the cloud services, used for offline checks and timing runs.
+
+
+class FailureInjector:
+    """
+    Decides injected failures from a hash of (seed, call key, attempt number),
+    so a run fails the same calls every time whatever the thread scheduling,
+    and a retried call can still succeed.
+    """
+
+    def __init__(self, failure_rate=0.0, seed=0):
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    def should_fail(self, key):
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+            self.calls += 1
+        if self.failure_rate <= 0:
+            return False
+        digest = hashlib.sha256(f"{self.seed}\x00{key}\x00{attempt}".encode("utf-8")).digest()
+        failed = int.from_bytes(digest[:8], "big") / 2 ** 64 < self.failure_rate
+        if failed:
+            with self._lock:
+                self.failures += 1
+        return failed
+
+
+# ----------------------------- #
+# 🔹 Fake recognizer
+# ----------------------------- #
+class FakeRecognizer:
+    """
+    Deterministic recognizer: emits one segment every ``segment_seconds`` of
+    audio and finishes after ``audio_duration * realtime_factor`` seconds.
+    While a segment is "spoken" it sends word-by-word partial hypotheses
+    (lower-case, without punctuation, like the service's) to ``on_partial``;
+    the final result follows ``endpoint_silence`` audio seconds after the last word.
+    With ``failure_rate`` a session is canceled with an error (a file session before its first segment).
+    """
+
+    def __init__(self, realtime_factor=0.1, segment_seconds=3.0, language="en-IN", transcripts=None,
+                 failure_rate=0.0, seed=0, endpoint_silence=0.0):
+        self.realtime_factor = realtime_factor
+        self.segment_seconds = segment_seconds
+        self.endpoint_silence = endpoint_silence
+        self.language = language
+        self.transcripts = transcripts or {}
+        self.failures = FailureInjector(failure_rate, seed)
+
+    def _segments(self, audio_path):
+        duration = wav_duration(audio_path)
+        name = os.path.basename(audio_path)
+        texts = self.transcripts.get(name)
+        count = max(1, int(duration // self.segment_seconds)) if duration else 1
+        if texts is None:
+            texts = [f"{name} segment {i + 1}" for i in range(count)]
+        step = duration / len(texts) if duration else 0.0
+        return [
+            Segment(text=t, offset=i * step, duration=step, language=self.language)
+            for i, t in enumerate(texts)
+        ]
+
+    @staticmethod
+    def _partials(text):
+        """Word-by-word hypotheses, each with its share of the speaking time (a pause follows every sentence)."""
+        partials, words, weight = [], [], 1.0
+        for token in text.split():
+            word = "".join(c for c in token if not unicodedata.category(c).startswith("P")).lower()
+            if word:
+                words.append(word)
+                partials.append((" ".join(words), weight))
+                weight = 4.0 if token[-1] in ".!?" else 1.0
+        return partials
+
+    def _speak(self, seg, on_partial, stop_event):
+        # False once stop() has been called
+        partials = (self._partials(seg.text) if on_partial is not None else None) or [(None, 1.0)]
+        step = seg.duration * self.realtime_factor / sum(weight for _, weight in partials)
+        for partial, weight in partials:
+            if stop_event.wait(step * weight):
+                return False
+            if partial is not None:
+                on_partial(partial)
+        return not stop_event.wait(self.endpoint_silence * self.realtime_factor)
+
+    def start(self, audio_path, on_segment, on_done, on_progress=None, on_partial=None):
+        stop_event = threading.Event()
+        segments = self._segments(audio_path)
+        if self.failures.should_fail(os.path.basename(audio_path)):
+            segments = None
+
+        def run():
+            if segments is None:
+                on_done("Injected recognition failure")
+                return
+            for seg in segments:
+                if not self._speak(seg, on_partial, stop_event):
+                    break
+                on_segment(seg)
+            on_done("")
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        return stop_event, worker
+
+    def stop(self, handle):
+        stop_event, worker = handle
+        stop_event.set()
+        worker.join()
+
+    def open_stream(self, on_segment, on_done, on_partial=None, sample_rate=16000):
+        """Push-stream variant (see recognition.PushRecognition): one segment per ``segment_seconds`` of PCM written."""
+        return _FakePushRecognition(self, on_segment, on_done, on_partial, sample_rate)
+
+    def start_source(self, source, on_segment, on_done, on_progress=None, on_partial=None, block_bytes=6400):
+        """
+        Pull variant (see recognition.recognize_stream): reads ``source`` in
+        ``block_bytes`` blocks only as fast as the segments are "spoken", one
+        segment ahead at most, like the SDK pulling from a callback.
+        """
+        recognition = _FakePushRecognition(self, on_segment, on_done, on_partial, source.sample_rate, max_pending=1)
+
+        def pull():
+            buffer = bytearray(block_bytes)
+            view = memoryview(buffer)
+            while not recognition._stop.is_set():
+                n = source.readinto(buffer)
+                if not n:
+                    break
+                recognition.write(view[:n])
+            recognition.close()
+            if recognition._stop.is_set():
+                recognition.stop()
+            recognition._worker.join()
+
+        reader = threading.Thread(target=pull, daemon=True)
+        reader.start()
+        return recognition._stop, reader
+
+
+class _FakePushRecognition:
+    # Segment texts come from transcripts["stream"] (cycled) when given. An
+    # injected failure is decided on close(), keyed by the length of audio
+    # written, and cancels the session before its remaining segments.
+    MIN_LAST_SECONDS = 0.5
+
+    def __init__(self, recognizer, on_segment, on_done, on_partial, sample_rate, max_pending=0):
+        self.recognizer = recognizer
+        self.on_segment = on_segment
+        self.on_done = on_done
+        self.on_partial = on_partial
+        self.sample_rate = sample_rate
+        self.received = 0.0     # seconds of audio written
+        self.assigned = 0.0     # seconds of audio already turned into segments
+        self.count = 0
+        self._failed = False
+        self._segments = queue.Queue(max_pending)
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def _segment(self, duration):
+        texts = self.recognizer.transcripts.get("stream")
+        text = texts[self.count % len(texts)] if texts else f"Stream segment {self.count + 1}."
+        self._put(Segment(text=text, offset=self.assigned, duration=duration, language=self.recognizer.language))
+        self.assigned += duration
+        self.count += 1
+
+    def _put(self, item):
+        # Blocks while ``max_pending`` segments wait to be spoken, until stop()
+        while not self._stop.is_set():
+            try:
+                self._segments.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def write(self, pcm):
+        self.received += len(pcm) / 2 / self.sample_rate
+        while self.received - self.assigned >= self.recognizer.segment_seconds:
+            self._segment(self.recognizer.segment_seconds)
+
+    def close(self):
+        if self.recognizer.failures.should_fail(f"stream\x00{self.received:.3f}"):
+            self._failed = True
+        elif self.received - self.assigned >= self.MIN_LAST_SECONDS:
+            self._segment(self.received - self.assigned)
+        self._put(None)
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self._segments.put_nowait(None)
+        except queue.Full:
+            pass    # the worker isn't waiting for a segment; it sees the stop after this one
+        self._worker.join()
+
+    def _run(self):
+        while True:
+            seg = self._segments.get()
+            if seg is None or self._failed:
+                break
+            if not self.recognizer._speak(seg, self.on_partial, self._stop):
+                return
+            self.on_segment(seg)
+        if not self._stop.is_set():
+            self.on_done("Injected recognition failure" if self._failed else "")
+
+
+# ----------------------------- #
+# 🔹 Fake translator
+# ----------------------------- #
+class FakeTranslator:
+    """
+    ``translator(text, target, source)`` stand-in: tags every line with the
+    target code, keeping the line structure that packed batches rely on.
+    Each call sleeps ``latency + per_char * len(text)`` seconds.
+    """
+
+    def __init__(self, latency=0.05, per_char=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.per_char = per_char
+        self.failures = FailureInjector(failure_rate, seed)
+
+    def __call__(self, text, target, source="auto"):
+        time.sleep(self.latency + self.per_char * len(text))
+        if self.failures.should_fail(f"{target}\x00{text}"):
+            raise RuntimeError("Injected translation failure")
+        return "\n".join(f"[{target}] {line}" for line in text.split("\n"))
+
+
+# ----------------------------- #
+# 🔹 Fake synthesizer
+# ----------------------------- #
+class FakeSynthesizer:
+    """
+    ``synthesize(text, voice, path, ssml)`` stand-in for tts_cache: writes a
+    16 kHz mono tone lasting ``seconds_per_char`` per character after
+    sleeping ``latency`` plus ``realtime_factor`` times that duration.
+    """
+
+    output_format = "fake-riff-16khz-16bit-mono"
+
+    def __init__(self, latency=0.1, realtime_factor=0.0, seconds_per_char=0.06, sample_rate=16000,
+                 failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.realtime_factor = realtime_factor
+        self.seconds_per_char = seconds_per_char
+        self.sample_rate = sample_rate
+        self.failures = FailureInjector(failure_rate, seed)
+
+    def _tone(self, text, voice):
+        seconds = max(0.1, len(text) * self.seconds_per_char)
+        # Pitch depends on the voice so mixed tracks are distinguishable by ear
+        pitch = 180 + int(hashlib.sha256(voice.encode("utf-8")).hexdigest()[:4], 16) % 240
+        t = np.arange(int(seconds * self.sample_rate)) / self.sample_rate
+        return (6000 * np.sin(2 * np.pi * pitch * t)).astype(np.int16)
+
+    def __call__(self, text, voice, path, ssml=False):
+        samples = self._tone(text, voice)
+        time.sleep(self.latency + self.realtime_factor * len(samples) / self.sample_rate)
+        if self.failures.should_fail(f"{voice}\x00{text}"):
+            raise SynthesisError("Speech synthesis canceled: Injected synthesis failure")
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(samples.tobytes())
+
+    def stream(self, text, voice, chunk_seconds=0.2):
+        """Streaming variant: raw PCM chunks, the first after ``latency``, the rest paced by ``realtime_factor``."""
+        samples = self._tone(text, voice)
+        time.sleep(self.latency)
+        if self.failures.should_fail(f"{voice}\x00{text}"):
+            raise SynthesisError("Speech synthesis canceled: Injected synthesis failure")
+        step = int(chunk_seconds * self.sample_rate)
+        for start in range(0, len(samples), step):
+            time.sleep(self.realtime_factor * chunk_seconds)
+            yield samples[start:start + step].tobytes()
@@ -0,0 +1,154 @@
+import functools
+import unicodedata
+from dataclasses import dataclass
+from xml.sax.saxutils import escape, quoteattr
+
+from languages import DEFAULT_VOICE, voice_mapping
+from streaming_tts import split_sentences
+from translation_cache import normalize_text
+
+try:
+    from langdetect import DetectorFactory, detect as langdetect_detect
+    DetectorFactory.seed = 0   # langdetect is randomized; make repeated runs agree
+except Exception:
+    langdetect_detect = None
+
+# Azure rejects SSML documents with more than 50 <voice> elements
+MAX_VOICE_ELEMENTS = 50
+# Statistical detection is unreliable on short spans; those follow their neighbours
+MIN_DETECT_CHARS = 20
+# A run in another script shorter than this stays in the surrounding voice
+# (an English word inside a Hindi sentence is read by the Hindi voice)
+MIN_RUN_WORDS = 3
+
+# langdetect code → voice_mapping code, where they differ
+DETECTED_CODES = {"zh-cn": "zh-CN", "zh-tw": "zh-TW", "pt": "pt-BR"}
+
+# Unicode script (first word of the character name) → language to use when detection can't tell
+SCRIPT_LANGUAGES = {
+    "DEVANAGARI": "hi", "TAMIL": "ta", "ARABIC": "ar", "THAI": "th", "HANGUL": "ko",
+    "HIRAGANA": "ja", "KATAKANA": "ja", "CJK": "zh-CN", "CYRILLIC": "ru",
+}
+
+
+@dataclass
+class LanguageRun:
+    language: str    # voice_mapping code
+    text: str
+
+
+def script_of(word):
+    """Script of the first letter in ``word`` (e.g. "LATIN", "DEVANAGARI"), or "" for digits and punctuation."""
+    for c in word:
+        if c.isalpha():
+            try:
+                return unicodedata.name(c).split()[0]
+            except ValueError:
+                return ""
+    return ""
+
+
+@functools.lru_cache(maxsize=4096)
+def detect_language(text):
+    """
+    Memoized langdetect result mapped onto voice_mapping codes; "" when
+    langdetect is missing, fails, or names a language we have no voice for.
+    """
+    if langdetect_detect is None:
+        return ""
+    try:
+        code = langdetect_detect(text)
+    except Exception:
+        return ""
+    code = DETECTED_CODES.get(code, code)
+    return code if code in voice_mapping else ""
+
+
+def script_runs(sentence):
+    """Split a sentence where the script changes; runs shorter than MIN_RUN_WORDS are folded into a neighbour."""
+    runs = []   # [script, [words]]
+    for word in sentence.split():
+        script = script_of(word)
+        if runs and (not script or script == runs[-1][0] or not runs[-1][0]):
+            runs[-1][0] = runs[-1][0] or script
+            runs[-1][1].append(word)
+        else:
+            runs.append([script, [word]])
+    merged = []
+    for script, words in runs:
+        if merged and (len(words) < MIN_RUN_WORDS or len(merged[-1][1]) < MIN_RUN_WORDS):
+            # Keep the script of whichever side has more words
+            if len(words) > len(merged[-1][1]):
+                merged[-1][0] = script
+            merged[-1][1].extend(words)
+        else:
+            merged.append([script, words])
+    return [(script, " ".join(words)) for script, words in merged]
+
+
+def _cap_runs(runs, max_runs):
+    # Fold the shortest run into its previous (or next) neighbour until the document is small enough
+    while len(runs) > max_runs:
+        i = min(range(len(runs)), key=lambda k: len(runs[k].text))
+        j = i - 1 if i > 0 else i + 1
+        first, second = sorted((i, j))
+        runs[first] = LanguageRun(runs[j].language, f"{runs[first].text} {runs[second].text}")
+        del runs[second]
+        # The merged run may now match its other neighbours
+        for k in (first + 1, first):
+            if 0 < k < len(runs) and runs[k - 1].language == runs[k].language:
+                runs[k - 1] = LanguageRun(runs[k].language, f"{runs[k - 1].text} {runs[k].text}")
+                del runs[k]
+    return runs
+
+
+def split_by_language(text, default="en", max_runs=MAX_VOICE_ELEMENTS):
+    """
+    Detect the language of every sentence (and of every script run inside a
+    mixed-script sentence) and merge neighbours in the same language.
+
+    Spans too short to detect, or detected as a language without a voice,
+    take the script's usual language (Devanagari → Hindi). Latin-script
+    spans take the language of the previous Latin-script span, else that of
+    the whole text when it is written in Latin script, else ``default``.
+    """
+    document_language = detect_language(normalize_text(text))
+    if not document_language or document_language in SCRIPT_LANGUAGES.values():
+        document_language = default
+    last_by_script = {}
+    runs = []
+    for sentence in split_sentences(text):
+        for script, run_text in script_runs(sentence):
+            language = ""
+            if len(run_text) >= MIN_DETECT_CHARS:
+                language = detect_language(normalize_text(run_text))
+            language = (language or SCRIPT_LANGUAGES.get(script) or last_by_script.get(script)
+                        or document_language)
+            last_by_script[script] = language
+            if runs and runs[-1].language == language:
+                runs[-1].text = f"{runs[-1].text} {run_text}"
+            else:
+                runs.append(LanguageRun(language, run_text))
+    return _cap_runs(runs, max_runs)
+
+
+def build_ssml(runs, voices=voice_mapping):
+    """One SSML document that switches to each run's voice, so a mixed text is a single synthesis call."""
+    first_voice = voices.get(runs[0].language, DEFAULT_VOICE) if runs else DEFAULT_VOICE
+    locale = "-".join(first_voice.split("-")[:2])
+    body = "".join(
+        f"<voice name={quoteattr(voices.get(run.language, DEFAULT_VOICE))}>{escape(run.text)}</voice>"
+        for run in runs
+    )
+    return f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{locale}">{body}</speak>'
+
+
+if __name__ == "__main__":
+    # Show how a text file is split into voices, e.g. python language_segments.py Data/translated.txt
+    import sys
+
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        sample = f.read()
+    for run in split_by_language(sample):
+        print(f"{run.language:>6} {voice_mapping.get(run.language, DEFAULT_VOICE):<24} {run.text}")
+    print(f"\n{build_ssml(split_by_language(sample))}")
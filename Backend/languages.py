@@ -0,0 +1,58 @@
+# Language and voice tables shared by the app. Kept in a module so they are
+# built once per process instead of on every Streamlit rerun.
+
+# Display name → translation language code
+language_options = {
+    "English": "en", "Hindi": "hi", "French": "fr", "German": "de",
+    "Spanish": "es", "Italian": "it", "Japanese": "ja", "Korean": "ko",
+    "Russian": "ru", "Portuguese (Portugal)": "pt-PT", "Portuguese (Brazil)": "pt-BR",
+    "Chinese (Simplified)": "zh-CN", "Chinese (Traditional)": "zh-TW",
+    "Arabic": "ar", "Turkish": "tr", "Thai": "th", "Dutch": "nl",
+    "Swedish": "sv", "Polish": "pl", "Tamil": "ta"
+}
+
+# Language code → Azure neural voice
+voice_mapping = {
+    "en": "en-US-AriaNeural", "hi": "hi-IN-SwaraNeural", "fr": "fr-FR-DeniseNeural",
+    "de": "de-DE-KatjaNeural", "es": "es-ES-ElviraNeural", "it": "it-IT-ElsaNeural",
+    "ja": "ja-JP-NanamiNeural", "ko": "ko-KR-SunHiNeural", "ru": "ru-RU-DariyaNeural",
+    "pt-PT": "pt-PT-FernandaNeural", "pt-BR": "pt-BR-FranciscaNeural",
+    "zh-CN": "zh-CN-XiaoxiaoNeural", "zh-TW": "zh-TW-HsiaoChenNeural",
+    "ar": "ar-EG-SalmaNeural", "tr": "tr-TR-EmelNeural", "th": "th-TH-PremwadeeNeural",
+    "nl": "nl-NL-ColetteNeural", "sv": "sv-SE-HilleviNeural", "pl": "pl-PL-ZofiaNeural",
+    "ta": "ta-IN-PallaviNeural"
+}
+
+DEFAULT_VOICE = "en-US-AriaNeural"
+
+# Language code → display name
+language_names = {code: name for name, code in language_options.items()}
+
+# Language code → ISO 639-2 tag, used for audio track metadata in dubbed videos
+track_languages = {
+    "en": "eng", "hi": "hin", "fr": "fra", "de": "deu", "es": "spa", "it": "ita",
+    "ja": "jpn", "ko": "kor", "ru": "rus", "pt-PT": "por", "pt-BR": "por",
+    "zh-CN": "zho", "zh-TW": "zho", "ar": "ara", "tr": "tur", "th": "tha",
+    "nl": "nld", "sv": "swe", "pl": "pol", "ta": "tam"
+}
+
+# Languages written without spaces between sentences
+unspaced_languages = {"ja", "zh-CN", "zh-TW"}
+
+# Source punctuation → its full-width form in those languages
+_full_width_punctuation = {".": "。", "!": "！", "?": "？", ",": "，", ";": "；", ":": "：", "।": "。", "॥": "。"}
+full_width_punctuation = {
+    "ja": {**_full_width_punctuation, ",": "、"},
+    "zh-CN": _full_width_punctuation,
+    "zh-TW": _full_width_punctuation,
+}
+
+
+def join_sentences(parts, code):
+    """Join translated sentences/utterances the way ``code`` is written."""
+    return ("" if code in unspaced_languages else " ").join(p for p in parts if p)
+
+
+def target_punctuation(mark, code):
+    """``mark`` (a clause or sentence end from the source text) as it is written in ``code``."""
+    return full_width_punctuation.get(code, {}).get(mark, mark)
@@ -0,0 +1,67 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from audio_sources import MemorySource
+from dubbing import DUB_SAMPLE_RATE, read_pcm
+from recognition import RecognitionResult, Segment, recognize_stream
+from tracing import get_tracer
+from vad import chunk_speech, detect_speech
+
+MAX_CHUNK_SECONDS = 30.0
+
+
+# ----------------------------- #
+# 🔹 Long-form recognition
+# ----------------------------- #
+def recognize_long_form(backend, audio, max_workers=4, max_chunk_seconds=MAX_CHUNK_SECONDS, idle_timeout=15.0,
+                        on_segment=None):
+    """
+    Recognize a whole recording of any length: split its speech regions into
+    bounded chunks, recognize the chunks concurrently and stitch the segments
+    back together in order with timestamps relative to the full file.
+    Leading/trailing silence and long pauses are never sent for recognition.
+
+    ``audio`` is a WAV path, or 16 kHz mono PCM already in memory (bytes from
+    audio_normalize.decode_to_pcm, or int16 samples). Chunks are pushed to
+    the recognizer straight from the samples, never written out.
+
+    ``on_segment`` is called with each stitched segment, in order, as soon as
+    every chunk before it has been recognized.
+    """
+    if isinstance(audio, str):
+        samples = read_pcm(audio, DUB_SAMPLE_RATE)
+    else:
+        samples = np.frombuffer(audio, dtype="<i2") if isinstance(audio, (bytes, bytearray)) else audio
+    ranges = chunk_speech(detect_speech(samples, DUB_SAMPLE_RATE), max_chunk_seconds, samples=samples)
+    result = RecognitionResult(audio_duration=len(samples) / DUB_SAMPLE_RATE)
+    tracer = get_tracer()
+    span = tracer.span("recognize_long_form", audio_seconds=round(result.audio_duration, 3), chunks=len(ranges))
+
+    def recognize_chunk(sample_range):
+        begin, end = sample_range
+        with tracer.activate(span):
+            return recognize_stream(backend, MemorySource(samples[begin:end], DUB_SAMPLE_RATE),
+                                    idle_timeout=idle_timeout)
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = [pool.submit(recognize_chunk, sample_range) for sample_range in ranges]
+        # Stitched in chunk order; a chunk's segments go out once it and every earlier chunk are done
+        for (begin, _), future in zip(ranges, futures):
+            chunk = future.result()
+            chunk_offset = begin / DUB_SAMPLE_RATE
+            for s in chunk.segments:
+                segment = Segment(text=s.text, offset=s.offset + chunk_offset,
+                                  duration=s.duration, language=s.language)
+                result.segments.append(segment)
+                if on_segment:
+                    on_segment(segment)
+            if chunk.error and not result.error:
+                result.error = chunk.error
+            result.timed_out = result.timed_out or chunk.timed_out
+    result.wall_time = time.perf_counter() - start_time
+    span.set("segments", len(result.segments))
+    span.end(result.error)
+    return result
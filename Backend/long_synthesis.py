@@ -0,0 +1,152 @@
+import os
+import shutil
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from language_segments import LanguageRun, build_ssml
+from languages import DEFAULT_VOICE, voice_mapping
+from streaming_tts import split_sentences
+from tracing import get_tracer
+from tts_cache import SynthesisError, cached_synthesize
+
+# Well under the service's per-request limits (64 KB of SSML, 10 minutes of
+# audio) and small enough that a long text is split across several workers
+MAX_CHUNK_CHARS = 1500
+# Frames copied per read when appending a chunk to the output
+COPY_FRAMES = 16384
+
+
+def chunk_runs(runs, max_chars=MAX_CHUNK_CHARS):
+    """
+    Pack sentences into chunks of at most ``max_chars`` characters without
+    splitting a sentence. Each chunk is a list of LanguageRun, so a chunk
+    of mixed text still switches voices.
+    """
+    chunks, current, size = [], [], 0
+    for run in runs:
+        for sentence in split_sentences(run.text, max_chars):
+            added = len(sentence) + (1 if current else 0)
+            if current and size + added > max_chars:
+                chunks.append(current)
+                current, size = [], 0
+                added = len(sentence)
+            if current and current[-1].language == run.language:
+                current[-1] = LanguageRun(run.language, f"{current[-1].text} {sentence}")
+            else:
+                current.append(LanguageRun(run.language, sentence))
+            size += added
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@dataclass
+class LongSynthesisResult:
+    path: str
+    chunks: int = 0
+    chars: int = 0
+    audio_seconds: float = 0.0
+    wall_time: float = 0.0
+
+    @property
+    def rtf(self):
+        # Wall-clock seconds per second of synthesized audio
+        return self.wall_time / self.audio_seconds if self.audio_seconds else 0.0
+
+
+def synthesize_long_text(synthesize, runs, out_path, voices=voice_mapping, max_chars=MAX_CHUNK_CHARS,
+                         max_workers=4, cache=None):
+    """
+    Synthesize ``runs`` (language_segments.LanguageRun, e.g. from
+    split_by_language) into one WAV at ``out_path``.
+
+    The text is cut into sentence-aligned chunks that are synthesized
+    concurrently through ``cached_synthesize`` (one SSML request per chunk
+    when it mixes voices). Chunk audio is appended to the output in order as
+    soon as the chunks before it are done, a block of frames at a time, and
+    the WAV header is patched once when the file is closed; the whole audio
+    is never held in memory. ``synthesize`` must be safe to call from several
+    threads (speech_clients.pooled_synthesizer is).
+    """
+    start = time.perf_counter()
+    chunks = chunk_runs(runs, max_chars)
+    result = LongSynthesisResult(path=out_path, chunks=len(chunks), chars=sum(len(r.text) for r in runs))
+    if not chunks:
+        raise SynthesisError("Nothing to synthesize.")
+    parent_span = get_tracer().current()
+    work_dir = tempfile.mkdtemp(prefix=".chunks-", dir=os.path.dirname(os.path.abspath(out_path)))
+
+    def render(index, chunk):
+        voice = voices.get(chunk[0].language, DEFAULT_VOICE)
+        chunk_path = os.path.join(work_dir, f"chunk_{index}.wav")
+        with get_tracer().activate(parent_span):
+            if len(chunk) == 1:
+                return cached_synthesize(synthesize, chunk[0].text, voice, out_path=chunk_path, cache=cache)
+            return cached_synthesize(synthesize, build_ssml(chunk, voices), voice, out_path=chunk_path,
+                                     ssml=True, cache=cache)
+
+    span = get_tracer().span("synthesize_long", chunks=len(chunks), chars=result.chars, workers=max_workers)
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    out = wave.open(out_path, "wb")
+    try:
+        futures = [pool.submit(render, i, chunk) for i, chunk in enumerate(chunks)]
+        params = None
+        for future in futures:
+            chunk_path = future.result()
+            with wave.open(chunk_path, "rb") as wf:
+                chunk_params = (wf.getnchannels(), wf.getsampwidth(), wf.getframerate())
+                if params is None:
+                    params = chunk_params
+                    out.setnchannels(params[0])
+                    out.setsampwidth(params[1])
+                    out.setframerate(params[2])
+                elif chunk_params != params:
+                    raise SynthesisError(f"Chunk audio format changed from {params} to {chunk_params}.")
+                frames = wf.readframes(COPY_FRAMES)
+                while frames:
+                    # writeframesraw leaves the header alone; close() patches it once at the end
+                    out.writeframesraw(frames)
+                    frames = wf.readframes(COPY_FRAMES)
+            os.remove(chunk_path)
+        result.audio_seconds = out.getnframes() / float(params[2])
+        out.close()
+    except BaseException as e:
+        pool.shutdown(wait=True, cancel_futures=True)
+        try:
+            out.close()
+        except wave.Error:
+            pass    # nothing was written, so there is no header to patch
+        os.remove(out_path)
+        span.end(str(e) or type(e).__name__)
+        raise
+    finally:
+        pool.shutdown(wait=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    result.wall_time = time.perf_counter() - start
+    span.set("audio_seconds", round(result.audio_seconds, 3))
+    span.end()
+    return result
+
+
+if __name__ == "__main__":
+    # Throughput vs number of concurrent chunks, with the fake synthesizer
+    from fake_backends import FakeSynthesizer
+    from tts_cache import SynthesisCache
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(script_dir, "Data", "text.txt"), "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()] * 4
+    # Numbered so that no two chunks are the same text
+    text = " ".join(f"Part {i + 1}. {line}" for i, line in enumerate(lines))
+    synthesizer = FakeSynthesizer(latency=0.1, realtime_factor=0.05)
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in (1, 2, 4, 8):
+            # A fresh cache per run so every chunk is really synthesized
+            cache = SynthesisCache(cache_dir=os.path.join(tmp, f"cache_{workers}"))
+            res = synthesize_long_text(synthesizer, [LanguageRun("en", text)], os.path.join(tmp, f"out_{workers}.wav"),
+                                       max_chars=300, max_workers=workers, cache=cache)
+            print(f"👷 {workers} workers: {res.chunks} chunks, {res.audio_seconds:.1f}s of audio in "
+                  f"{res.wall_time:.2f}s ({res.audio_seconds / res.wall_time:.1f}x real time)")
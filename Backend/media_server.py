@@ -0,0 +1,144 @@
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Files are streamed in fixed-size reads, so memory per request stays constant
+CHUNK_SIZE = 256 * 1024
+# Published files kept reachable; the oldest token expires beyond this
+MAX_PUBLISHED = 256
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """Return (start, end) inclusive for a single ``Range: bytes=...`` header, or None if unsatisfiable."""
+    match = _RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    server_version = "MediaServer/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _lookup(self):
+        token = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+        with self.server.files_lock:
+            path = self.server.files.get(token)
+        if path is None or not os.path.isfile(path):
+            self.send_error(404)
+            return None
+        return path
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        path = self._lookup()
+        if path is None:
+            return
+        size = os.path.getsize(path)
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        start, end = 0, size - 1
+        range_header = self.headers.get("Range")
+
+        if range_header:
+            byte_range = parse_range(range_header, size)
+            if byte_range is None:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                return
+            start, end = byte_range
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        length = end - start + 1 if size else 0
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        if not send_body:
+            return
+
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                remaining = length
+                while remaining > 0:
+                    chunk = f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            # Players routinely drop connections while seeking
+            pass
+
+
+# ----------------------------- #
+# 🔹 Local media endpoint
+# ----------------------------- #
+class MediaServer:
+    """
+    Tiny range-capable HTTP server for rendered outputs. Only files that were
+    explicitly published are reachable, each under an opaque token; only the
+    ``max_published`` most recently published ones stay reachable.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, public_url=None, max_published=MAX_PUBLISHED):
+        self._httpd = ThreadingHTTPServer((host, port), _MediaHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.files = OrderedDict()
+        self._httpd.files_lock = threading.Lock()
+        self.max_published = max_published
+        self.port = self._httpd.server_address[1]
+        self.public_url = (public_url or f"http://localhost:{self.port}").rstrip("/")
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="media-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def publish(self, path):
+        """Make ``path`` downloadable and return its URL."""
+        path = os.path.abspath(path)
+        stamp = f"{path}:{os.path.getmtime(path)}:{os.path.getsize(path)}"
+        token = hashlib.sha256(stamp.encode("utf-8")).hexdigest()[:24] + os.path.splitext(path)[1]
+        files = self._httpd.files
+        with self._httpd.files_lock:
+            files[token] = path
+            files.move_to_end(token)
+            while len(files) > self.max_published:
+                files.popitem(last=False)
+        return f"{self.public_url}/media/{token}"
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
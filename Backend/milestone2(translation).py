@@ -18,6 +18,12 @@ except Exception:
 # File paths (use project-relative paths)
 import os
 import sys
+import argparse
+
+parser = argparse.ArgumentParser(description="Translate Data/text.txt into Data/translated.txt")
+parser.add_argument("--workers", type=int, default=4, help="Translation requests in flight at once")
+parser.add_argument("--trace", action="store_true", help="Export per-stage spans and metrics to Data/traces/ (or TRACING=1)")
+args = parser.parse_args()
 
 # Get the directory where this script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -79,16 +85,38 @@ if globals().get("_deep_translator_missing", False):
     sys.stderr.write("Install it with:\n    pip install deep-translator\nOr install all project dependencies:\n    pip install -r requirements.txt\n")
     sys.exit(1)
 
-# Translate and output only translated text
-with open(input_file, "r", encoding="utf-8") as infile, open(output_file, "w", encoding="utf-8") as outfile:
-    for line in infile:
-        text = line.strip()
-        if not text:
-            continue
+from translation_cache import get_translation_cache
+from batch_translation import BatchTranslator
+from tracing import configure_tracer, get_tracer, stage_summary
+
+if args.trace:
+    configure_tracer()
+
+# Repeated lines are served from the shared translation cache
+cache = get_translation_cache()
+
+with open(input_file, "r", encoding="utf-8") as infile:
+    lines = [line.strip() for line in infile if line.strip()]
 
-        try:
-            translated_text = GoogleTranslator(source='auto', target=user_choice).translate(text)
+# Translate in packed, concurrent batches; lines are written in order as soon as they are ready
+translator = BatchTranslator(user_choice, cache=cache, max_workers=args.workers)
+with open(output_file, "w", encoding="utf-8") as outfile, \
+        get_tracer().span("job", kind="translation", target=user_choice, lines=len(lines)) as trace:
+    def write_line(index, translated_text, error):
+        if error:
+            sys.stderr.write(f"⚠️ Line {index + 1} failed after retries: {error}\n")
+            outfile.write("Translation Error\n")
+        else:
             print(translated_text)  # only translated text
             outfile.write(translated_text + "\n")
-        except Exception as e:
-            outfile.write("Translation Error\n") 
\ No newline at end of file
+        outfile.flush()
+
+    translator.translate(lines, on_line=write_line)
+
+if translator.failed:
+    print(f"\n❌ {len(translator.failed)} of {len(lines)} lines could not be translated.")
+
+stats = cache.stats()
+print(f"\n📦 Translation cache: {stats['memory_hits'] + stats['disk_hits']} hits, {stats['misses']} misses (hit rate {stats['hit_rate']:.0%})")
+if trace:
+    print(f"⏱️ {stage_summary(trace)} (spans in {get_tracer().jsonl_path})")
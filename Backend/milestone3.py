@@ -1,7 +1,10 @@
-import azure.cognitiveservices.speech as speechsdk
-from langdetect import detect
 import os
 from dotenv import load_dotenv
+from tts_cache import get_synthesis_cache, SynthesisError
+from speech_clients import SynthesizerPool, pooled_synthesizer
+from long_synthesis import synthesize_long_text
+from tracing import get_tracer, stage_summary
+from language_segments import split_by_language
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,8 +16,8 @@ service_region = os.getenv("Speech_region")
 print("Speech Key:", speech_key)  # (for testing only, remove later)
 print("Region:", service_region)
 
-
-speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
+# Chunks of a long text synthesized at the same time (one pooled connection each)
+SYNTHESIS_WORKERS = 4
 
 
 #  File Paths (use project-relative Data folder inside Backend)
@@ -72,43 +75,51 @@ if not text:
 print(f"📝 Text to speak:\n{text}\n")
 
 
-#  Detect Language Automatically
+#  Detect Language Per Sentence (mixed Hindi/English text switches voices mid-file)
 
-detected_lang = detect(text)
-print(f"🌐 Detected language: {detected_lang}")
+runs = split_by_language(text)
+for run in runs:
+    preview = run.text if len(run.text) <= 60 else run.text[:57] + "..."
+    print(f"🌐 {run.language} → {voice_mapping.get(run.language, 'en-US-AriaNeural')}: {preview}")
 
 
-#  Set Correct Voice
+#  Set Correct Voice(s): a request that mixes languages switches voices through one SSML document
 
-voice_name = voice_mapping.get(detected_lang, "en-US-AriaNeural")
-speech_config.speech_synthesis_voice_name = voice_name
-print(f"🎤 Using Azure voice: {voice_name}")
+voice_name = voice_mapping.get(runs[0].language, "en-US-AriaNeural")
+if len(runs) > 1:
+    print(f"🎤 Using {len({run.language for run in runs})} Azure voices ({len(runs)} segments)")
+else:
+    print(f"🎤 Using Azure voice: {voice_name}")
 
 
-#  Audio Configuration
+#  Speak the Text: sentence-aligned chunks are synthesized concurrently and streamed
+#  into one WAV in order (re-runs of the same chunk + voice come from the synthesis cache)
 audio_file_path = os.path.join(output_folder, "output.wav")
-audio_config = speechsdk.audio.AudioOutputConfig(filename=audio_file_path)
-speech_synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_config)
-
-
-#  Speak the Text
+synthesis_cache = get_synthesis_cache()
+synthesizer_pool = SynthesizerPool(speech_key, service_region, max_per_key=SYNTHESIS_WORKERS)
 print("\n🔄 Generating speech...")
-result = speech_synthesizer.speak_text_async(text).get()
 
 
 #  Result & Playback
 
-if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+try:
+    # Set TRACING=1 to export a span for this run to Data/traces/
+    with get_tracer().span("job", kind="synthesis", voice=voice_name, chars=len(text), languages=len(runs)) as trace:
+        spoken = synthesize_long_text(pooled_synthesizer(synthesizer_pool), runs, audio_file_path,
+                                      voices=voice_mapping, max_workers=SYNTHESIS_WORKERS, cache=synthesis_cache)
+except SynthesisError as e:
+    print(f"❌ {e}")
+    print("⚠️ Check if your Azure key and region are correct.")
+else:
     print(f"✅ Speech generated successfully and saved to:\n{audio_file_path}")
+    print(f"🧩 {spoken.chunks} chunk(s), {spoken.audio_seconds:.1f}s of audio in {spoken.wall_time:.1f}s")
+    if trace:
+        print(f"⏱️ {stage_summary(trace)}")
+    stats = synthesis_cache.stats()
+    if stats["hits"]:
+        print(f"📦 Served from synthesis cache ({stats['bytes_saved']} bytes not re-synthesized)")
     try:
         # Play automatically (Windows only)
         os.startfile(audio_file_path)
     except Exception:
         print("🎵 Speech file saved successfully (auto-play not supported on this system).")
-
-elif result.reason == speechsdk.ResultReason.Canceled:
-    cancellation = result.cancellation_details
-    print(f"❌ Speech synthesis canceled: {cancellation.reason}")
-    if cancellation.reason == speechsdk.CancellationReason.Error:
-        print(f"Error details: {cancellation.error_details}")
-        print("⚠️ Check if your Azure key and region are correct.")
\ No newline at end of file
@@ -1,5 +1,10 @@
 import azure.cognitiveservices.speech as speechsdk
-from deep_translator import GoogleTranslator
+from speculative_translation import SpeculativeTranslator
+from tts_cache import get_synthesis_cache
+from speech_clients import STREAM_OUTPUT_FORMAT, SynthesizerPool, pooled_stream
+from streaming_tts import StreamingSpeaker, TeePlayer, WavWriter, open_player
+from realtime_pipeline import StagedPipeline, Stage, percentile
+from tracing import get_tracer, stage_summary
 import os
 import time
 
@@ -123,19 +128,58 @@ speech_recognizer = speechsdk.SpeechRecognizer(
 )
 
 # ----------------------------- #
-# 🔹 Speech Synthesizer Setup
-# ----------------------------- #
-def speak_text(text, count):
-    audio_path = os.path.join(output_audio_folder, f"translated_{count}.wav")
-    audio_config = speechsdk.audio.AudioOutputConfig(filename=audio_path)
-    synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_config)
-
-    result = synthesizer.speak_text_async(text).get()
-    if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-        print(f"🔊 Played translated text: {text}")
-        os.startfile(audio_path)
-    elif result.reason == speechsdk.ResultReason.Canceled:
-        print("❌ Speech synthesis canceled.")
+# 🔹 Pipeline Stages
+# ----------------------------- #
+# Pre-connected streaming synthesizers for the target voice, one per sentence in flight
+synthesizer_pool = SynthesizerPool(speech_key, service_region, max_per_key=2)
+synthesizer_pool.prewarm(voice_name, count=2, output_format=STREAM_OUTPUT_FORMAT)
+# Sentences are synthesized into in-memory pull streams; repeated sentences come from the synthesis cache
+speaker = StreamingSpeaker(pooled_stream(synthesizer_pool), lookahead=2, cache=get_synthesis_cache())
+player = open_player()
+if player is None:
+    print("🎵 No audio output found (pip install sounddevice); translations are only saved as .wav files.")
+
+# Translates stable prefixes of partial hypotheses while the speaker is still talking
+speculator = SpeculativeTranslator(target_lang)
+
+def translate_stage(utterance):
+    # Reuses (or patches) the speculative translation when it matches the final text
+    utterance.data["translated"] = utterance.data["speculation"].translate()
+
+def speak_stage(utterance):
+    # Playback starts with the first chunk of the first sentence; the .wav grows alongside
+    audio_path = os.path.join(output_audio_folder, f"translated_{utterance.seq + 1}.wav")
+    writer = WavWriter(audio_path)
+    try:
+        spoken = speaker.speak(utterance.data["translated"], voice_name, TeePlayer([player, writer]))
+    finally:
+        writer.close()
+    utterance.data["audio_path"] = audio_path
+    utterance.data["first_audio_at"] = spoken.first_audio_at
+    if spoken.error:
+        raise RuntimeError(spoken.error)
+
+def report(utterance):
+    print(f"\n🗣️ You said: {utterance.text}")
+    if utterance.error:
+        print(f"⚠️ {utterance.error}")
+        return
+    print(f"🌐 Translated ({language_options[target_lang]}): {utterance.data['translated']}")
+    stage_times = ", ".join(f"{name} {work * 1000:.0f} ms" for name, (_, work) in utterance.timings.items())
+    first_audio = max(0.0, utterance.data["first_audio_at"] - utterance.created_at)
+    print(f"🔊 Played translated text (audio started {first_audio * 1000:.0f} ms after speech end: {stage_times})")
+    speculation = utterance.data["speculation"]
+    if speculation.outcome != "miss":
+        print(f"🔮 Translation {'reused' if speculation.outcome == 'hit' else 'patched'} from partial results "
+              f"({speculation.saved * 1000:.0f} ms saved)")
+    if utterance.span:
+        print(f"⏱️ {stage_summary(utterance.span)}")
+
+# recognize → translate → speak (streamed synthesis + playback), each on its own threads with bounded queues
+pipeline = StagedPipeline([
+    Stage("translate", translate_stage, workers=2),
+    Stage("speak", speak_stage),
+], maxsize=8, on_complete=report)
 
 # ----------------------------- #
 # 🔹 Real-Time Recognition + Translation
@@ -143,22 +187,18 @@ def speak_text(text, count):
 print("\n🎙️ Speak now! Your speech will be translated and spoken in real-time.")
 print("Press Ctrl+C to stop.\n")
 
-count = 1
+def recognizing_handler(evt):
+    if evt.result.text:
+        speculator.on_partial(evt.result.text)
 
 def recognized_handler(evt):
-    global count
+    # Only hand the text off; translation and synthesis run on the pipeline threads
     if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
         recognized_text = evt.result.text.strip()
         if recognized_text:
-            print(f"\n🗣️ You said: {recognized_text}")
-            try:
-                translated_text = GoogleTranslator(source='auto', target=target_lang).translate(recognized_text)
-                print(f"🌐 Translated ({language_options[target_lang]}): {translated_text}")
-                speak_text(translated_text, count)
-                count += 1
-            except Exception as e:
-                print(f"⚠️ Translation error: {e}")
+            pipeline.submit(recognized_text, data={"speculation": speculator.end_utterance(recognized_text)})
 
+speech_recognizer.recognizing.connect(recognizing_handler)
 speech_recognizer.recognized.connect(recognized_handler)
 
 speech_recognizer.start_continuous_recognition()
@@ -170,4 +210,22 @@ except KeyboardInterrupt:
     print("\n🛑 Stopped by user.")
 finally:
     speech_recognizer.stop_continuous_recognition()
-    print("✅ Translation session ended.")
\ No newline at end of file
+    pipeline.close()
+    speculator.close()
+    if player is not None:
+        player.close()
+    first_audio = [u.data["first_audio_at"] - u.created_at for u in pipeline.completed if u.data.get("first_audio_at")]
+    if first_audio:
+        print(f"⏱️ Speech end → audio start: p50 {percentile(first_audio, 50) * 1000:.0f} ms, "
+              f"p95 {percentile(first_audio, 95) * 1000:.0f} ms over {len(first_audio)} utterances")
+    spec_stats = speculator.stats()
+    if spec_stats["finals"]:
+        print(f"🔮 Speculative translation: hit rate {spec_stats['hit_rate']:.0%} "
+              f"({spec_stats['hits']} reused, {spec_stats['patches']} patched, {spec_stats['misses']} missed), "
+              f"avg {spec_stats['avg_saved_ms']} ms saved per utterance, {spec_stats['wasted_guesses']} wasted guesses")
+    pool_stats = synthesizer_pool.stats()
+    if pool_stats["acquisitions"]:
+        print(f"🔌 Synthesizer pool: hit rate {pool_stats['hit_rate']:.0%}, avg wait {pool_stats['avg_wait_ms']} ms")
+    if get_tracer().enabled:
+        print(f"📈 Spans: {get_tracer().jsonl_path}, metrics: {get_tracer().metrics_path}")
+    print("✅ Translation session ended.")
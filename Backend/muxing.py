@@ -0,0 +1,145 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+from tracing import get_tracer
+
+
+def ffmpeg_exe():
+    """ffmpeg binary bundled with moviepy (imageio-ffmpeg), else the one on PATH."""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        exe = shutil.which("ffmpeg")
+        if not exe:
+            raise RuntimeError("ffmpeg not found. Install moviepy (imageio-ffmpeg) or put ffmpeg on PATH.")
+        return exe
+
+
+@dataclass
+class MuxResult:
+    output_path: str
+    method: str           # "copy" (video stream copied) or "reencode"
+    elapsed: float
+    error: str = ""       # why stream copy was not possible, if it fell back
+
+
+# ----------------------------- #
+# 🔹 Muxing
+# ----------------------------- #
+def remux_audio(video_path, audio_path, output_path):
+    """Copy the video stream as-is and encode only the new audio track to AAC."""
+    remux_audio_tracks(video_path, [(audio_path, None, None)], output_path)
+
+
+def remux_audio_tracks(video_path, tracks, output_path, video_codec="copy"):
+    """
+    Write one container with the video stream of ``video_path`` and one AAC
+    track per ``(audio_path, language, title)`` in ``tracks``; the first
+    track is the default. ``language`` is an ISO 639-2 tag (or None).
+    """
+    cmd = [ffmpeg_exe(), "-y", "-loglevel", "error", "-i", video_path]
+    for audio_path, _, _ in tracks:
+        cmd += ["-i", audio_path]
+    cmd += ["-map", "0:v:0"]
+    for i in range(len(tracks)):
+        cmd += ["-map", f"{i + 1}:a:0"]
+    cmd += ["-c:v", video_codec] + (["-preset", "veryfast"] if video_codec == "libx264" else [])
+    cmd += ["-c:a", "aac", "-b:a", "192k"]
+    for i, (_, language, title) in enumerate(tracks):
+        if language:
+            cmd += [f"-metadata:s:a:{i}", f"language={language}"]
+        if title:
+            # MP4 players read the track name from handler_name, MKV from title
+            cmd += [f"-metadata:s:a:{i}", f"title={title}", f"-metadata:s:a:{i}", f"handler_name={title}"]
+        cmd += [f"-disposition:a:{i}", "default" if i == 0 else "0"]
+    cmd += ["-movflags", "+faststart", output_path]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or f"ffmpeg exited with {proc.returncode}")
+
+
+def reencode_audio(video_path, audio_path, output_path):
+    """Previous path: decode and re-encode every frame with libx264."""
+    from moviepy.editor import VideoFileClip, AudioFileClip
+
+    video_clip = VideoFileClip(video_path)
+    audio_clip = AudioFileClip(audio_path)
+    try:
+        final_video = video_clip.set_audio(audio_clip)
+        final_video.write_videofile(output_path, codec="libx264", audio_codec="aac", verbose=False, logger=None)
+    finally:
+        audio_clip.close()
+        video_clip.close()
+
+
+def mux_video(video_path, audio_path, output_path, allow_reencode=True):
+    """
+    Replace the audio track of ``video_path``. The video stream is copied;
+    re-encoding is used only when the codec/container can't be copied.
+    """
+    start = time.perf_counter()
+    with get_tracer().span("mux") as span:
+        try:
+            remux_audio(video_path, audio_path, output_path)
+            method, reason = "copy", ""
+        except Exception as e:
+            if not allow_reencode:
+                raise
+            reencode_audio(video_path, audio_path, output_path)
+            method, reason = "reencode", str(e)
+        span.set("method", method)
+        if span:
+            span.set("bytes", os.path.getsize(output_path))
+    return MuxResult(output_path, method, time.perf_counter() - start, error=reason)
+
+
+def mux_video_tracks(video_path, tracks, output_path, allow_reencode=True):
+    """
+    Like ``mux_video`` for several dubbed tracks at once. If the video stream
+    can't be copied into the container it is re-encoded by ffmpeg itself,
+    since the moviepy fallback only writes a single audio track.
+    """
+    start = time.perf_counter()
+    with get_tracer().span("mux", tracks=len(tracks)) as span:
+        try:
+            remux_audio_tracks(video_path, tracks, output_path)
+            method, reason = "copy", ""
+        except Exception as e:
+            if not allow_reencode:
+                raise
+            remux_audio_tracks(video_path, tracks, output_path, video_codec="libx264")
+            method, reason = "reencode", str(e)
+        span.set("method", method)
+        if span:
+            span.set("bytes", os.path.getsize(output_path))
+    return MuxResult(output_path, method, time.perf_counter() - start, error=reason)
+
+
+def compare_mux(video_path, audio_path, output_dir):
+    """Time stream copy against a full libx264 re-encode of the same inputs."""
+    copy_result = mux_video(video_path, audio_path, os.path.join(output_dir, "mux_copy.mp4"), allow_reencode=False)
+    start = time.perf_counter()
+    reencode_audio(video_path, audio_path, os.path.join(output_dir, "mux_reencode.mp4"))
+    reencode_elapsed = time.perf_counter() - start
+    return {
+        "copy_seconds": round(copy_result.elapsed, 3),
+        "reencode_seconds": round(reencode_elapsed, 3),
+        "saved_seconds": round(reencode_elapsed - copy_result.elapsed, 3),
+        "speedup": round(reencode_elapsed / copy_result.elapsed, 1) if copy_result.elapsed else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python muxing.py <video> <audio.wav>")
+        sys.exit(1)
+    out_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data")
+    os.makedirs(out_dir, exist_ok=True)
+    report = compare_mux(sys.argv[1], sys.argv[2], out_dir)
+    print(f"⏱️ Stream copy: {report['copy_seconds']}s, re-encode: {report['reencode_seconds']}s "
+          f"(saved {report['saved_seconds']}s, {report['speedup']}x faster)")
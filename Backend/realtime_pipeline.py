@@ -0,0 +1,139 @@
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+from tracing import get_tracer
+
+_STOP = object()
+
+
+@dataclass
+class Utterance:
+    seq: int
+    text: str
+    created_at: float = field(default_factory=time.perf_counter)
+    data: dict = field(default_factory=dict)        # stage outputs, e.g. "translated", "audio_path"
+    timings: dict = field(default_factory=dict)     # stage name -> (queue wait, processing) seconds
+    error: str = ""
+    completed_at: float = 0.0
+    span: object = None                             # tracing span covering the whole utterance
+
+    @property
+    def latency(self):
+        # Time from the recognized event to the end of the last stage
+        return self.completed_at - self.created_at if self.completed_at else 0.0
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+# ----------------------------- #
+# 🔹 Queue-connected stages
+# ----------------------------- #
+class Stage:
+    def __init__(self, name, fn, workers=1):
+        self.name = name
+        self.fn = fn            # fn(utterance) -> None, stores its output in utterance.data
+        self.workers = workers
+
+
+class StagedPipeline:
+    """
+    Runs each stage on its own worker threads, connected by bounded queues.
+
+    Utterances leave every stage in submission order (a reorder buffer sits
+    behind stages with more than one worker), and a full queue blocks the
+    producer so a slow stage applies backpressure instead of piling up work.
+    A failed utterance skips the remaining stages but still keeps its place.
+    """
+
+    def __init__(self, stages, maxsize=8, on_complete=None):
+        self.stages = stages
+        self.on_complete = on_complete
+        self.queues = [queue.Queue(maxsize=maxsize) for _ in stages]
+        self._seq = itertools.count()
+        self._reorder = [{} for _ in stages]
+        self._next_seq = [0 for _ in stages]
+        self._reorder_locks = [threading.Lock() for _ in stages]
+        self.completed = []
+        self._threads = []
+        for index, stage in enumerate(stages):
+            for n in range(stage.workers):
+                t = threading.Thread(target=self._worker, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, text, timeout=None, data=None):
+        """Queue a recognized utterance; blocks while the first stage is full."""
+        seq = next(self._seq)
+        utterance = Utterance(seq=seq, text=text, data=dict(data or {}),
+                              span=get_tracer().span("job", kind="utterance", seq=seq))
+        self.queues[0].put((time.perf_counter(), utterance), timeout=timeout)
+        return utterance
+
+    def _worker(self, index):
+        stage = self.stages[index]
+        in_queue = self.queues[index]
+        while True:
+            item = in_queue.get()
+            if item is _STOP:
+                in_queue.task_done()
+                break
+            queued_at, utterance = item
+            started = time.perf_counter()
+            if not utterance.error:
+                try:
+                    with get_tracer().activate(utterance.span):
+                        stage.fn(utterance)
+                except Exception as e:
+                    utterance.error = f"{stage.name}: {e}"
+            finished = time.perf_counter()
+            utterance.timings[stage.name] = (started - queued_at, finished - started)
+            self._emit(index, utterance)
+            in_queue.task_done()
+
+    def _emit(self, index, utterance):
+        # Release utterances to the next stage strictly in sequence order
+        with self._reorder_locks[index]:
+            pending = self._reorder[index]
+            pending[utterance.seq] = utterance
+            while self._next_seq[index] in pending:
+                ready = pending.pop(self._next_seq[index])
+                self._next_seq[index] += 1
+                if index + 1 < len(self.stages):
+                    self.queues[index + 1].put((time.perf_counter(), ready))
+                else:
+                    ready.completed_at = time.perf_counter()
+                    ready.span.end(ready.error)
+                    self.completed.append(ready)
+                    if self.on_complete is not None:
+                        self.on_complete(ready)
+
+    def close(self):
+        """Drain every queued utterance, then stop the workers."""
+        for index, stage in enumerate(self.stages):
+            self.queues[index].join()
+            for _ in range(stage.workers):
+                self.queues[index].put(_STOP)
+        for t in self._threads:
+            t.join()
+
+    def latency_report(self):
+        report = {}
+        for stage in self.stages:
+            waits = [u.timings[stage.name][0] for u in self.completed if stage.name in u.timings]
+            work = [u.timings[stage.name][1] for u in self.completed if stage.name in u.timings]
+            report[stage.name] = {
+                "wait_p50": percentile(waits, 50), "wait_p95": percentile(waits, 95),
+                "work_p50": percentile(work, 50), "work_p95": percentile(work, 95),
+            }
+        totals = [u.latency for u in self.completed]
+        report["end_to_end"] = {"p50": percentile(totals, 50), "p95": percentile(totals, 95), "count": len(totals)}
+        return report
@@ -0,0 +1,330 @@
+import os
+import threading
+import time
+import wave
+from dataclasses import dataclass, field
+
+try:
+    import azure.cognitiveservices.speech as speechsdk
+except Exception:
+    speechsdk = None
+
+from tracing import get_tracer
+
+# Azure reports offsets/durations in 100-nanosecond ticks
+TICKS_PER_SECOND = 10_000_000
+
+DEFAULT_LANGUAGES = ("en-IN", "hi-IN")
+
+
+# ----------------------------- #
+# 🔹 Recognition results
+# ----------------------------- #
+@dataclass
+class Segment:
+    text: str
+    offset: float = 0.0     # seconds from the start of the audio
+    duration: float = 0.0   # seconds
+    language: str = ""
+
+    @property
+    def end(self):
+        return self.offset + self.duration
+
+
+@dataclass
+class RecognitionResult:
+    segments: list = field(default_factory=list)
+    audio_duration: float = 0.0
+    wall_time: float = 0.0
+    error: str = ""
+    timed_out: bool = False
+
+    @property
+    def text(self):
+        return " ".join(s.text for s in self.segments)
+
+    @property
+    def language(self):
+        # Most common detected language across segments
+        counts = {}
+        for s in self.segments:
+            if s.language:
+                counts[s.language] = counts.get(s.language, 0) + 1
+        return max(counts, key=counts.get) if counts else ""
+
+    @property
+    def rtf(self):
+        # Real-time factor: wall-clock seconds spent per second of audio
+        return self.wall_time / self.audio_duration if self.audio_duration else 0.0
+
+
+def wav_duration(path):
+    """Duration of a WAV file in seconds (0.0 if it can't be read)."""
+    try:
+        with wave.open(path, "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except (wave.Error, OSError, EOFError):
+        return 0.0
+
+
+# ----------------------------- #
+# 🔹 Azure backend
+# ----------------------------- #
+class AzureRecognizerBackend:
+    """Continuous recognition through the Azure Speech SDK."""
+
+    def __init__(self, speech_config, languages=DEFAULT_LANGUAGES):
+        if speechsdk is None:
+            raise RuntimeError("azure-cognitiveservices-speech is not installed.")
+        self.speech_config = speech_config
+        self.languages = list(languages)
+
+    def start(self, audio_path, on_segment, on_done, on_progress=None, on_partial=None):
+        # audio_path=None listens on the default microphone
+        if audio_path is None:
+            audio_input = speechsdk.AudioConfig(use_default_microphone=True)
+        else:
+            audio_input = speechsdk.AudioConfig(filename=audio_path)
+        return self._connect(audio_input, on_segment, on_done, on_progress, on_partial)
+
+    def start_source(self, source, on_segment, on_done, on_progress=None, on_partial=None):
+        """
+        Recognize 16-bit mono PCM pulled from ``source`` (see audio_sources):
+        the SDK calls ``source.readinto`` whenever it wants more audio, so the
+        recognizer sets the pace and only its own small buffer is in memory.
+        """
+
+        class SourceCallback(speechsdk.audio.PullAudioInputStreamCallback):
+            def read(self, buffer):
+                return source.readinto(buffer)
+
+            def close(self):
+                pass
+
+        stream_format = speechsdk.audio.AudioStreamFormat(samples_per_second=source.sample_rate, bits_per_sample=16,
+                                                          channels=1)
+        pull_stream = speechsdk.audio.PullAudioInputStream(pull_stream_callback=SourceCallback(),
+                                                           stream_format=stream_format)
+        return self._connect(speechsdk.AudioConfig(stream=pull_stream), on_segment, on_done, on_progress, on_partial)
+
+    def open_stream(self, on_segment, on_done, on_partial=None, sample_rate=16000):
+        """
+        Recognize raw 16-bit mono PCM written from memory (e.g. a WebSocket
+        client) through a push stream; returns a PushRecognition.
+        """
+        stream_format = speechsdk.audio.AudioStreamFormat(samples_per_second=sample_rate, bits_per_sample=16,
+                                                          channels=1)
+        push_stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+        recognizer = self._connect(speechsdk.AudioConfig(stream=push_stream), on_segment, on_done,
+                                   None, on_partial)
+        return PushRecognition(push_stream, recognizer)
+
+    def _connect(self, audio_input, on_segment, on_done, on_progress, on_partial):
+        auto_detect_config = speechsdk.languageconfig.AutoDetectSourceLanguageConfig(languages=self.languages)
+        recognizer = speechsdk.SpeechRecognizer(
+            speech_config=self.speech_config,
+            audio_config=audio_input,
+            auto_detect_source_language_config=auto_detect_config
+        )
+
+        def recognized_handler(evt):
+            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+                text = evt.result.text.strip()
+                if text:
+                    language = speechsdk.AutoDetectSourceLanguageResult(evt.result).language or ""
+                    on_segment(Segment(
+                        text=text,
+                        offset=evt.result.offset / TICKS_PER_SECOND,
+                        duration=evt.result.duration / TICKS_PER_SECOND,
+                        language=language,
+                    ))
+
+        def canceled_handler(evt):
+            error = ""
+            if evt.cancellation_details.reason == speechsdk.CancellationReason.Error:
+                error = evt.cancellation_details.error_details or "Recognition canceled"
+            on_done(error)
+
+        def recognizing_handler(evt):
+            # Partial hypotheses count as progress while a long utterance is still being spoken
+            if on_progress is not None:
+                on_progress()
+            if on_partial is not None and evt.result.text:
+                on_partial(evt.result.text)
+
+        recognizer.recognized.connect(recognized_handler)
+        if on_progress is not None or on_partial is not None:
+            recognizer.recognizing.connect(recognizing_handler)
+        recognizer.session_stopped.connect(lambda evt: on_done(""))
+        recognizer.canceled.connect(canceled_handler)
+        recognizer.start_continuous_recognition()
+        return recognizer
+
+    def stop(self, handle):
+        handle.stop_continuous_recognition()
+
+
+class PushRecognition:
+    """
+    A running recognition fed from memory: ``write()`` raw PCM as it arrives,
+    ``close()`` at the end of the audio (the session then stops on its own),
+    or ``stop()`` to abandon it.
+    """
+
+    def __init__(self, push_stream, recognizer):
+        self.push_stream = push_stream
+        self.recognizer = recognizer
+
+    def write(self, pcm):
+        self.push_stream.write(bytes(pcm))
+
+    def close(self):
+        self.push_stream.close()
+
+    def stop(self):
+        self.recognizer.stop_continuous_recognition()
+
+
+# ----------------------------- #
+# 🔹 Recognition stage
+# ----------------------------- #
+def _run_recognition(result, start, stop, idle_timeout, on_segment, audio_duration=0.0):
+    # Shared by recognize_file/recognize_stream: collect segments until the
+    # backend reports completion or makes no progress for ``idle_timeout``
+    # seconds, plus the audio not yet covered by a segment when the length is
+    # known (music or a long silence can legitimately produce nothing for a while)
+    lock = threading.Lock()
+    covered = [0.0]
+    progress = threading.Event()
+    done = threading.Event()
+
+    def handle_segment(segment):
+        with lock:
+            result.segments.append(segment)
+            covered[0] = max(covered[0], segment.end)
+        if on_segment is not None:
+            on_segment(segment)
+        progress.set()
+
+    def handle_done(error=""):
+        if error and not result.error:
+            result.error = error
+        done.set()
+        progress.set()
+
+    start_time = time.perf_counter()
+    handle = start(handle_segment, handle_done, progress.set)
+    try:
+        while not done.is_set():
+            with lock:
+                remaining = max(0.0, audio_duration - covered[0])
+            if not progress.wait(idle_timeout + remaining):
+                result.timed_out = True
+                break
+            progress.clear()
+    finally:
+        stop(handle)
+        result.wall_time = time.perf_counter() - start_time
+    result.segments.sort(key=lambda s: s.offset)
+
+
+def recognize_file(backend, audio_path, audio_duration=None, idle_timeout=15.0, on_segment=None, on_partial=None):
+    """
+    Run continuous recognition on one file and return once the backend reports
+    session_stopped/canceled.
+
+    There is no fixed sleep: the call gives up only if the backend makes no
+    progress (no recognized segment and no completion) for ``idle_timeout``
+    seconds plus the part of the file not yet recognized, so a stretch of
+    music or silence doesn't end it early, while a stalled session still
+    does. ``on_partial(text)`` receives the partial hypotheses of the
+    utterance currently being spoken.
+    """
+    if audio_duration is None:
+        audio_duration = wav_duration(audio_path) if audio_path else 0.0
+
+    result = RecognitionResult(audio_duration=audio_duration)
+    span = get_tracer().span("recognize", audio_seconds=round(audio_duration, 3))
+
+    def start(handle_segment, handle_done, on_progress):
+        return backend.start(audio_path, handle_segment, handle_done, on_progress=on_progress, on_partial=on_partial)
+
+    _run_recognition(result, start, backend.stop, idle_timeout, on_segment, audio_duration)
+    span.set("segments", len(result.segments))
+    span.end(result.error or ("timed out" if result.timed_out else ""))
+    return result
+
+
+class _MeteredSource:
+    # What the backend reads from in recognize_stream: counts the audio read,
+    # and turns a source error (or a stop) into the end of the audio
+    def __init__(self, source):
+        self.source = source
+        self.sample_rate = getattr(source, "sample_rate", 16000)
+        self.bytes = 0
+        self.error = ""
+        self.stopping = threading.Event()
+
+    def readinto(self, buffer):
+        if self.stopping.is_set():
+            return 0
+        try:
+            n = self.source.readinto(buffer)
+        except Exception as e:
+            if not self.stopping.is_set():
+                self.error = f"Audio source failed: {e}"
+            return 0
+        self.bytes += n
+        return n
+
+
+def recognize_stream(backend, source, idle_timeout=15.0, on_segment=None, on_partial=None):
+    """
+    Like ``recognize_file``, for 16-bit mono PCM read from ``source`` (an
+    audio_sources source, or anything with ``readinto()`` and ``sample_rate``).
+
+    The backend pulls the audio itself (``backend.start_source``) into its
+    own fixed-size buffer, so recognition starts with the first block while
+    the source is still decoding or recording, and a fast decoder never runs
+    further ahead than the recognizer. The source is closed when recognition
+    ends. ``audio_duration`` is the source's ``duration`` when it knows it
+    (the whole recording, even if recognition stopped early), else the audio read.
+    """
+    metered = _MeteredSource(source)
+    result = RecognitionResult()
+    span = get_tracer().span("recognize", streamed=True)
+
+    def start(handle_segment, handle_done, on_progress):
+        def handle_partial(text):
+            on_progress()
+            if on_partial is not None:
+                on_partial(text)
+
+        return backend.start_source(metered, handle_segment, handle_done, on_progress=on_progress,
+                                    on_partial=handle_partial)
+
+    def stop(handle):
+        metered.stopping.set()
+        backend.stop(handle)
+        source.close()
+
+    _run_recognition(result, start, stop, idle_timeout, on_segment, getattr(source, "duration", None) or 0.0)
+    result.audio_duration = getattr(source, "duration", None) or metered.bytes / 2 / metered.sample_rate
+    result.error = result.error or metered.error
+    span.set("audio_seconds", round(result.audio_duration, 3))
+    span.set("segments", len(result.segments))
+    span.end(result.error or ("timed out" if result.timed_out else ""))
+    return result
+
+
+if __name__ == "__main__":
+    # Quick local check with the fake backend: wall-clock time vs audio duration
+    from fake_backends import FakeRecognizer
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    assets_dir = os.path.join(script_dir, "assets")
+    backend = FakeRecognizer(realtime_factor=0.05)
+    for name in sorted(f for f in os.listdir(assets_dir) if f.endswith(".wav")):
+        res = recognize_file(backend, os.path.join(assets_dir, name))
+        print(f"{name}: {res.audio_duration:.1f}s audio in {res.wall_time:.2f}s (RTF {res.rtf:.3f})")
@@ -33,4 +33,5 @@ print("\n✅ Recording finished!")
 # Save the recording
 wavfile.write(output_file, sample_rate, recording)
 print(f"\n💾 Saved to: {output_file}")
-print("\nNow you can run Milestone1(STT).py to test speech recognition!")
\ No newline at end of file
+print("\nNow you can run Milestone1(STT).py to test speech recognition!")
+print("(Or skip the file: Milestone1(STT).py --mic 5 recognizes straight from the microphone.)")
\ No newline at end of file
@@ -0,0 +1,252 @@
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from languages import join_sentences, target_punctuation
+from streaming_tts import split_sentences
+from tracing import get_tracer
+from translation_cache import TranslationCache, cached_translate, google_translate
+
+# A speculated prefix may only be patched onto a final result where the final
+# text has a clause or sentence break, so the remainder translates on its own
+CLAUSE_END = ".,;:!?।॥。，、！？"
+
+
+def words_key(text):
+    """
+    Comparable form of a hypothesis: lower-cased words without punctuation.
+    Partial hypotheses come without the punctuation and casing of the final
+    result, so both are reduced to this before they are matched.
+    """
+    words = []
+    for token in text.split():
+        word = "".join(c for c in token if not unicodedata.category(c).startswith("P")).lower()
+        if word:
+            words.append(word)
+    return tuple(words)
+
+
+def split_after_words(text, count):
+    """Split ``text`` after its first ``count`` key words; returns (head, tail) of the original text."""
+    tokens = text.split()
+    seen = 0
+    for i, token in enumerate(tokens):
+        if words_key(token):
+            seen += 1
+        if seen == count:
+            return " ".join(tokens[:i + 1]), " ".join(tokens[i + 1:])
+    return text, ""
+
+
+class _Guess:
+    """One speculative translation of a hypothesis, running or finished."""
+
+    def __init__(self, words, future):
+        self.words = words
+        self.future = future    # -> (translated text, seconds the translation took)
+
+
+class Speculation:
+    """
+    The speculative work for one utterance, taken when its final result
+    arrived. ``translate()`` reuses a guess that covers the whole final text,
+    patches a guess that covers a clause-aligned prefix by translating only
+    the rest, and otherwise translates the final text as usual.
+
+    Partial hypotheses carry no punctuation, so a guess is only used for a
+    span of the final text that is at most one sentence; the final text's
+    punctuation is put back on the guessed translation, which keeps the
+    sentence breaks the streaming synthesizer splits on.
+    """
+
+    def __init__(self, owner, final_text, guesses):
+        self.owner = owner
+        self.final_text = final_text
+        self.guesses = guesses
+        self.outcome = ""       # "hit", "patch" or "miss"
+        self.saved = 0.0        # seconds of translation that had already happened
+        self._translated = None
+
+    def _best_guess(self):
+        final = words_key(self.final_text)
+        best = None
+        for guess in self.guesses:
+            n = len(guess.words)
+            if n > len(final) or final[:n] != guess.words:
+                continue
+            head, _ = split_after_words(self.final_text, n)
+            if len(split_sentences(head)) > 1 or (n < len(final) and head[-1:] not in CLAUSE_END):
+                continue
+            if best is None or n > len(best.words):
+                best = guess
+        return best
+
+    def translate(self):
+        if self._translated is not None:
+            return self._translated
+        owner = self.owner
+        with get_tracer().span("translate", target=owner.target, chars=len(self.final_text),
+                               speculative=True) as span:
+            guess = self._best_guess()
+            translated = None
+            if guess is not None:
+                waited_from = time.perf_counter()
+                try:
+                    guessed, took = guess.future.result()
+                except Exception:
+                    guessed = None
+                if guessed is not None:
+                    self.saved = max(0.0, took - (time.perf_counter() - waited_from))
+                    head, rest = split_after_words(self.final_text, len(guess.words))
+                    if head[-1:] in CLAUSE_END and guessed[-1:] not in CLAUSE_END:
+                        guessed += target_punctuation(head[-1], owner.target)
+                    if rest:
+                        self.outcome = "patch"
+                        translated = join_sentences([guessed, owner.translate(rest, owner.target)], owner.target)
+                    else:
+                        self.outcome, translated = "hit", guessed
+            if translated is None:
+                self.outcome, self.saved = "miss", 0.0
+                translated = owner.translate(self.final_text, owner.target)
+            span.set("outcome", self.outcome)
+            span.set("saved_ms", round(1000 * self.saved, 1))
+        owner._record(self)
+        self._translated = translated
+        return translated
+
+
+# ----------------------------- #
+# 🔹 Speculative translator
+# ----------------------------- #
+class SpeculativeTranslator:
+    """
+    Starts translating an utterance before its final recognition result.
+
+    Feed it every partial hypothesis (the SDK's ``recognizing`` event) through
+    ``on_partial``. A prefix that the last ``stable_partials`` hypotheses agree
+    on is translated in the background once it has grown by ``min_words``
+    and no earlier guess is still running. The whole hypothesis is translated
+    once no new partial has arrived for ``settle_seconds``: the speaker has
+    paused between sentences, or stopped and the recognizer is waiting out
+    its end-of-utterance silence. On the ``recognized`` event call
+    ``end_utterance(text)`` and later ``translate()`` on what it returns.
+
+    Guesses are translated through a private in-memory cache, so sentence
+    fragments never reach the shared translation cache; final and patch
+    translations go through ``translate`` (cached_translate by default).
+    """
+
+    def __init__(self, target, translator=google_translate, translate=cached_translate,
+                 stable_partials=2, settle_seconds=0.3, min_words=4, max_workers=1):
+        self.target = target
+        self.translator = translator
+        self.translate = translate
+        self.stable_partials = stable_partials
+        self.settle_seconds = settle_seconds
+        self.min_words = min_words
+        self._memo = TranslationCache(path=None, memory_size=256)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculate")
+        self._cond = threading.Condition()
+        self._recent = []           # word keys of the latest partial hypotheses
+        self._hypothesis = None     # (text, words) of the latest partial
+        self._partial_at = 0.0
+        self._settled = True
+        self._stable_len = 0        # longest stable prefix already guessed
+        self._guesses = {}          # words -> _Guess for the current utterance
+        self._closed = False
+        self._stats = {"finals": 0, "hits": 0, "patches": 0, "misses": 0, "guesses": 0, "used": 0, "saved": 0.0}
+        self._watcher = threading.Thread(target=self._watch, name="speculate-settle", daemon=True)
+        self._watcher.start()
+
+    def _guess(self, text, words):
+        # Called with self._cond held
+        if words in self._guesses:
+            return
+        self._stats["guesses"] += 1
+
+        def run():
+            start = time.perf_counter()
+            with get_tracer().span("speculate", target=self.target, words=len(words)):
+                translated = cached_translate(text, self.target, cache=self._memo, translator=self.translator)
+            return translated, time.perf_counter() - start
+
+        self._guesses[words] = _Guess(words, self._pool.submit(run))
+
+    def on_partial(self, text):
+        words = words_key(text)
+        if not words:
+            return
+        with self._cond:
+            self._hypothesis = (text, words)
+            self._partial_at = time.perf_counter()
+            self._settled = False
+            self._recent = (self._recent + [words])[-self.stable_partials:]
+            if len(self._recent) == self.stable_partials:
+                stable = 0
+                for column in zip(*self._recent):
+                    if len(set(column)) > 1:
+                        break
+                    stable += 1
+                busy = any(not g.future.done() for g in self._guesses.values())
+                if stable >= self._stable_len + self.min_words and not busy:
+                    self._stable_len = stable
+                    self._guess(split_after_words(text, stable)[0], words[:stable])
+            self._cond.notify()
+
+    def _watch(self):
+        while True:
+            with self._cond:
+                while not self._closed and self._settled:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                remaining = self._partial_at + self.settle_seconds - time.perf_counter()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                self._settled = True
+                text, words = self._hypothesis
+                self._guess(text, words)
+
+    def end_utterance(self, final_text):
+        """Take the guesses made for this utterance and start listening for the next one."""
+        with self._cond:
+            guesses = list(self._guesses.values())
+            self._guesses = {}
+            self._recent = []
+            self._hypothesis = None
+            self._settled = True
+            self._stable_len = 0
+        return Speculation(self, final_text, guesses)
+
+    def _record(self, speculation):
+        with self._cond:
+            stats = self._stats
+            stats["finals"] += 1
+            stats[{"hit": "hits", "patch": "patches", "miss": "misses"}[speculation.outcome]] += 1
+            stats["used"] += speculation.outcome != "miss"
+            stats["saved"] += speculation.saved
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+        finals, guesses = stats["finals"], stats["guesses"]
+        return {
+            "finals": finals,
+            "hits": stats["hits"],
+            "patches": stats["patches"],
+            "misses": stats["misses"],
+            "hit_rate": round((stats["hits"] + stats["patches"]) / finals, 4) if finals else 0.0,
+            "guesses": guesses,
+            "wasted_guesses": guesses - stats["used"],
+            "saved_ms": round(1000 * stats["saved"], 1),
+            "avg_saved_ms": round(1000 * stats["saved"] / finals, 1) if finals else 0.0,
+        }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._watcher.join()
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,266 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import azure.cognitiveservices.speech as speechsdk
+except Exception:
+    speechsdk = None
+
+from tts_cache import SynthesisError
+
+# Matches what the dubbing mixer and the recognizer work with
+DEFAULT_OUTPUT_FORMAT = "Riff16Khz16BitMonoPcm"
+# Same audio without the RIFF header, for streaming straight to a player
+STREAM_OUTPUT_FORMAT = "Raw16Khz16BitMonoPcm"
+
+
+def make_speech_config(speech_key, service_region, voice=None, output_format=None):
+    """
+    A fresh SpeechConfig for one voice/format. Configs are never mutated after
+    this point, so requests for different voices can't race on shared state.
+    """
+    if speechsdk is None:
+        raise RuntimeError("azure-cognitiveservices-speech is not installed.")
+    config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
+    if voice:
+        config.speech_synthesis_voice_name = voice
+    if output_format:
+        config.set_speech_synthesis_output_format(getattr(speechsdk.SpeechSynthesisOutputFormat, output_format))
+    return config
+
+
+# ----------------------------- #
+# 🔹 Synthesizer pool
+# ----------------------------- #
+class SynthesizerPool:
+    """
+    Ready-to-use SpeechSynthesizers per (voice, output format), with their
+    service connections opened ahead of time. Synthesizers render into memory
+    (no file-bound audio config), which is what makes them reusable.
+    """
+
+    WAIT_POLL_SECONDS = 0.5     # how often a waiting acquire re-checks for room to create one
+
+    def __init__(self, speech_key, service_region, max_per_key=4, output_format=DEFAULT_OUTPUT_FORMAT):
+        self.speech_key = speech_key
+        self.service_region = service_region
+        self.max_per_key = max_per_key
+        self.output_format = output_format
+        self._idle = {}
+        self._created = {}
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.hits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.discarded = 0
+
+    def _create(self, voice, output_format):
+        config = make_speech_config(self.speech_key, self.service_region, voice, output_format)
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=config, audio_config=None)
+        # Do the TLS/WebSocket handshake now rather than on the first request
+        speechsdk.Connection.from_speech_synthesizer(synthesizer).open(True)
+        return synthesizer
+
+    def _slot(self, key):
+        with self._lock:
+            if key not in self._idle:
+                self._idle[key] = queue.Queue()
+                self._created[key] = 0
+            return self._idle[key]
+
+    def prewarm(self, voice, count=1, output_format=None):
+        """Make sure at least ``count`` connected synthesizers exist for ``voice`` (in the background)."""
+        key = (voice, output_format or self.output_format)
+        idle = self._slot(key)
+        with self._lock:
+            if self._created[key] >= min(count, self.max_per_key):
+                return
+
+        def warm():
+            for _ in range(count):
+                with self._lock:
+                    if self._created[key] >= min(count, self.max_per_key):
+                        return
+                    self._created[key] += 1
+                try:
+                    idle.put(self._create(*key))
+                except Exception:
+                    with self._lock:
+                        self._created[key] -= 1
+                    return
+
+        threading.Thread(target=warm, name=f"prewarm-{voice}", daemon=True).start()
+
+    @contextmanager
+    def acquire(self, voice, output_format=None):
+        key = (voice, output_format or self.output_format)
+        idle = self._slot(key)
+        start = time.perf_counter()
+        synthesizer = None
+        hit = False
+        try:
+            synthesizer = idle.get_nowait()
+            hit = True
+        except queue.Empty:
+            while synthesizer is None:
+                with self._lock:
+                    can_create = self._created[key] < self.max_per_key
+                    if can_create:
+                        self._created[key] += 1
+                if can_create:
+                    try:
+                        synthesizer = self._create(*key)
+                    except Exception:
+                        with self._lock:
+                            self._created[key] -= 1
+                        raise
+                else:
+                    # Pool is at capacity for this voice: wait for a synthesizer to come back,
+                    # re-checking the count in case a pending create (e.g. a prewarm) failed
+                    try:
+                        synthesizer = idle.get(timeout=self.WAIT_POLL_SECONDS)
+                    except queue.Empty:
+                        pass
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.acquisitions += 1
+            self.hits += hit
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        try:
+            yield synthesizer
+        except (GeneratorExit, KeyboardInterrupt):
+            # Abandoned mid-request (e.g. a stream closed before its last chunk): the synthesizer
+            # may still be speaking, so it is dropped rather than handed to the next caller
+            with self._lock:
+                self._created[key] -= 1
+                self.discarded += 1
+            raise
+        except BaseException:
+            idle.put(synthesizer)
+            raise
+        else:
+            idle.put(synthesizer)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "acquisitions": self.acquisitions,
+                "hit_rate": round(self.hits / self.acquisitions, 4) if self.acquisitions else 0.0,
+                "avg_wait_ms": round(1000 * self.wait_seconds / self.acquisitions, 2) if self.acquisitions else 0.0,
+                "max_wait_ms": round(1000 * self.max_wait_seconds, 2),
+                "discarded": self.discarded,
+                "synthesizers": {f"{v}/{f}": n for (v, f), n in self._created.items()},
+            }
+
+
+def pooled_synthesizer(pool):
+    """``synthesize(text, voice, path, ssml)`` for tts_cache, backed by ``pool``."""
+
+    def synthesize(text, voice, path, ssml=False):
+        with pool.acquire(voice) as synthesizer:
+            if ssml:
+                result = synthesizer.speak_ssml_async(text).get()
+            else:
+                result = synthesizer.speak_text_async(text).get()
+        if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+            details = result.cancellation_details
+            message = f"Speech synthesis canceled: {details.reason}"
+            if details.reason == speechsdk.CancellationReason.Error:
+                message += f" ({details.error_details})"
+            raise SynthesisError(message)
+        # RIFF formats already carry the WAV header
+        with open(path, "wb") as f:
+            f.write(result.audio_data)
+
+    synthesize.output_format = pool.output_format
+    return synthesize
+
+
+def pooled_stream(pool, chunk_bytes=6400):
+    """
+    ``stream(text, voice)`` for streaming_tts.StreamingSpeaker: yields raw
+    16 kHz PCM chunks through an in-memory pull stream while the service is
+    still synthesizing. The synthesizer stays checked out until the last chunk;
+    a stream closed before then stops speaking and is not reused.
+    """
+
+    def stream(text, voice):
+        with pool.acquire(voice, STREAM_OUTPUT_FORMAT) as synthesizer:
+            result = synthesizer.start_speaking_text_async(text).get()
+            audio_stream = speechsdk.AudioDataStream(result)
+            buffer = bytes(chunk_bytes)
+            filled = audio_stream.read_data(buffer)
+            try:
+                while filled:
+                    yield buffer[:filled]
+                    filled = audio_stream.read_data(buffer)
+            except GeneratorExit:
+                # The caller stopped reading: stop the service too (the pool then drops this synthesizer)
+                try:
+                    synthesizer.stop_speaking_async().get()
+                except Exception:
+                    pass
+                raise
+            if audio_stream.status == speechsdk.StreamStatus.Canceled:
+                details = audio_stream.cancellation_details
+                message = f"Speech synthesis canceled: {details.reason}"
+                if details.reason == speechsdk.CancellationReason.Error:
+                    message += f" ({details.error_details})"
+                raise SynthesisError(message)
+
+    # Cached sentences are stored as WAVs, i.e. the RIFF variant of the same audio
+    stream.output_format = DEFAULT_OUTPUT_FORMAT
+    stream.sample_rate = 16000
+    return stream
+
+
+if __name__ == "__main__":
+    # Offline check that an abandoned stream never hands a busy synthesizer to the next sentence
+    import itertools
+
+    from streaming_tts import StreamingSpeaker
+
+    class _StubSynthesizer:
+        ids = itertools.count(1)
+
+        def __init__(self):
+            self.id = next(self.ids)
+            self.speaking = False
+
+    class _StubPool(SynthesizerPool):
+        def _create(self, voice, output_format):
+            return _StubSynthesizer()
+
+    def stub_stream(pool):
+        # Same checkout pattern as pooled_stream: the synthesizer is held across every yield
+        def stream(text, voice):
+            with pool.acquire(voice, STREAM_OUTPUT_FORMAT) as synthesizer:
+                assert not synthesizer.speaking, f"synthesizer {synthesizer.id} handed out while still speaking"
+                synthesizer.speaking = True
+                for _ in range(20):
+                    yield bytes(640)
+                synthesizer.speaking = False
+        return stream
+
+    class _FailingPlayer:
+        def write(self, pcm):
+            raise RuntimeError("player failed")
+
+        def end_sentence(self):
+            pass
+
+    pool = _StubPool("", "", max_per_key=1)
+    speaker = StreamingSpeaker(stub_stream(pool), lookahead=1, max_queued_chunks=2)
+    try:
+        speaker.speak("First sentence. Second one.", "en-US-AriaNeural", _FailingPlayer())
+    except RuntimeError as e:
+        print(f"Player error as expected: {e}")
+    # The next sentence for that voice must get a synthesizer that isn't mid-request
+    chunks = list(stub_stream(pool)("Third sentence.", "en-US-AriaNeural"))
+    stats = pool.stats()
+    print(f"{len(chunks)} chunks after the abandoned stream; {stats['discarded']} synthesizer(s) discarded")
+    assert stats["discarded"] >= 1
@@ -0,0 +1,540 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from starlette.applications import Starlette
+from starlette.responses import FileResponse, JSONResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocketDisconnect
+
+from languages import DEFAULT_VOICE, voice_mapping
+from streaming_tts import STREAM_SAMPLE_RATE, StreamingSpeaker
+from tracing import configure_tracer, get_tracer
+from workspace import WORKSPACE_ROOT, ArtifactStore
+
+# HTTP/WebSocket front end for the pipeline:
+#   POST /jobs?targets=hi,fr&filename=clip.mp4   (raw media body) → 202 with a job id
+#   GET  /jobs/{id}, GET /jobs/{id}/files/{name}, GET /health
+#   WS   /stream?target=hi   binary 16 kHz mono s16le PCM in; JSON events and PCM audio chunks out
+
+VIDEO_EXTENSIONS = {".mp4", ".mkv", ".mov"}
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a"}
+# WebSocket close codes: 1008 policy violation (bad request), 1013 try again later (at capacity)
+CLOSE_BAD_REQUEST = 1008
+CLOSE_BUSY = 1013
+
+
+@dataclass
+class ServiceLimits:
+    max_streams: int = 8            # concurrent WebSocket sessions; more are closed with 1013
+    max_jobs: int = 2               # file jobs running at once
+    max_queued_jobs: int = 16       # running + waiting file jobs; more get 429
+    stage_workers: int = 32         # threads shared by the blocking stage calls of all sessions
+    cpu_workers: int = 2            # processes for mixing and muxing
+    ingest_chunks: int = 32         # PCM messages buffered per client before its socket stops being read
+    outgoing_messages: int = 64     # events/audio chunks buffered per client before synthesis waits
+    slow_client_seconds: float = 10.0   # a client that reads nothing for this long is disconnected
+    lookahead: int = 2              # sentences synthesized ahead per session
+    max_upload_bytes: int = 512 * 1024 * 1024
+    job_history: int = 1000         # finished jobs kept for GET /jobs/{id}
+
+
+@dataclass
+class Backends:
+    recognizer: object      # FakeRecognizer / AzureRecognizerBackend (needs open_stream for /stream)
+    synthesize: object      # synthesize(text, voice, path, ssml) for file jobs
+    stream: object          # stream(text, voice) → PCM chunks, for StreamingSpeaker
+    translate: object       # translate(text, target)
+    speech_cache: object = None     # tts_cache.SynthesisCache for streamed sentences
+
+
+@dataclass
+class Job:
+    id: str
+    filename: str
+    targets: dict
+    content_hash: str = ""
+    input_path: str = ""
+    status: str = "queued"      # queued / running / done / incomplete / failed
+    created_at: float = field(default_factory=time.time)
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    original_text: str = ""
+    translations: dict = field(default_factory=dict)
+    files: dict = field(default_factory=dict)   # download name → path
+    reused: list = field(default_factory=list)
+    error: str = ""
+
+    def to_dict(self):
+        return {
+            "id": self.id, "filename": self.filename, "targets": list(self.targets), "status": self.status,
+            "queued_s": round((self.started_at or time.time()) - self.created_at, 3),
+            "run_s": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else 0.0,
+            "original_text": self.original_text, "translations": self.translations,
+            "files": {name: f"/jobs/{self.id}/files/{name}" for name in self.files},
+            "reused": self.reused, "error": self.error,
+        }
+
+
+class _ClosedError(Exception):
+    pass
+
+
+class _QueuePlayer:
+    """StreamingSpeaker player that hands PCM to a session's outgoing queue, waiting while it is full."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def write(self, pcm):
+        self.session.send_from_thread(pcm)
+
+    def end_sentence(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# ----------------------------- #
+# 🔹 Streaming session
+# ----------------------------- #
+class StreamSession:
+    """
+    One WebSocket client. Five tasks connected by bounded asyncio queues:
+
+    receive → feed (PCM into the recognizer's push stream) → recognizer
+    callbacks → translate → speak → send
+
+    Blocking calls run on the service's shared stage pool, so the event loop
+    never waits on the network. Every queue is bounded: a client that sends
+    faster than the recognizer takes audio stops being read (TCP pushes back
+    on it), and a client that reads slower than synthesis produces holds
+    synthesis up, until it has read nothing for ``slow_client_seconds`` and
+    is disconnected. Partial hypotheses are dropped rather than waited for.
+    """
+
+    def __init__(self, service, websocket, target, voice, sample_rate):
+        limits = service.limits
+        self.service = service
+        self.websocket = websocket
+        self.target = target
+        self.voice = voice
+        self.sample_rate = sample_rate
+        self.loop = asyncio.get_running_loop()
+        self.incoming = asyncio.Queue(maxsize=limits.ingest_chunks)
+        self.outgoing = asyncio.Queue(maxsize=limits.outgoing_messages)
+        self.segments = asyncio.Queue()     # fed by the recognizer, which already paces them
+        self.translated = asyncio.Queue(maxsize=limits.lookahead)
+        self.recognition = None
+        self.recognition_error = ""
+        self.closed = False
+        self.span = get_tracer().span("job", kind="stream", target=target)
+        self.stats = {"audio_seconds": 0.0, "utterances": 0, "partials_dropped": 0, "errors": 0}
+
+    async def run_blocking(self, fn, *args):
+        span = self.span
+
+        def call():
+            with get_tracer().activate(span):
+                return fn(*args)
+
+        return await self.loop.run_in_executor(self.service.stage_pool, call)
+
+    # Recognizer callbacks arrive on SDK threads
+    def on_partial(self, text):
+        self.loop.call_soon_threadsafe(self._offer, {"type": "partial", "text": text})
+
+    def on_segment(self, segment):
+        self.loop.call_soon_threadsafe(self.segments.put_nowait, segment)
+
+    def on_done(self, error=""):
+        def finish():
+            self.recognition_error = self.recognition_error or error
+            self.segments.put_nowait(None)
+        self.loop.call_soon_threadsafe(finish)
+
+    def _offer(self, message):
+        try:
+            self.outgoing.put_nowait(message)
+        except asyncio.QueueFull:
+            self.stats["partials_dropped"] += 1
+
+    def send_from_thread(self, message):
+        if self.closed:
+            raise _ClosedError("client went away")
+        future = asyncio.run_coroutine_threadsafe(self.outgoing.put(message), self.loop)
+        try:
+            future.result(timeout=self.service.limits.slow_client_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            raise _ClosedError("client is not reading") from None
+
+    async def receive(self):
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                await self.incoming.put(message["bytes"])
+            elif message.get("text"):
+                try:
+                    event = json.loads(message["text"])
+                except ValueError:
+                    event = {}
+                if event.get("type") == "end":
+                    await self.incoming.put(None)
+                    return
+
+    async def feed(self):
+        while True:
+            chunk = await self.incoming.get()
+            if chunk is None:
+                await self.run_blocking(self.recognition.close)
+                return
+            self.stats["audio_seconds"] += len(chunk) / 2 / self.sample_rate
+            await self.run_blocking(self.recognition.write, chunk)
+
+    async def translate(self):
+        while True:
+            segment = await self.segments.get()
+            if segment is None:
+                await self.translated.put(None)
+                return
+            received_at = time.perf_counter()
+            await self.outgoing.put({"type": "transcript", "seq": self.stats["utterances"], "text": segment.text,
+                                     "offset": round(segment.offset, 3), "end": round(segment.end, 3)})
+            try:
+                translated = await self.run_blocking(self.service.backends.translate, segment.text, self.target)
+                error = ""
+            except Exception as e:
+                translated, error = "", str(e)
+            await self.translated.put((self.stats["utterances"], translated, error, received_at))
+            self.stats["utterances"] += 1
+
+    async def speak(self):
+        speaker = StreamingSpeaker(self.service.backends.stream, lookahead=self.service.limits.lookahead,
+                                   cache=self.service.backends.speech_cache)
+        while True:
+            item = await self.translated.get()
+            if item is None:
+                await self.outgoing.put({"type": "done", "error": self.recognition_error, **self.summary()})
+                await self.outgoing.put(None)
+                return
+            seq, translated, error, received_at = item
+            await self.outgoing.put({"type": "translation", "seq": seq, "text": translated, "error": error,
+                                     "translate_ms": round(1000 * (time.perf_counter() - received_at), 1)})
+            if error or not translated:
+                self.stats["errors"] += bool(error)
+                continue
+            await self.outgoing.put({"type": "audio_start", "seq": seq, "sample_rate": speaker.sample_rate})
+            spoken = await self.run_blocking(speaker.speak, translated, self.voice, _QueuePlayer(self))
+            self.stats["errors"] += bool(spoken.error)
+            await self.outgoing.put({"type": "audio_end", "seq": seq, "error": spoken.error,
+                                     "first_audio_ms": round(1000 * (spoken.first_audio_at - received_at), 1)
+                                     if spoken.first_audio_at else 0.0})
+
+    async def send(self):
+        while True:
+            message = await self.outgoing.get()
+            if message is None:
+                return
+            if isinstance(message, bytes):
+                await self.websocket.send_bytes(message)
+            else:
+                await self.websocket.send_json(message)
+
+    def summary(self):
+        return {"audio_seconds": round(self.stats["audio_seconds"], 3), "utterances": self.stats["utterances"],
+                "partials_dropped": self.stats["partials_dropped"], "errors": self.stats["errors"]}
+
+    async def run(self):
+        backend = self.service.backends.recognizer
+        self.recognition = await self.run_blocking(backend.open_stream, self.on_segment, self.on_done,
+                                                   self.on_partial, self.sample_rate)
+        tasks = [asyncio.create_task(step()) for step in (self.receive, self.feed, self.translate, self.speak,
+                                                          self.send)]
+        sender, pending = tasks[-1], set(tasks)
+        try:
+            # Over once everything has been sent (recognition may also end on its own, e.g. canceled)
+            while sender in pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+        finally:
+            self.closed = True
+            for task in tasks:
+                task.cancel()
+            # Free a synthesis thread waiting for room in the queue
+            while not self.outgoing.empty():
+                self.outgoing.get_nowait()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.run_blocking(self.recognition.stop)
+            self.span.set("audio_seconds", round(self.stats["audio_seconds"], 3))
+            self.span.set("utterances", self.stats["utterances"])
+            self.span.end(self.recognition_error)
+
+
+# ----------------------------- #
+# 🔹 Service
+# ----------------------------- #
+class SpeechService:
+    def __init__(self, backends, limits=None, workspace=WORKSPACE_ROOT):
+        self.backends = backends
+        self.limits = limits or ServiceLimits()
+        self.store = ArtifactStore(root=workspace)
+        self.scratch_dir = os.path.join(workspace, "uploads")
+        os.makedirs(self.scratch_dir, exist_ok=True)
+        self.jobs = {}
+        self._job_tasks = set()     # strong references: the event loop only keeps weak ones
+        self.active_streams = 0
+        self.stage_pool = None
+        self.job_pool = None
+        self.cpu_pool = None
+        self._job_slots = None
+
+    @asynccontextmanager
+    async def lifespan(self, app):
+        limits = self.limits
+        self.stage_pool = ThreadPoolExecutor(max_workers=limits.stage_workers, thread_name_prefix="stage")
+        self.job_pool = ThreadPoolExecutor(max_workers=limits.max_jobs, thread_name_prefix="job")
+        # spawn, not fork: the service already runs SDK and pool threads
+        self.cpu_pool = (ProcessPoolExecutor(max_workers=limits.cpu_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+                         if limits.cpu_workers > 0 else None)
+        self._job_slots = asyncio.Semaphore(limits.max_jobs)
+        try:
+            yield
+        finally:
+            for task in self._job_tasks:
+                task.cancel()
+            await asyncio.gather(*self._job_tasks, return_exceptions=True)
+            self.job_pool.shutdown(wait=True, cancel_futures=True)
+            self.stage_pool.shutdown(wait=True, cancel_futures=True)
+            if self.cpu_pool is not None:
+                self.cpu_pool.shutdown(wait=True, cancel_futures=True)
+
+    def create_app(self):
+        return Starlette(routes=[
+            Route("/health", self.health),
+            Route("/jobs", self.create_job, methods=["POST"]),
+            Route("/jobs/{job_id}", self.get_job),
+            Route("/jobs/{job_id}/files/{name}", self.get_job_file),
+            WebSocketRoute("/stream", self.stream),
+        ], lifespan=self.lifespan)
+
+    # ----- REST: file jobs -----
+    async def health(self, request):
+        counts = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return JSONResponse({"streams": self.active_streams, "jobs": counts,
+                             "limits": {"max_streams": self.limits.max_streams, "max_jobs": self.limits.max_jobs,
+                                        "max_queued_jobs": self.limits.max_queued_jobs}})
+
+    async def create_job(self, request):
+        filename = os.path.basename(request.query_params.get("filename", ""))
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in VIDEO_EXTENSIONS | AUDIO_EXTENSIONS:
+            return JSONResponse({"error": f"filename must end in one of {sorted(VIDEO_EXTENSIONS | AUDIO_EXTENSIONS)}"},
+                                status_code=400)
+        codes = [c for c in request.query_params.get("targets", "").split(",") if c]
+        unknown = [c for c in codes if c not in voice_mapping]
+        if not codes or unknown:
+            return JSONResponse({"error": f"unknown or missing targets: {unknown or codes}"}, status_code=400)
+        waiting = sum(job.status in ("queued", "running") for job in self.jobs.values())
+        if waiting >= self.limits.max_queued_jobs:
+            return JSONResponse({"error": "too many jobs, try again later"}, status_code=429,
+                                headers={"Retry-After": "5"})
+
+        job = Job(id=uuid.uuid4().hex, filename=filename,
+                  targets={code: voice_mapping.get(code, DEFAULT_VOICE) for code in dict.fromkeys(codes)})
+        loop = asyncio.get_running_loop()
+        tmp_path = os.path.join(self.scratch_dir, f"upload-{job.id}.part")
+        digest, size = hashlib.sha256(), 0
+        try:
+            with open(tmp_path, "wb") as f:
+                async for chunk in request.stream():
+                    size += len(chunk)
+                    if size > self.limits.max_upload_bytes:
+                        return JSONResponse({"error": "upload too large"}, status_code=413)
+                    digest.update(chunk)
+                    await loop.run_in_executor(self.stage_pool, f.write, chunk)
+            if not size:
+                return JSONResponse({"error": "empty upload"}, status_code=400)
+            job.content_hash, job.input_path = await loop.run_in_executor(
+                self.stage_pool, self.store.adopt_upload, tmp_path, digest.hexdigest(), ext)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.jobs[job.id] = job
+        self._forget_old_jobs()
+        task = asyncio.create_task(self._run_job(job))
+        self._job_tasks.add(task)
+        task.add_done_callback(self._job_tasks.discard)
+        return JSONResponse(job.to_dict(), status_code=202, headers={"Location": f"/jobs/{job.id}"})
+
+    def _forget_old_jobs(self):
+        finished = [j for j in self.jobs.values() if j.status not in ("queued", "running")]
+        for job in finished[:max(0, len(finished) - self.limits.job_history)]:
+            del self.jobs[job.id]
+
+    async def _run_job(self, job):
+        try:
+            async with self._job_slots:
+                job.status, job.started_at = "running", time.time()
+                await asyncio.get_running_loop().run_in_executor(self.job_pool, self._dub, job)
+        except asyncio.CancelledError:
+            job.status, job.error = "failed", "service shutting down"
+            raise
+        except Exception as e:
+            job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+        finally:
+            job.finished_at = time.time()
+
+    def _dub(self, job):
+        from video_job import dub_video_languages
+
+        is_video = os.path.splitext(job.filename)[1].lower() in VIDEO_EXTENSIONS
+        with get_tracer().span("job", kind="service", targets=",".join(job.targets)) as span:
+            result = dub_video_languages(self.store, job.content_hash, job.input_path, job.targets,
+                                         self.backends.recognizer, self.backends.synthesize,
+                                         translate=self.backends.translate, cpu_pool=self.cpu_pool,
+                                         mux=is_video)
+            job.original_text = result.original_text
+            job.reused = result.reused
+            job.translations = {lang: dub.translated_text for lang, dub in result.languages.items()}
+            failed = "; ".join(f"{lang}: {dub.first_error}" for lang, dub in result.languages.items()
+                               if dub.failed_segments)
+            job.error = result.recognition_error or failed or ("" if result.original_text else "No speech recognized")
+            if result.original_text:
+                stem = os.path.splitext(job.filename)[0]
+                if is_video:
+                    job.files[f"{stem}.{'_'.join(job.targets)}.mp4"] = result.output_path
+                else:
+                    job.files.update({f"{stem}.{lang}.wav": dub.audio_path for lang, dub in result.languages.items()})
+            job.status = "failed" if not job.files else ("incomplete" if job.error else "done")
+            span.set_error(job.error)
+
+    async def get_job(self, request):
+        job = self.jobs.get(request.path_params["job_id"])
+        if job is None:
+            return JSONResponse({"error": "no such job"}, status_code=404)
+        return JSONResponse(job.to_dict())
+
+    async def get_job_file(self, request):
+        job = self.jobs.get(request.path_params["job_id"])
+        path = job.files.get(request.path_params["name"]) if job else None
+        if path is None or not os.path.isfile(path):
+            return JSONResponse({"error": "no such file"}, status_code=404)
+        return FileResponse(path, filename=request.path_params["name"])
+
+    # ----- WebSocket: streaming speech-to-speech -----
+    async def stream(self, websocket):
+        await websocket.accept()
+        target = websocket.query_params.get("target", "hi")
+        try:
+            sample_rate = int(websocket.query_params.get("sample_rate", STREAM_SAMPLE_RATE))
+        except ValueError:
+            sample_rate = 0
+        if target not in voice_mapping or sample_rate <= 0:
+            await websocket.close(code=CLOSE_BAD_REQUEST, reason="unknown target or bad sample_rate")
+            return
+        if self.active_streams >= self.limits.max_streams:
+            await websocket.close(code=CLOSE_BUSY, reason="too many streams, try again later")
+            return
+        self.active_streams += 1
+        session = StreamSession(self, websocket, target, voice_mapping[target], sample_rate)
+        try:
+            await websocket.send_json({"type": "ready", "target": target, "voice": session.voice,
+                                       "sample_rate": sample_rate})
+            await session.run()
+            await websocket.close()
+        except WebSocketDisconnect:
+            pass
+        except _ClosedError as e:
+            await websocket.close(code=CLOSE_BUSY, reason=str(e))
+        finally:
+            self.active_streams -= 1
+
+
+# ----------------------------- #
+# 🔹 Backends
+# ----------------------------- #
+def azure_backends():
+    from dotenv import load_dotenv
+    import azure.cognitiveservices.speech as speechsdk
+    from recognition import AzureRecognizerBackend
+    from speech_clients import SynthesizerPool, pooled_stream, pooled_synthesizer
+    from translation_cache import cached_translate
+    from tts_cache import get_synthesis_cache
+
+    load_dotenv()
+    speech_key = os.getenv("Speech_key") or os.getenv("SPEECH_KEY") or os.getenv("AZURE_SPEECH_KEY")
+    service_region = os.getenv("Speech_region") or os.getenv("SPEECH_REGION") or os.getenv("AZURE_SPEECH_REGION")
+    if not speech_key or not service_region:
+        raise SystemExit("ERROR: Azure Speech key/region not found. Set 'Speech_key' and 'Speech_region' (or use --fake).")
+    speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=service_region)
+    pool = SynthesizerPool(speech_key, service_region, max_per_key=8)
+    return Backends(recognizer=AzureRecognizerBackend(speech_config, languages=["en-IN", "hi-IN"]),
+                    synthesize=pooled_synthesizer(pool), stream=pooled_stream(pool), translate=cached_translate,
+                    speech_cache=get_synthesis_cache())
+
+
+def fake_backends(realtime_factor=0.05):
+    # Offline stand-ins; translations stay out of the shared cache
+    from fake_backends import FakeRecognizer, FakeSynthesizer, FakeTranslator
+    from translation_cache import TranslationCache, cached_translate
+
+    translator = FakeTranslator()
+    translation_cache = TranslationCache(path=None)
+
+    def translate(text, target):
+        return cached_translate(text, target, cache=translation_cache, translator=translator)
+
+    synthesizer = FakeSynthesizer(latency=0.1, realtime_factor=0.1)
+    return Backends(recognizer=FakeRecognizer(realtime_factor=realtime_factor), synthesize=synthesizer,
+                    stream=synthesizer.stream, translate=translate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/WebSocket speech-to-speech service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fake", action="store_true", help="Use the offline fake backends instead of Azure/Google")
+    parser.add_argument("--workspace", default=None,
+                        help="Artifact store root, shared with app.py (default: Data/workspace)")
+    defaults = ServiceLimits()
+    for name in ("max_streams", "max_jobs", "max_queued_jobs", "stage_workers", "cpu_workers",
+                 "ingest_chunks", "outgoing_messages"):
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=getattr(defaults, name))
+    parser.add_argument("--slow-client-seconds", type=float, default=defaults.slow_client_seconds)
+    parser.add_argument("--trace", action="store_true", help="Export per-stage spans and metrics to Data/traces/ (or TRACING=1)")
+    args = parser.parse_args()
+    if args.trace:
+        configure_tracer()
+
+    import uvicorn
+
+    limits = ServiceLimits(**{name: getattr(args, name) for name in ServiceLimits.__dataclass_fields__
+                              if hasattr(args, name)})
+    # Fake runs keep their artifacts apart so they are never reused by a real run
+    workspace = args.workspace or (os.path.join(WORKSPACE_ROOT, "fake-service") if args.fake else WORKSPACE_ROOT)
+    service = SpeechService(fake_backends() if args.fake else azure_backends(), limits, workspace)
+    print(f"🎙️ Listening on http://{args.host}:{args.port} (ws://{args.host}:{args.port}/stream)")
+    uvicorn.run(service.create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+import io
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from tracing import get_tracer
+
+STREAM_SAMPLE_RATE = 16000
+# Sentence ends for Latin scripts, Devanagari (danda) and CJK full-width punctuation
+SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+|(?<=[。！？])")
+MAX_SENTENCE_CHARS = 400
+_END = object()
+_CACHED = object()
+
+
+def split_sentences(text, max_chars=MAX_SENTENCE_CHARS):
+    """
+    Split ``text`` into sentences no longer than ``max_chars``. A sentence
+    that is still too long is cut at its last comma, else its last space,
+    before the limit.
+    """
+    pieces = []
+    for sentence in SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(", ", 0, max_chars)
+            if cut <= 0:
+                cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut + 1 if cut > 0 else max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+def pcm_to_wav_bytes(pcm, sample_rate=STREAM_SAMPLE_RATE):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(bytes(pcm))
+    return buffer.getvalue()
+
+
+# ----------------------------- #
+# 🔹 Playback backends
+# ----------------------------- #
+# Every player takes raw 16-bit mono PCM through write(), is told where each
+# sentence ends, and is closed once the text has been spoken.
+
+class WavWriter:
+    """A WAV file that grows as audio arrives; the header is patched on every write."""
+
+    def __init__(self, path, sample_rate=STREAM_SAMPLE_RATE):
+        self.path = path
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def write(self, pcm):
+        self._wav.writeframes(pcm)
+
+    def end_sentence(self):
+        pass
+
+    def close(self):
+        self._wav.close()
+
+
+class SoundDevicePlayer:
+    """Plays through PortAudio (Windows, macOS, Linux) via the optional sounddevice package."""
+
+    def __init__(self, sample_rate=STREAM_SAMPLE_RATE):
+        import sounddevice
+
+        self._stream = sounddevice.RawOutputStream(samplerate=sample_rate, channels=1, dtype="int16")
+        self._stream.start()
+
+    def write(self, pcm):
+        self._stream.write(pcm)   # blocks at playback speed
+
+    def end_sentence(self):
+        pass
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+
+
+class PipePlayer:
+    """Pipes raw PCM into a command-line player found on PATH (ffplay, aplay or paplay)."""
+
+    COMMANDS = {
+        "ffplay": lambda rate: ["-nodisp", "-autoexit", "-loglevel", "error",
+                                "-f", "s16le", "-ar", str(rate), "-ac", "1", "-i", "pipe:0"],
+        "aplay": lambda rate: ["-q", "-t", "raw", "-f", "S16_LE", "-r", str(rate), "-c", "1"],
+        "paplay": lambda rate: ["--raw", "--format=s16le", f"--rate={rate}", "--channels=1"],
+    }
+
+    def __init__(self, sample_rate=STREAM_SAMPLE_RATE):
+        for name, args in self.COMMANDS.items():
+            exe = shutil.which(name)
+            if exe:
+                self._proc = subprocess.Popen([exe] + args(sample_rate), stdin=subprocess.PIPE,
+                                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                return
+        raise RuntimeError("No command-line audio player (ffplay, aplay, paplay) found on PATH.")
+
+    def write(self, pcm):
+        self._proc.stdin.write(pcm)
+        self._proc.stdin.flush()
+
+    def end_sentence(self):
+        pass
+
+    def close(self):
+        self._proc.stdin.close()
+        self._proc.wait()
+
+
+class WinSoundPlayer:
+    """Windows without sounddevice: winsound can't stream, so each sentence plays once it is complete."""
+
+    def __init__(self, sample_rate=STREAM_SAMPLE_RATE):
+        import winsound
+
+        self._winsound = winsound
+        self.sample_rate = sample_rate
+        self._pcm = bytearray()
+
+    def write(self, pcm):
+        self._pcm += pcm
+
+    def end_sentence(self):
+        if self._pcm:
+            self._winsound.PlaySound(pcm_to_wav_bytes(self._pcm, self.sample_rate), self._winsound.SND_MEMORY)
+        self._pcm = bytearray()
+
+    def close(self):
+        self.end_sentence()
+
+
+class TeePlayer:
+    """Hands the same audio to several players, e.g. the speakers and a WavWriter."""
+
+    def __init__(self, players):
+        self.players = [p for p in players if p is not None]
+
+    def write(self, pcm):
+        for player in self.players:
+            player.write(pcm)
+
+    def end_sentence(self):
+        for player in self.players:
+            player.end_sentence()
+
+    def close(self):
+        for player in self.players:
+            player.close()
+
+
+def open_player(sample_rate=STREAM_SAMPLE_RATE):
+    """The best audio output available here, or None when there is none."""
+    for backend in (SoundDevicePlayer, PipePlayer, WinSoundPlayer if sys.platform == "win32" else None):
+        if backend is None:
+            continue
+        try:
+            return backend(sample_rate)
+        except Exception:
+            continue
+    return None
+
+
+# ----------------------------- #
+# 🔹 Sentence-chunked streaming synthesis
+# ----------------------------- #
+@dataclass
+class SpeakResult:
+    sentences: int = 0
+    cached_sentences: int = 0
+    bytes: int = 0
+    first_audio: float = 0.0        # seconds from speak() until the first chunk reached the player
+    first_audio_at: float = 0.0     # the same moment as a perf_counter() timestamp
+    total: float = 0.0
+    error: str = ""
+
+
+class StreamingSpeaker:
+    """
+    Speaks text sentence by sentence. ``stream(text, voice)`` yields raw PCM
+    chunks as the service produces them (speech_clients.pooled_stream, or a
+    fake), so playback starts with the first chunk of the first sentence.
+    At most ``lookahead`` sentences are synthesized at once, and chunks
+    always reach the player in sentence order. Each sentence buffers at most
+    ``max_queued_chunks`` chunks ahead of the player; its producer waits
+    beyond that, so a slow player never lets decoded audio pile up.
+
+    With a tts_cache.SynthesisCache, sentences spoken before are read from the
+    cache and newly streamed ones are stored as WAVs under the same key
+    ``cached_synthesize`` would use for that sentence in ``output_format``.
+    """
+
+    def __init__(self, stream, lookahead=2, cache=None, output_format=None, chunk_bytes=6400,
+                 max_queued_chunks=32):
+        self.stream = stream
+        self.lookahead = lookahead
+        self.max_queued_chunks = max_queued_chunks
+        self.cache = cache
+        self.output_format = output_format or getattr(stream, "output_format", "default")
+        self.chunk_bytes = chunk_bytes
+        self.sample_rate = getattr(stream, "sample_rate", STREAM_SAMPLE_RATE)
+
+    @staticmethod
+    def _put(out_queue, item, cancelled):
+        # Waits for room in the sentence's queue; False once speak() has given up on it
+        while not cancelled.is_set():
+            try:
+                out_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce(self, sentence, voice, out_queue, cancelled):
+        put = lambda item: self._put(out_queue, item, cancelled)
+        try:
+            key = self.cache.make_key(voice, self.output_format, sentence) if self.cache else None
+            path = self.cache.get(key) if key else None
+            try:
+                cached = wave.open(path, "rb") if path else None
+            except FileNotFoundError:
+                cached = None   # evicted by another process since get()
+            if cached:
+                put(_CACHED)
+                with cached as wf:
+                    frames = self.chunk_bytes // 2
+                    chunk = wf.readframes(frames)
+                    while chunk and put(chunk):
+                        chunk = wf.readframes(frames)
+                return
+            collected = bytearray()
+            for chunk in self.stream(sentence, voice):
+                if not put(bytes(chunk)):
+                    return
+                collected += chunk
+            if key and collected:
+                def render(tmp_path):
+                    with open(tmp_path, "wb") as f:
+                        f.write(pcm_to_wav_bytes(collected, self.sample_rate))
+                self.cache.put(key, render)
+        except Exception as e:
+            put(e)
+        finally:
+            put(_END)
+
+    @staticmethod
+    def _play(queues, player, result, start):
+        for out_queue in queues:
+            while True:
+                item = out_queue.get()
+                if item is _END:
+                    break
+                if item is _CACHED:
+                    result.cached_sentences += 1
+                elif isinstance(item, Exception):
+                    result.error = result.error or str(item)
+                else:
+                    if not result.first_audio_at:
+                        result.first_audio_at = time.perf_counter()
+                        result.first_audio = result.first_audio_at - start
+                    player.write(item)
+                    result.bytes += len(item)
+            player.end_sentence()
+
+    def speak(self, text, voice, player):
+        """Speak ``text`` through ``player``; returns once the last chunk has been written to it."""
+        result = SpeakResult()
+        start = time.perf_counter()
+        sentences = split_sentences(text)
+        result.sentences = len(sentences)
+        queues = [queue.Queue(maxsize=self.max_queued_chunks) for _ in sentences]
+        cancelled = threading.Event()
+        with get_tracer().span("synthesize", voice=voice, chars=len(text), sentences=len(sentences),
+                               streaming=True) as span, \
+                ThreadPoolExecutor(max_workers=max(1, self.lookahead)) as pool:
+            # The pool runs sentences in order, at most ``lookahead`` at a time
+            for sentence, out_queue in zip(sentences, queues):
+                pool.submit(self._produce, sentence, voice, out_queue, cancelled)
+            try:
+                self._play(queues, player, result, start)
+            finally:
+                # Producers still waiting on a full queue give up if the player failed
+                cancelled.set()
+            span.set("bytes", result.bytes)
+            span.set("first_audio_ms", round(1000 * result.first_audio, 1))
+            span.set("cache_hit", result.sentences > 0 and result.cached_sentences == result.sentences)
+            span.set_error(result.error)
+        result.total = time.perf_counter() - start
+        return result
+
+
+if __name__ == "__main__":
+    # Time-to-first-audio vs whole-text synthesis with the fake synthesizer
+    import os
+    import tempfile
+
+    from fake_backends import FakeSynthesizer
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(script_dir, "Data", "text.txt"), "r", encoding="utf-8") as f:
+        text = " ".join(line.strip() for line in f if line.strip())
+    synthesizer = FakeSynthesizer(latency=0.1, realtime_factor=0.1)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        synthesizer(text, "en-US-AriaNeural", os.path.join(tmp, "whole.wav"))
+        whole = time.perf_counter() - start
+        writer = WavWriter(os.path.join(tmp, "streamed.wav"))
+        spoken = StreamingSpeaker(synthesizer.stream).speak(text, "en-US-AriaNeural", writer)
+        writer.close()
+    print(f"📝 {len(text)} characters, {spoken.sentences} sentences")
+    print(f"🐢 Whole text: first audio after {whole * 1000:.0f} ms")
+    print(f"⚡ Streamed:   first audio after {spoken.first_audio * 1000:.0f} ms (all audio after {spoken.total * 1000:.0f} ms)")
@@ -0,0 +1,271 @@
+import contextvars
+import json
+import os
+import threading
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TRACE_DIR = os.getenv("TRACE_DIR") or os.path.join(script_dir, "Data", "traces")
+# Histogram buckets (seconds) for the Prometheus dump
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+# ----------------------------- #
+# 🔹 Spans
+# ----------------------------- #
+class Span:
+    """
+    One timed stage of a job. Use it as a context manager (it becomes the
+    parent of spans opened inside it on the same thread) or call ``end()``
+    when the work finishes somewhere else.
+    """
+
+    def __init__(self, tracer, name, parent, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(8).hex()
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.error = ""
+        self.stage_times = {}       # child span name -> total seconds
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self._token = None
+
+    def __bool__(self):
+        return True
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def add(self, key, amount=1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def set_error(self, message):
+        if message and not self.error:
+            self.error = message
+
+    def end(self, error=""):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._start
+        self.set_error(error)
+        self.tracer._finish(self)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        self.end(f"{exc_type.__name__}: {exc}" if exc_type else "")
+        return False
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "start": round(self.started_at, 6),
+            "duration": round(self.duration or 0.0, 6),
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned for every span while tracing is off; falsy so callers can skip attribute work."""
+
+    trace_id = span_id = None
+    stage_times = {}
+
+    def __bool__(self):
+        return False
+
+    def set(self, key, value):
+        pass
+
+    def add(self, key, amount=1):
+        pass
+
+    def set_error(self, message):
+        pass
+
+    def end(self, error=""):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Activation:
+    """Makes ``span`` the current parent on this thread, e.g. inside a worker pool."""
+
+    def __init__(self, span):
+        self.span = span
+
+    def __enter__(self):
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+
+# ----------------------------- #
+# 🔹 Tracer + exporters
+# ----------------------------- #
+class Tracer:
+    """
+    Collects spans and exports them as JSONL (one line per finished span) and
+    as a Prometheus text dump of per-stage counters and duration histograms,
+    rewritten whenever a job (root span) finishes. Disabled tracers hand out
+    a shared no-op span, so instrumented code costs one call per stage.
+    """
+
+    def __init__(self, enabled=False, trace_dir=DEFAULT_TRACE_DIR):
+        self.enabled = enabled
+        self.trace_dir = trace_dir
+        self.jsonl_path = os.path.join(trace_dir, "spans.jsonl") if trace_dir else None
+        self.metrics_path = os.path.join(trace_dir, "metrics.prom") if trace_dir else None
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._jsonl = None
+        if enabled and trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+            self._jsonl = open(self.jsonl_path, "a", encoding="utf-8")
+
+    def current(self):
+        return _current_span.get() if self.enabled else None
+
+    def span(self, name, parent=None, **attributes):
+        """Start a span under ``parent`` (default: the current span on this thread)."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, parent or _current_span.get(), attributes)
+
+    def activate(self, span):
+        if not span:
+            return NOOP_SPAN
+        return _Activation(span)
+
+    def _finish(self, span):
+        record = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            stats = self._metrics.setdefault(span.name, {
+                "count": 0, "sum": 0.0, "errors": 0, "bytes": 0, "cache_hits": 0,
+                "buckets": [0] * len(DURATION_BUCKETS),
+            })
+            stats["count"] += 1
+            stats["sum"] += span.duration
+            stats["errors"] += bool(span.error)
+            stats["bytes"] += span.attributes.get("bytes", 0) or 0
+            stats["cache_hits"] += bool(span.attributes.get("cache_hit"))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if span.duration <= bound:
+                    stats["buckets"][i] += 1
+            if span.parent is not None:
+                times = span.parent.stage_times
+                times[span.name] = times.get(span.name, 0.0) + span.duration
+            if self._jsonl is not None:
+                self._jsonl.write(record + "\n")
+                self._jsonl.flush()
+        if span.parent is None and self.metrics_path:
+            self.write_metrics()
+
+    def prometheus_text(self):
+        with self._lock:
+            metrics = {name: dict(stats, buckets=list(stats["buckets"])) for name, stats in self._metrics.items()}
+        lines = [
+            "# HELP speech_stage_duration_seconds Time spent in each pipeline stage.",
+            "# TYPE speech_stage_duration_seconds histogram",
+        ]
+        for name, stats in sorted(metrics.items()):
+            for bound, count in zip(DURATION_BUCKETS, stats["buckets"]):
+                lines.append(f'speech_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'speech_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'speech_stage_duration_seconds_sum{{stage="{name}"}} {stats["sum"]:.6f}')
+            lines.append(f'speech_stage_duration_seconds_count{{stage="{name}"}} {stats["count"]}')
+        for metric, key, help_text in (
+            ("speech_stage_errors_total", "errors", "Spans that ended with an error."),
+            ("speech_stage_bytes_total", "bytes", "Bytes produced by each stage."),
+            ("speech_stage_cache_hits_total", "cache_hits", "Stage results served from a cache."),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, stats in sorted(metrics.items()):
+                lines.append(f'{metric}{{stage="{name}"}} {stats[key]}')
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path=None):
+        path = path or self.metrics_path
+        tmp_path = f"{path}.tmp-{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """Process-wide tracer; enabled by TRACING=1 (exports go to TRACE_DIR)."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                enabled = (os.getenv("TRACING") or "").lower() in ("1", "true", "on", "yes")
+                _tracer = Tracer(enabled=enabled)
+    return _tracer
+
+
+def configure_tracer(enabled=True, trace_dir=DEFAULT_TRACE_DIR):
+    """Replace the process-wide tracer, e.g. from a ``--trace`` command-line flag."""
+    global _tracer
+    with _tracer_lock:
+        _tracer = Tracer(enabled=enabled, trace_dir=trace_dir)
+    return _tracer
+
+
+def stage_summary(span):
+    """One-line breakdown of where a job span has spent its time so far."""
+    if not span:
+        return ""
+    total = span.duration if span.duration is not None else time.perf_counter() - span._start
+    parts = [f"{name} {seconds:.2f}s" for name, seconds in span.stage_times.items()]
+    return f"{total:.2f}s total" + (f" — {', '.join(parts)}" if parts else "")
+
+
+if __name__ == "__main__":
+    # Per-stage latency table from an exported spans.jsonl
+    import argparse
+
+    from realtime_pipeline import percentile
+
+    parser = argparse.ArgumentParser(description="Summarize exported trace spans per stage")
+    parser.add_argument("path", nargs="?", default=os.path.join(DEFAULT_TRACE_DIR, "spans.jsonl"))
+    args = parser.parse_args()
+
+    durations, errors = {}, {}
+    with open(args.path, "r", encoding="utf-8") as f:
+        for line in f:
+            span = json.loads(line)
+            durations.setdefault(span["name"], []).append(span["duration"])
+            errors[span["name"]] = errors.get(span["name"], 0) + bool(span["error"])
+    print(f"{'stage':<22}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, values in sorted(durations.items()):
+        print(f"{name:<22}{len(values):>7}{percentile(values, 50) * 1000:>9.1f}"
+              f"{percentile(values, 95) * 1000:>9.1f}{percentile(values, 99) * 1000:>9.1f}{errors[name]:>8}")
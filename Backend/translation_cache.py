@@ -0,0 +1,173 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from tracing import get_tracer
+
+try:
+    from deep_translator import GoogleTranslator
+except Exception:
+    GoogleTranslator = None
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH") or os.path.join(script_dir, "Data", "cache", "translations.sqlite3")
+
+
+def normalize_text(text):
+    """Cache key form of a sentence: NFC, trimmed, internal whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def google_translate(text, target, source="auto"):
+    if GoogleTranslator is None:
+        raise RuntimeError("Missing required Python package 'deep-translator'. Install it with: pip install deep-translator")
+    return GoogleTranslator(source=source, target=target).translate(text)
+
+
+# ----------------------------- #
+# 🔹 Two-tier translation cache
+# ----------------------------- #
+class TranslationCache:
+    """
+    In-memory LRU in front of a SQLite table that survives restarts.
+    The disk tier is trimmed back to ``max_disk_entries`` rows, least recently
+    used first, once every ``evict_interval`` writes (so it can briefly run
+    over by that much) rather than counting the table on every write.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_size=2048, max_disk_entries=200_000, evict_interval=1000):
+        self.path = path
+        self.memory_size = memory_size
+        self.max_disk_entries = max_disk_entries
+        self.evict_interval = evict_interval
+        self._writes = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " key TEXT PRIMARY KEY, target TEXT, source_text TEXT, translated TEXT, accessed REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed)")
+            self._evict()
+            self._db.commit()
+
+    @staticmethod
+    def make_key(text, target, source="auto"):
+        normalized = normalize_text(text)
+        # Auto-detected entries keep the original key form, so existing caches stay valid
+        language = target if source == "auto" else f"{source}\x00{target}"
+        return hashlib.sha256(f"{language}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, text, target, source="auto"):
+        key = self.make_key(text, target, source)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT translated FROM translations WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE translations SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, row[0])
+                    self.disk_hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, text, target, translated, source="auto"):
+        key = self.make_key(text, target, source)
+        with self._lock:
+            self._remember(key, translated)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO translations (key, target, source_text, translated, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, target, normalize_text(text), translated, time.time())
+            )
+            self._writes += 1
+            if self._writes % self.evict_interval == 0:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        count = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM translations WHERE key IN (SELECT key FROM translations ORDER BY accessed LIMIT ?)",
+                (excess,)
+            )
+            self.evictions += excess
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk_entries = 0
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_translation_cache():
+    """Process-wide cache shared by every call site."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TranslationCache()
+        return _default_cache
+
+
+def cached_translate(text, target, source="auto", cache=None, translator=google_translate):
+    """Translate ``text`` into ``target``, going to the network only on a cache miss."""
+    if not normalize_text(text):
+        return text
+    cache = cache or get_translation_cache()
+    with get_tracer().span("translate", target=target, chars=len(text)) as span:
+        translated = cache.get(text, target, source)
+        if translated is None:
+            translated = translator(text, target, source=source)
+            if translated is not None:
+                cache.put(text, target, translated, source)
+        else:
+            span.set("cache_hit", True)
+    return translated
@@ -0,0 +1,199 @@
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+
+from tracing import get_tracer
+
+try:
+    import azure.cognitiveservices.speech as speechsdk
+except Exception:
+    speechsdk = None
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.getenv("TTS_CACHE_DIR") or os.path.join(script_dir, "Data", "cache", "tts")
+DEFAULT_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES") or 2 * 1024 ** 3)
+
+
+class SynthesisError(RuntimeError):
+    pass
+
+
+# ----------------------------- #
+# 🔹 Azure synthesis backend
+# ----------------------------- #
+def azure_synthesizer(speech_config):
+    """
+    Return a ``synthesize(text, voice, path, ssml)`` function that renders to a WAV file.
+    It sets the voice on ``speech_config`` itself, so it suits single-voice scripts;
+    concurrent multi-voice callers should use speech_clients.SynthesizerPool.
+    """
+    if speechsdk is None:
+        raise RuntimeError("azure-cognitiveservices-speech is not installed.")
+
+    def synthesize(text, voice, path, ssml=False):
+        speech_config.speech_synthesis_voice_name = voice
+        audio_output = speechsdk.audio.AudioOutputConfig(filename=path)
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_output)
+        if ssml:
+            result = synthesizer.speak_ssml_async(text).get()
+        else:
+            result = synthesizer.speak_text_async(text).get()
+        if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+            details = result.cancellation_details
+            message = f"Speech synthesis canceled: {details.reason}"
+            if details.reason == speechsdk.CancellationReason.Error:
+                message += f" ({details.error_details})"
+            raise SynthesisError(message)
+
+    synthesize.output_format = getattr(speech_config, "speech_synthesis_output_format_string", "") or "default"
+    return synthesize
+
+
+# ----------------------------- #
+# 🔹 Content-addressed WAV cache
+# ----------------------------- #
+class SynthesisCache:
+    """
+    Rendered WAVs stored on disk under hash(voice, output format, text/SSML).
+    Files are written to a temp name and renamed into place, so several
+    processes can share one directory. Once the directory grows past
+    ``max_bytes`` the least recently used files are removed in one batch,
+    down to ``low_water`` of the limit. The size is tracked as files are
+    added, so the directory is only scanned when an eviction is due.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, low_water=0.9):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = None       # bytes in the directory as of the last scan, plus what this process added since
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(voice, output_format, text, ssml=False):
+        kind = "ssml" if ssml else "text"
+        payload = "\x00".join([voice or "", output_format or "", kind, text])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def get(self, key):
+        path = self.path_for(key)
+        try:
+            size = os.path.getsize(path)
+            os.utime(path)  # mark as recently used
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += size
+        return path
+
+    def put(self, key, render, copy_to=None):
+        """
+        Render into a temp file with ``render(tmp_path)`` and publish it
+        atomically. With ``copy_to`` the render is also copied there before it
+        is published, so another process's eviction can't remove it first.
+        """
+        tmp_path = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}.wav")
+        try:
+            render(tmp_path)
+            if copy_to:
+                shutil.copyfile(tmp_path, copy_to)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self.path_for(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            due = self._size is None or self._size > self.max_bytes
+        if due:
+            self.evict()
+        return self.path_for(key)
+
+    def evict(self):
+        """Scan the directory and, if it is over ``max_bytes``, remove the oldest files down to the low-water mark."""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".wav") and not entry.name.startswith(".tmp-"):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue    # removed by another process meanwhile
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        removed = 0
+        if total > self.max_bytes:
+            target = self.max_bytes * self.low_water
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+                if total <= target:
+                    break
+        with self._lock:
+            self._size = total
+            self.evictions += removed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "evictions": self.evictions,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_synthesis_cache():
+    """Process-wide cache shared by every call site."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SynthesisCache()
+        return _default_cache
+
+
+def cached_synthesize(synthesize, text, voice, out_path=None, ssml=False, cache=None):
+    """
+    Return the path of a WAV for ``text`` spoken by ``voice``, synthesizing only
+    on a cache miss. When ``out_path`` is given the cached file is copied there.
+    """
+    cache = cache or get_synthesis_cache()
+    key = cache.make_key(voice, getattr(synthesize, "output_format", "default"), text, ssml)
+    with get_tracer().span("synthesize", voice=voice, chars=len(text)) as span:
+        path = cache.get(key)
+        if path is not None:
+            try:
+                if out_path:
+                    shutil.copyfile(path, out_path)
+                span.set("cache_hit", True)
+            except FileNotFoundError:
+                path = None     # evicted by another process since get(): a miss after all
+        if path is None:
+            path = cache.put(key, lambda tmp_path: synthesize(text, voice, tmp_path, ssml=ssml), copy_to=out_path)
+        if span:
+            span.set("bytes", os.path.getsize(out_path or path))
+    return out_path or path
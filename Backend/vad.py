@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+FRAME_SECONDS = 0.03
+HANGOVER_FRAMES = 8         # keep ~240 ms after speech so word endings aren't clipped
+MIN_SPEECH_FRAMES = 3       # ignore clicks shorter than ~90 ms
+ENERGY_MARGIN_DB = 12.0     # above the estimated noise floor
+ABSOLUTE_FLOOR_DB = 30.0    # never call anything quieter than this speech (int16 scale)
+PADDING_SECONDS = 0.1
+MAX_GAP_SECONDS = 0.5       # longest pause kept when compressing silence
+CHUNK_GAP_SECONDS = 2.0     # longest pause a recognition chunk may span
+CUT_SEARCH_SECONDS = 5.0    # how far back from the limit a forced chunk cut looks for a quiet frame
+
+
+@dataclass
+class SpeechMap:
+    """Speech regions of one recording, as (start, end) sample ranges."""
+    segments: list
+    sample_rate: int
+    total_samples: int
+
+    @property
+    def total_seconds(self):
+        return self.total_samples / self.sample_rate
+
+    @property
+    def speech_seconds(self):
+        return sum(end - start for start, end in self.segments) / self.sample_rate
+
+
+# ----------------------------- #
+# 🔹 Frame features
+# ----------------------------- #
+def frame_features(samples, sample_rate, frame_seconds=FRAME_SECONDS):
+    """Per-frame energy (dB) and zero-crossing rate, computed without Python loops."""
+    frame = max(1, int(frame_seconds * sample_rate))
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return np.zeros(0), np.zeros(0), frame
+    frames = samples[:n_frames * frame].astype(np.float32).reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    energy_db = 20.0 * np.log10(rms + 1e-6)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame)
+    return energy_db, zcr, frame
+
+
+def _runs(mask):
+    """(start, end) index pairs of consecutive True values."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return [(int(a), int(b)) for a, b in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))]
+
+
+# ----------------------------- #
+# 🔹 Voice activity detection
+# ----------------------------- #
+def detect_speech(samples, sample_rate, hangover_frames=HANGOVER_FRAMES, min_speech_frames=MIN_SPEECH_FRAMES,
+                  margin_db=ENERGY_MARGIN_DB, padding_seconds=PADDING_SECONDS):
+    """
+    Energy + zero-crossing VAD. A frame is speech when it is clearly above the
+    noise floor, or moderately above it with a fricative-like crossing rate
+    (catches unvoiced consonants). Decisions are smoothed with a hangover.
+    A clip without any quieter stretch is treated as speech throughout.
+    """
+    energy_db, zcr, frame = frame_features(samples, sample_rate)
+    if len(energy_db) == 0:
+        return SpeechMap([], sample_rate, len(samples))
+
+    noise_floor, loudest = np.percentile(energy_db, [10, 99])
+    spread = loudest - noise_floor
+    if spread < margin_db:
+        # No quiet stretch to estimate the noise from (continuous speech, or
+        # speech over steady noise): keep everything above the absolute floor
+        threshold = ABSOLUTE_FLOOR_DB
+    else:
+        # A narrow dynamic range means the "floor" is partly speech; don't demand the full margin
+        threshold = max(noise_floor + min(margin_db, spread / 2), ABSOLUTE_FLOOR_DB)
+    voiced = energy_db > threshold
+    unvoiced = (energy_db > threshold - 6.0) & (zcr > 0.1) & (zcr < 0.5)
+    speech = voiced | unvoiced
+
+    # Drop isolated bursts, then hold each decision for hangover_frames
+    for start, end in _runs(speech):
+        if end - start < min_speech_frames:
+            speech[start:end] = False
+    if hangover_frames:
+        held = np.convolve(speech.astype(np.int8), np.ones(hangover_frames + 1, dtype=np.int8))[:len(speech)]
+        speech = held > 0
+
+    pad = int(padding_seconds * sample_rate)
+    segments = []
+    for start, end in _runs(speech):
+        begin = max(0, start * frame - pad)
+        finish = min(len(samples), end * frame + pad)
+        if segments and begin <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], finish)
+        else:
+            segments.append((begin, finish))
+    return SpeechMap(segments, sample_rate, len(samples))
+
+
+def compress_silence(samples, speech_map, max_gap_seconds=MAX_GAP_SECONDS):
+    """
+    Drop leading/trailing silence and shorten internal gaps to at most
+    ``max_gap_seconds``. Returns ``(compressed_samples, time_map)`` where
+    ``time_map`` holds (compressed_start, original_start) pairs in seconds for
+    ``to_original_time``.
+    """
+    rate = speech_map.sample_rate
+    max_gap = int(max_gap_seconds * rate)
+    pieces, time_map = [], []
+    position = 0
+    for i, (start, end) in enumerate(speech_map.segments):
+        if i:
+            gap = min(start - speech_map.segments[i - 1][1], max_gap)
+            pieces.append(np.zeros(gap, dtype=samples.dtype))
+            position += gap
+        time_map.append((position / rate, start / rate))
+        pieces.append(samples[start:end])
+        position += end - start
+    compressed = np.concatenate(pieces) if pieces else samples[:0]
+    return compressed, time_map
+
+
+def to_original_time(time_map, seconds):
+    """Map a timestamp in compressed audio back to the original recording."""
+    original = seconds
+    for compressed_start, original_start in time_map:
+        if compressed_start > seconds:
+            break
+        original = original_start + (seconds - compressed_start)
+    return original
+
+
+def _quietest_cut(samples, sample_rate, start, limit, search_seconds):
+    """Sample index of the lowest-energy frame in the ``search_seconds`` before ``limit``."""
+    window_start = max(start + 1, limit - int(search_seconds * sample_rate))
+    energy_db, _, frame = frame_features(samples[window_start:limit], sample_rate)
+    if len(energy_db) == 0:
+        return limit
+    return window_start + int(np.argmin(energy_db)) * frame + frame // 2
+
+
+def chunk_speech(speech_map, max_chunk_seconds, max_gap_seconds=CHUNK_GAP_SECONDS, samples=None,
+                 cut_search_seconds=CUT_SEARCH_SECONDS):
+    """
+    Group speech segments into ``(start, end)`` chunks no longer than
+    ``max_chunk_seconds``. Chunks only break inside silence, except for a
+    single segment that is itself too long, and never span a gap longer than
+    ``max_gap_seconds`` -- that silence is simply not sent anywhere.
+    With ``samples``, a segment that is too long is cut at its quietest frame
+    near the limit rather than exactly at it, so words aren't split.
+    """
+    rate = speech_map.sample_rate
+    max_len = int(max_chunk_seconds * rate)
+    max_gap = int(max_gap_seconds * rate)
+    chunks = []
+    for start, end in speech_map.segments:
+        while end - start > max_len:
+            cut = start + max_len
+            if samples is not None:
+                cut = _quietest_cut(samples, rate, start, cut, cut_search_seconds)
+            chunks.append((start, cut))
+            start = cut
+        if chunks and end - chunks[-1][0] <= max_len and 0 <= start - chunks[-1][1] <= max_gap:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
@@ -0,0 +1,195 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from audio_sources import DecoderSource
+from dubbing import SegmentDubber, mix_segments
+from languages import language_names, track_languages
+from muxing import mux_video, mux_video_tracks
+from recognition import Segment, recognize_stream
+from tracing import get_tracer
+from translation_cache import cached_translate
+
+
+@dataclass
+class VideoDubResult:
+    original_text: str = ""
+    translated_text: str = ""
+    output_path: str = ""
+    recognition_error: str = ""
+    failed_segments: int = 0
+    first_error: str = ""
+    mux: object = None                          # muxing.MuxResult, None when reused
+    reused: list = field(default_factory=list)  # artifacts that were already computed
+
+
+@dataclass
+class LanguageDub:
+    target_lang: str
+    voice: str
+    translated_text: str = ""
+    audio_path: str = ""                        # mixed dubbed_<lang>.wav
+    failed_segments: int = 0
+    first_error: str = ""
+    reused: bool = False
+
+
+@dataclass
+class MultiDubResult:
+    original_text: str = ""
+    output_path: str = ""
+    recognition_error: str = ""
+    audio_duration: float = 0.0
+    segments: list = field(default_factory=list)    # recognition.Segment, offsets relative to the input
+    languages: dict = field(default_factory=dict)   # target code -> LanguageDub, in track order
+    mux: object = None                              # muxing.MuxResult, None when reused
+    reused: list = field(default_factory=list)      # artifacts that were already computed
+
+
+def output_name(target_langs):
+    return f"dubbed_{'_'.join(target_langs)}.mp4"
+
+
+def run_cpu(cpu_pool, fn, *args):
+    """Run a CPU-heavy step (mix, mux) in ``cpu_pool`` when one is given, else inline."""
+    if cpu_pool is None:
+        return fn(*args)
+    return cpu_pool.submit(fn, *args).result()
+
+
+# ----------------------------- #
+# 🔹 extract → recognize → (translate → synthesize) × N → mux
+# ----------------------------- #
+def dub_video_languages(store, content_hash, input_path, targets, recognizer_backend, synthesize,
+                        translate=cached_translate, max_workers=4, cpu_pool=None, mux=True, recognize=None):
+    """
+    Dub one stored upload into every language of ``targets`` (code → voice).
+
+    Recognition runs once, pulling audio from an ffmpeg decoder pipe as
+    fast as it can recognize it, so it starts while the rest of the file is
+    still being decoded. The dubbed tracks span the container's full
+    duration even if recognition stops early. Each language has its own SegmentDubber, so
+    translation and synthesis for all languages proceed concurrently while
+    recognition is still producing segments. The result is one video with an
+    audio track per language (the first is the default). Stage outputs are
+    saved in ``store`` under the upload's content hash, so a repeat run, or a
+    run adding one more language, only does missing work.
+
+    With a ``cpu_pool`` (a ProcessPoolExecutor) mixing and muxing run in
+    worker processes while the network stages stay on threads. ``mux=False``
+    stops at the per-language tracks, for audio-only inputs. ``recognize``
+    replaces the decoder-pipe recognition: it is called with the segment
+    callback and returns a RecognitionResult (e.g. long_form.recognize_long_form).
+    """
+    result = MultiDubResult()
+    name = output_name(targets)
+    transcript = store.load_json(content_hash, "transcript.json")
+    for lang, voice in targets.items():
+        dub = LanguageDub(lang, voice)
+        translation = store.load_json(content_hash, f"translation_{lang}.json")
+        if translation and store.has(content_hash, f"dubbed_{lang}.wav"):
+            dub.translated_text = " ".join(t for t in translation["segments"] if t)
+            dub.audio_path = store.path(content_hash, f"dubbed_{lang}.wav")
+            dub.reused = True
+        result.languages[lang] = dub
+    pending = [lang for lang, dub in result.languages.items() if not dub.reused]
+
+    # Everything already computed for these languages
+    if transcript and not pending and (not mux or store.has(content_hash, name)):
+        result.audio_duration = transcript["audio_duration"]
+        result.segments = [Segment(**s) for s in transcript["segments"]]
+        result.original_text = " ".join(s.text for s in result.segments)
+        result.output_path = store.path(content_hash, name) if mux else ""
+        result.reused = ["transcript"] + [f"translation_{lang}" for lang in targets] + (["dubbed_media"] if mux else [])
+        return result
+
+    # Segments are fanned out to every language as soon as they are recognized (or loaded)
+    dubbers = {
+        lang: SegmentDubber(lang, targets[lang], synthesize, translate=translate, max_workers=max_workers)
+        for lang in pending
+    }
+
+    def fan_out(segment):
+        for dubber in dubbers.values():
+            dubber.submit(segment)
+
+    if transcript:
+        result.reused.append("transcript")
+        audio_duration = transcript["audio_duration"]
+        segments = [Segment(**s) for s in transcript["segments"]]
+        for segment in segments:
+            fan_out(segment)
+    else:
+        if recognize is None:
+            recognition = recognize_stream(recognizer_backend, DecoderSource(input_path), on_segment=fan_out)
+        else:
+            recognition = recognize(fan_out)
+        audio_duration = recognition.audio_duration
+        segments = recognition.segments
+        result.recognition_error = recognition.error
+        # Only complete transcripts are reusable
+        if not recognition.error and not recognition.timed_out:
+            store.save_json(content_hash, "transcript.json", {
+                "audio_duration": audio_duration,
+                "segments": [asdict(s) for s in segments],
+            })
+    dubbed = {lang: dubber.results() for lang, dubber in dubbers.items()}
+    result.audio_duration = audio_duration
+    result.segments = segments
+
+    result.original_text = " ".join(s.text for s in segments)
+    if not result.original_text:
+        return result
+    result.reused += [f"translation_{lang}" for lang, dub in result.languages.items() if dub.reused]
+
+    parent_span = get_tracer().current()
+
+    def finish(lang):
+        # Mix every dubbed segment into one track at its original timestamp
+        dub = result.languages[lang]
+        dubbed_segments = dubbed[lang]
+        dub.translated_text = " ".join(d.translated for d in dubbed_segments if d.translated)
+        failed = [d for d in dubbed_segments if d.error]
+        dub.failed_segments = len(failed)
+        dub.first_error = failed[0].error if failed else ""
+        if not failed:
+            store.save_json(content_hash, f"translation_{lang}.json",
+                            {"segments": [d.translated for d in dubbed_segments]})
+        with get_tracer().activate(parent_span), store.writing(content_hash, f"dubbed_{lang}.wav") as tmp_audio:
+            run_cpu(cpu_pool, mix_segments, dubbed_segments, audio_duration, tmp_audio)
+        dub.audio_path = store.path(content_hash, f"dubbed_{lang}.wav")
+
+    with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+        list(pool.map(finish, pending))
+
+    if not mux:
+        return result
+
+    # Copy the video stream and only encode the new audio track(s)
+    with store.writing(content_hash, name) as tmp_video:
+        if len(targets) == 1:
+            result.mux = run_cpu(cpu_pool, mux_video, input_path,
+                                 next(iter(result.languages.values())).audio_path, tmp_video)
+        else:
+            tracks = [(dub.audio_path, track_languages.get(lang), language_names.get(lang, lang))
+                      for lang, dub in result.languages.items()]
+            result.mux = run_cpu(cpu_pool, mux_video_tracks, input_path, tracks, tmp_video)
+    result.output_path = store.path(content_hash, name)
+    return result
+
+
+def dub_video(store, content_hash, input_path, target_lang, voice, recognizer_backend, synthesize,
+              translate=cached_translate, max_workers=4):
+    """Dub one stored upload into a single ``target_lang``; see ``dub_video_languages``."""
+    multi = dub_video_languages(store, content_hash, input_path, {target_lang: voice}, recognizer_backend,
+                                synthesize, translate=translate, max_workers=max_workers)
+    dub = multi.languages[target_lang]
+    return VideoDubResult(
+        original_text=multi.original_text,
+        translated_text=dub.translated_text,
+        output_path=multi.output_path,
+        recognition_error=multi.recognition_error,
+        failed_segments=dub.failed_segments,
+        first_error=dub.first_error,
+        mux=multi.mux,
+        reused=multi.reused,
+    )
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import uuid
+from contextlib import contextmanager
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+WORKSPACE_ROOT = os.getenv("JOB_WORKSPACE_DIR") or os.path.join(script_dir, "Data", "workspace")
+
+# Uploads are copied in fixed-size chunks instead of one uploaded_file.read()
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path, chunk_size=CHUNK_SIZE):
+    """SHA-256 of a file on disk, read in chunks; the key ArtifactStore files its artifacts under."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+def session_dir(session_id, root=WORKSPACE_ROOT):
+    """Private scratch directory for one user session."""
+    path = os.path.join(root, "sessions", session_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# ----------------------------- #
+# 🔹 Content-addressed artifacts
+# ----------------------------- #
+class ArtifactStore:
+    """
+    Derived files (extracted audio, transcript, translations, dubbed media)
+    stored under the SHA-256 of the original upload, so the same input is
+    never processed twice. Every write goes through a temp file and an atomic
+    rename, which makes the store safe to share between sessions.
+    """
+
+    def __init__(self, root=WORKSPACE_ROOT):
+        self.root = os.path.join(root, "artifacts")
+        os.makedirs(self.root, exist_ok=True)
+
+    def dir_for(self, content_hash):
+        path = os.path.join(self.root, content_hash[:2], content_hash)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def path(self, content_hash, name):
+        return os.path.join(self.dir_for(content_hash), name)
+
+    def has(self, content_hash, name):
+        return os.path.isfile(self.path(content_hash, name))
+
+    @contextmanager
+    def writing(self, content_hash, name):
+        """Yield a temp path; it is renamed to the artifact only if the block succeeds."""
+        final_path = self.path(content_hash, name)
+        root, ext = os.path.splitext(final_path)
+        tmp_path = f"{root}.tmp-{uuid.uuid4().hex}{ext}"
+        try:
+            yield tmp_path
+            os.replace(tmp_path, final_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def save_json(self, content_hash, name, data):
+        with self.writing(content_hash, name) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+
+    def load_json(self, content_hash, name):
+        try:
+            with open(self.path(content_hash, name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store_upload(self, stream, ext, scratch_dir, chunk_size=CHUNK_SIZE):
+        """
+        Copy ``stream`` to disk in chunks while hashing it. Returns
+        ``(content_hash, path)``; a file that was uploaded before is not stored twice.
+        """
+        if hasattr(stream, "seek"):
+            stream.seek(0)
+        digest = hashlib.sha256()
+        tmp_path = os.path.join(scratch_dir, f"upload-{uuid.uuid4().hex}.part")
+        try:
+            with open(tmp_path, "wb") as f:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+            return self.adopt_upload(tmp_path, digest.hexdigest(), ext)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def adopt_upload(self, tmp_path, content_hash, ext):
+        """
+        File an upload that was already written to ``tmp_path`` (and hashed)
+        elsewhere, e.g. streamed from an HTTP request. Returns ``(content_hash, path)``;
+        ``tmp_path`` is moved into the store, or left for the caller to remove
+        when the same content is already there.
+        """
+        name = f"input.{ext.lower().lstrip('.')}"
+        if not self.has(content_hash, name):
+            os.replace(tmp_path, self.path(content_hash, name))
+        return content_hash, self.path(content_hash, name)